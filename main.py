@@ -14,9 +14,13 @@ from src.config import (
     get_portfolio_config,
     get_cross_section_config,
 )
-from src.data_loader import update_data, load_data, sync_data_files
+from src.data_loader import update_data, update_many, load_data, sync_data_files
 from src.labels import effective_horizon
-from src.model import build_feature_frame, phase1_feature_cols
+from src.model import (
+    build_feature_frame,
+    phase1_feature_cols,
+    training_history_window,
+)
 from src.predictor import generate_signal
 from src.notifier import send_notification, send_line_text
 from src.dashboard import update_dashboard
@@ -31,6 +35,8 @@ from src import (
     portfolio,
     dashboard,
     digest,
+    provider_health,
+    run_cache,
 )
 
 
@@ -86,9 +92,23 @@ def _empty_metrics():
     }
 
 
+def _ohlcv_window(ticker_code, label_cfg):
+    """
+    load_data() window shared by Phase 1 and Phase 2: the gate's
+    validation_years (ephemeral training / KPI gate) before the last labelled
+    date plus feature warm-up. One window for both keeps them on a single
+    cached read per ticker.
+    """
+    return training_history_window(
+        BACKTEST_GATE_CONFIG["validation_years"],
+        ticker_code,
+        horizon=effective_horizon(label_cfg),
+    )
+
+
 def _latest_close_or_none(ticker_code):
     try:
-        df = load_data(ticker_code)
+        df = load_data(ticker_code, tail_rows=1)
         if df is None or df.empty or "close" not in df.columns:
             return None
         close = df["close"].dropna()
@@ -619,18 +639,30 @@ def _process_ticker(ticker_info, ctx):
     print(f"\nProcessing {code} ({ticker_info['name']})...")
 
     validation_warnings = []
+    data_fetch_mode = None
 
     # 1. Update Data
     # In B-unyo, we run at 06:00 JST, so we should have data up to yesterday.
     # Stooq usually updates around midnight UTC or later?
     # Actually Stooq data for JP market closes at 15:00 JST, available shortly after.
     # 06:00 JST next day is safe.
-    updated_df = update_data(code)
+    # main() refreshes the whole universe concurrently up front; a ticker the
+    # bulk refresh did not cover is updated here as before.
+    update_error = (ctx.get("data_update_errors") or {}).get(code)
+    if update_error is not None:
+        raise update_error
+    data_updates = ctx.get("data_updates") or {}
+    if code in data_updates:
+        updated_df = data_updates[code]
+    else:
+        updated_df = update_data(code)
     if updated_df is not None:
         validation_warnings = updated_df.attrs.get("validation_warnings", []) or []
+        # "skipped_fresh" marks a rerun that reused local data without a request.
+        data_fetch_mode = updated_df.attrs.get("fetch_mode")
 
     # 2. Load Data
-    df = load_data(code)
+    df = load_data(code, **_ohlcv_window(code, ctx["label_cfg"]))
     if df is not None:
         validation_warnings = list(
             dict.fromkeys(
@@ -708,6 +740,7 @@ def _process_ticker(ticker_info, ctx):
         "gate_evidence_sha256": gate_result.get("gate_evidence_sha256"),
         "model_version": phase1_fields.get("model_version"),
         "data_validation_warnings": validation_warnings,
+        "data_fetch_mode": data_fetch_mode,
     }
 
     print(f"Prediction for {code}: Up Probability = {prob_up:.2%}")
@@ -827,9 +860,11 @@ def run_phase2_inference(macro_panel, model_cfg, run_date):
 
     # --- Load OHLCV data for all enabled tickers (best-effort) ---
     tickers_data = []
+    label_cfg = _label_config_for_mode(model_cfg)
     for ticker_info in universe:
         try:
-            df = load_data(ticker_info["code"])
+            code = ticker_info["code"]
+            df = load_data(code, **_ohlcv_window(code, label_cfg))
         except Exception as e:  # noqa: BLE001
             print(
                 f"Phase 2: load_data failed for {ticker_info['code']}: {type(e).__name__}: {e}"
@@ -1062,6 +1097,14 @@ def _merge_portfolio_target_weights(signals, snapshot):
 
 
 def main():
+    # One cache for the whole run: each ticker's parquet is loaded/validated and
+    # featurized once, then shared by Phase 1, Phase 2 and the dashboard export.
+    with run_cache.run_scope() as cache:
+        _run_daily_job()
+        print(f"Run cache: {cache.summary()}")
+
+
+def _run_daily_job():
     print("Starting daily stock prediction job...")
 
     active_codes = [ticker_info["code"] for ticker_info in TICKERS]
@@ -1113,6 +1156,13 @@ def main():
         "saved_model_disabled_reason": saved_model_disabled_reason,
     }
 
+    # Overlap the per-ticker network wait; a failure here degrades to the
+    # sequential per-ticker update inside _process_ticker.
+    try:
+        ctx["data_updates"], ctx["data_update_errors"] = update_many(active_codes)
+    except Exception as e:  # noqa: BLE001
+        log_exc("Bulk data refresh failed. Falling back to per-ticker updates", e)
+
     signals = []
     backtest_entries = []
 
@@ -1138,6 +1188,9 @@ def main():
         signals.append(signal)
         backtest_entries.append(backtest_entry)
 
+    # Persist outcomes from any per-ticker fallback updates made in the loop.
+    provider_health.get_tracker().save()
+
     run_date = _run_date_jst()
 
     # Phase 2: cross-sectional inference + portfolio snapshot. Never breaks Phase 1.
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Memory report: the Phase 2 long panel per build_cs_panel() stage in full
+precision vs compact dtypes (TRADER_CS_COMPACT_DTYPES), then a tolerance check
+of the cross-sectional model trained on either panel.
+
+Defaults to 300 tickers x 1,000 sessions. The compact stages are checked
+against build_cs_panel(compact=True) exactly; the model check reports the OOS
+score rank agreement and the metric deltas between the two trainings.
+
+Usage:
+  uv run python scripts/bench_compact_panel.py
+  uv run python scripts/bench_compact_panel.py --tickers 1000 --rows 1250 --no-train
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.compact_dtypes import compact_frame, frame_nbytes  # noqa: E402
+from src.cross_section import (  # noqa: E402
+    CS_INPUT_COLS,
+    LABEL_INPUT_COLS,
+    add_panel_cs_features,
+    build_cs_labels,
+    build_cs_panel,
+    build_panel,
+)
+from src.cs_model import train_cs_model  # noqa: E402
+from src.macro import MACRO_FEATURE_COLS  # noqa: E402
+from tests.test_feature_engine import synthetic_ohlcv  # noqa: E402
+
+METRICS = ("daily_ic", "rank_ic", "precision_at_n", "top_bottom_spread")
+
+
+def _timed(fn, *args, **kwargs):
+    started = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return time.perf_counter() - started, out
+
+
+def _stages(data, macro, compact):
+    """(stage name, panel) after each build_cs_panel() stage."""
+    panel = build_panel(data, macro)
+    if compact:
+        panel = compact_frame(panel, keep=CS_INPUT_COLS + LABEL_INPUT_COLS)
+    yield "build_panel", panel
+    panel = add_panel_cs_features(panel)
+    if compact:
+        panel = compact_frame(panel, keep=LABEL_INPUT_COLS)
+    yield "cs_features", panel
+    panel = build_cs_labels(panel)
+    yield "labels", compact_frame(panel) if compact else panel
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tickers", type=int, default=300)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--no-train", action="store_true")
+    args = parser.parse_args(argv)
+    os.environ["TRADER_FEATURE_STORE_ENABLED"] = "false"
+
+    data = [
+        (
+            {"code": f"{1000 + i}.JP", "sector": f"S{i % 17}"},
+            synthetic_ohlcv(args.rows, i),
+        )
+        for i in range(args.tickers)
+    ]
+    rng = np.random.default_rng(0)
+    macro = pd.DataFrame({"date": data[0][1]["date"]})
+    for col in MACRO_FEATURE_COLS:
+        macro[col] = rng.normal(0, 1, len(macro))
+
+    full = dict(_stages(data, macro, compact=False))
+    compact = dict(_stages(data, macro, compact=True))
+    expected = build_cs_panel(data, macro, compact=True)
+    pd.testing.assert_frame_equal(compact["labels"], expected, check_exact=True)
+
+    rows = len(full["labels"])
+    print(
+        f"build_cs_panel on {args.tickers} tickers x {args.rows} rows ({rows:,} rows)"
+    )
+    print(f"  {'stage':<12} {'float64 MB':>11} {'compact MB':>11} {'saved':>7}")
+    for stage, panel in full.items():
+        full_mb = frame_nbytes(panel) / 1e6
+        compact_mb = frame_nbytes(compact[stage]) / 1e6
+        saved = 1 - compact_mb / full_mb
+        print(f"  {stage:<12} {full_mb:11.1f} {compact_mb:11.1f} {saved:7.1%}")
+    if args.no_train:
+        return 0
+
+    config = {"min_daily_names": 5}
+    full_sec, (full_bundle, _) = _timed(train_cs_model, full["labels"], config)
+    compact_sec, (compact_bundle, _) = _timed(train_cs_model, compact["labels"], config)
+    full_oos = full_bundle["oos_predictions"]
+    compact_oos = compact_bundle["oos_predictions"]
+    agreement = full_oos["raw_score"].corr(compact_oos["raw_score"], method="spearman")
+    print(f"train_cs_model ({full_bundle['objective']})")
+    print(f"  float64 {full_sec:8.3f}s   compact {compact_sec:8.3f}s")
+    print(f"  OOS raw_score spearman {agreement:.5f}")
+    for key in METRICS:
+        full_value = full_bundle["metrics"][key]
+        compact_value = compact_bundle["metrics"][key]
+        print(f"  {key:<18} {full_value:+.5f}  {compact_value:+.5f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
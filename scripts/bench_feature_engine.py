@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: add_features() (array engine) vs the pre-engine pandas
+implementation on synthetic histories.
+
+Defaults to 50 tickers x 6,000 sessions (~24 years each). Every ticker's
+output is also checked for exact equality, so a speedup never hides drift.
+
+Usage:
+  uv run python scripts/bench_feature_engine.py
+  uv run python scripts/bench_feature_engine.py --tickers 10 --rows 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.model import add_features  # noqa: E402
+from tests.test_feature_engine import (  # noqa: E402
+    reference_add_features,
+    synthetic_ohlcv,
+)
+
+
+def _timed(fn, frames):
+    started = time.perf_counter()
+    out = [fn(frame, dropna=False) for frame in frames]
+    return time.perf_counter() - started, out
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tickers", type=int, default=50)
+    parser.add_argument("--rows", type=int, default=6000)
+    args = parser.parse_args(argv)
+
+    frames = [synthetic_ohlcv(args.rows, seed) for seed in range(args.tickers)]
+    rows = args.tickers * args.rows
+    print(f"add_features on {args.tickers} tickers x {args.rows} rows ({rows:,} rows)")
+
+    engine_sec, engine_out = _timed(add_features, frames)
+    reference_sec, reference_out = _timed(reference_add_features, frames)
+    for got, want in zip(engine_out, reference_out):
+        pd.testing.assert_frame_equal(got, want, check_exact=True)
+
+    for label, sec in (("reference", reference_sec), ("engine", engine_sec)):
+        print(
+            f"  {label:<9} {sec:8.3f}s  {sec / args.tickers * 1000:8.1f} ms/ticker"
+            f"  {rows / sec:12,.0f} rows/s"
+        )
+    print(f"  speedup   {reference_sec / engine_sec:8.1f}x (outputs identical)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: labels.add_triple_barrier_labels() (vectorized barrier scan)
+vs the per-row first_barrier_touch() scan it replaced, on synthetic history,
+then a (tp x sl x H) label sweep: build_labelled_frame() per config vs
+build_labelled_frames() / triple_barrier_label_sweep().
+
+Every label set is checked for equality, so a speedup never hides drift.
+
+Usage:
+  uv run python scripts/bench_labels.py
+  uv run python scripts/bench_labels.py --rows 5000 --horizon 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.labels import (  # noqa: E402
+    add_triple_barrier_labels,
+    build_labelled_frame,
+    build_labelled_frames,
+    triple_barrier_label_sweep,
+)
+from src.model import add_features  # noqa: E402
+from tests.test_feature_engine import synthetic_ohlcv  # noqa: E402
+from tests.test_labels import _per_row_triple_barrier  # noqa: E402
+
+
+def _timed(fn, *args):
+    started = time.perf_counter()
+    out = fn(*args)
+    return time.perf_counter() - started, out
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2500)
+    parser.add_argument("--horizon", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    df = add_features(synthetic_ohlcv(args.rows, 0))
+    h = args.horizon
+    print(f"triple-barrier labels on {len(df):,} rows, H={h}")
+    loop_sec, (labels, reasons, exit_dates) = _timed(
+        _per_row_triple_barrier, df, h, 1.5, 1.0
+    )
+    array_sec, out = _timed(add_triple_barrier_labels, df, h, 1.5, 1.0)
+    np.testing.assert_array_equal(out["target_class"].to_numpy(), labels)
+    assert out["tb_exit_reason"].tolist() == reasons
+    assert out["tb_exit_date"].tolist() == exit_dates
+
+    for label, sec in (("loop", loop_sec), ("array", array_sec)):
+        print(f"  {label:<6} {sec:8.3f}s  {len(df) / sec:12,.0f} rows/s")
+    print(f"  speedup {loop_sec / array_sec:6.1f}x (labels identical)")
+
+    grid = list(itertools.product((1.0, 1.5, 2.0), (0.5, 1.0, 1.5), (3, 5, 10, 20)))
+    configs = [
+        {
+            "label_mode": "triple_barrier",
+            "tb_tp_atr": tp,
+            "tb_sl_atr": sl,
+            "tb_max_days": days,
+        }
+        for tp, sl, days in grid
+    ]
+    print(f"label sweep over {len(grid)} (tp, sl, H) configs")
+    each_sec, each = _timed(lambda: [build_labelled_frame(df, c) for c in configs])
+    frames_sec, frames = _timed(build_labelled_frames, df, configs)
+    table_sec, table = _timed(triple_barrier_label_sweep, df, grid)
+    for a, b in zip(each, frames):
+        pd.testing.assert_frame_equal(a, b, check_exact=True)
+    assert len(table) == sum(len(f) for f in frames)
+    timings = (("each", each_sec), ("frames", frames_sec), ("table", table_sec))
+    for label, sec in timings:
+        print(f"  {label:<6} {sec:8.3f}s  {len(grid) / sec:12,.1f} configs/s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
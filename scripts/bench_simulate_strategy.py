@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: backtest._simulate_strategy() (array sleeve accumulation) vs
+the per-decision dict-of-events loop it replaced, over the auto-threshold
+candidate grid the KPI gate searches.
+
+Every simulation is checked for exact equality, and so are the
+_compute_metrics() results, so a speedup never hides drift.
+
+Usage:
+  uv run python scripts/bench_simulate_strategy.py
+  uv run python scripts/bench_simulate_strategy.py --rows 5000 --horizon 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.backtest import (  # noqa: E402
+    _build_threshold_candidates,
+    _compute_metrics,
+    _simulate_strategy,
+)
+from tests.test_backtest_metrics import (  # noqa: E402
+    _per_decision_simulation,
+    _simulation_oos,
+)
+
+
+def _timed(fn, *args):
+    started = time.perf_counter()
+    out = fn(*args)
+    return time.perf_counter() - started, out
+
+
+def _sweep(simulate, oos, config, candidates, horizon):
+    return [simulate(oos, config, t, horizon) for t in candidates]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2500)
+    parser.add_argument("--horizon", type=int, default=5)
+    parser.add_argument("--candidates", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    h = args.horizon
+    oos = _simulation_oos(h, rows=args.rows)
+    config = {"allow_short": True, "cost_bps": 10.0, "slippage_bps": 5.0}
+    candidates = _build_threshold_candidates({})[: args.candidates]
+    print(
+        f"_simulate_strategy on {args.rows:,} decisions, H={h}, "
+        f"{len(candidates)} threshold candidates"
+    )
+    loop_sec, expected = _timed(
+        _sweep, _per_decision_simulation, oos, config, candidates, h
+    )
+    array_sec, got = _timed(_sweep, _simulate_strategy, oos, config, candidates, h)
+    for sim, ref in zip(got, expected):
+        pd.testing.assert_frame_equal(sim, ref, check_exact=True)
+        assert _compute_metrics(sim, h) == _compute_metrics(ref, h)
+
+    for label, sec in (("loop", loop_sec), ("array", array_sec)):
+        per_sim = sec / len(candidates) * 1e3
+        print(f"  {label:<6} {sec:8.3f}s  {per_sim:8.2f} ms/simulation")
+    print(f"  speedup {loop_sec / array_sec:6.1f}x (simulations and metrics identical)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
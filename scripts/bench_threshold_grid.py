@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: backtest._threshold_grid_metrics() (deduplicated, batched
+grid) vs one _simulate_strategy() + _compute_metrics() per threshold
+candidate, over the auto-threshold grid _optimize_thresholds() searches; then
+_optimize_thresholds() with the pruned vs the exhaustive search.
+
+Every candidate's metrics are checked for exact equality, and the pruned
+search for the exhaustive selection, so a speedup never hides drift.
+
+Usage:
+  uv run python scripts/bench_threshold_grid.py
+  uv run python scripts/bench_threshold_grid.py --rows 5000 --horizon 10 --long-only
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.backtest import (  # noqa: E402
+    _build_threshold_candidates,
+    _compute_metrics,
+    _optimize_thresholds,
+    _position_matrix,
+    _simulate_strategy,
+    _threshold_grid_metrics,
+)
+from src.predictor import resolve_thresholds  # noqa: E402
+from tests.test_backtest_metrics import _simulation_oos  # noqa: E402
+
+
+def _timed(fn, *args):
+    started = time.perf_counter()
+    out = fn(*args)
+    return time.perf_counter() - started, out
+
+
+def _per_candidate(oos, config, candidates, horizon):
+    return [
+        _compute_metrics(_simulate_strategy(oos, config, t, horizon), horizon)
+        for t in candidates
+    ]
+
+
+def _search(oos, config, horizon, mode):
+    selected, metadata = _optimize_thresholds(
+        oos, {**config, "auto_threshold_search": mode}, horizon
+    )
+    return selected, metadata, metadata.pop("threshold_search")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1500)
+    parser.add_argument("--horizon", type=int, default=5)
+    parser.add_argument("--long-only", action="store_true")
+    args = parser.parse_args(argv)
+
+    h = args.horizon
+    oos = _simulation_oos(h, rows=args.rows)
+    config = {
+        "allow_short": not args.long_only,
+        "cost_bps": 10.0,
+        "slippage_bps": 5.0,
+    }
+    candidates = _build_threshold_candidates({})
+    positions = _position_matrix(
+        oos, [resolve_thresholds(t) for t in candidates], config["allow_short"]
+    )
+    distinct = np.unique(positions, axis=1).shape[1]
+    print(
+        f"threshold grid on {args.rows:,} decisions, H={h}, "
+        f"{len(candidates)} candidates ({distinct} distinct position columns)"
+    )
+    loop_sec, expected = _timed(_per_candidate, oos, config, candidates, h)
+    grid_sec, got = _timed(_threshold_grid_metrics, oos, config, candidates, h)
+    assert got == expected
+
+    for label, sec in (("loop", loop_sec), ("grid", grid_sec)):
+        per_candidate = sec / len(candidates) * 1e3
+        print(f"  {label:<5} {sec:8.3f}s  {per_candidate:8.3f} ms/candidate")
+    print(f"  speedup {loop_sec / grid_sec:6.1f}x (metrics identical)")
+
+    full_sec, full = _timed(_search, oos, config, h, "exhaustive")
+    pruned_sec, pruned = _timed(_search, oos, config, h, "pruned")
+    assert pruned[:2] == full[:2]
+    stats = pruned[2]
+    print(
+        f"_optimize_thresholds: {stats['evaluated']} of {len(candidates)} evaluated"
+        f" ({stats['pruned_equivalent']} equivalent, {stats['pruned_infeasible']}"
+        f" infeasible, {stats['pruned_by_score']} by score)"
+    )
+    for label, sec in (("exhaustive", full_sec), ("pruned", pruned_sec)):
+        print(f"  {label:<10} {sec:8.3f}s")
+    print(f"  speedup {full_sec / pruned_sec:6.1f}x (same selection)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -39,6 +39,7 @@ from curation_common import (  # noqa: E402
     write_json,
 )
 from src.config import DATA_DIR  # noqa: E402
+from src.price_store import read_ticker_file  # noqa: E402
 
 
 DEFAULT_POOL_SETTINGS = {
@@ -371,7 +372,7 @@ def _read_parquet_for_code(code: str) -> pd.DataFrame | None:
         if not path.exists():
             continue
         try:
-            return pd.read_parquet(path)
+            return read_ticker_file(path)
         except Exception:
             continue
     return None
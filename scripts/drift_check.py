@@ -44,7 +44,7 @@ from src.config import (  # noqa: E402
 from src.data_loader import load_data  # noqa: E402
 from src.labels import effective_horizon  # noqa: E402
 from src.macro import load_macro_panel  # noqa: E402
-from src.model import build_feature_frame  # noqa: E402
+from src.model import FEATURE_WARMUP_ROWS, build_feature_frame  # noqa: E402
 from scripts.curation_common import today_jst_iso  # noqa: E402
 
 DRIFT_REPORT_FILE = DOCS_DIR / "drift_report.json"
@@ -210,7 +210,11 @@ def main() -> int:
         psi_max = None
         worst_feature = None
         if feature_reference:
-            df = load_data(code)
+            df = load_data(
+                code,
+                tail_rows=thresholds["psi_window"],
+                warmup_rows=FEATURE_WARMUP_ROWS,
+            )
             if df is not None and not df.empty:
                 featured = build_feature_frame(
                     df,
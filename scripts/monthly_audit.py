@@ -18,8 +18,8 @@ if str(ROOT_DIR) not in sys.path:
 
 from src.backtest import evaluate_kpi_gate
 from src.config import BACKTEST_GATE_CONFIG, TICKERS
-from src.data_loader import load_data
-from src.model import add_features
+from src.data_loader import load_frames
+from src.model import build_feature_frame
 from src.timeutil import now_jst_iso
 
 
@@ -31,10 +31,11 @@ def _safe_mean(values: list[float]) -> float:
 
 def run_audit(output_path: Path) -> int:
     entries = []
+    frames = load_frames([ticker["code"] for ticker in TICKERS])
     for ticker in TICKERS:
         code = ticker["code"]
         name = ticker["name"]
-        df = load_data(code)
+        df = frames.get(code)
         warnings = df.attrs.get("validation_warnings", []) if df is not None else []
         if df is None or df.empty:
             entries.append(
@@ -47,7 +48,7 @@ def run_audit(output_path: Path) -> int:
             )
             continue
 
-        featured = add_features(df)
+        featured = build_feature_frame(df, ticker_info=ticker, macro_enabled=False)
         if featured.empty:
             entries.append(
                 {
@@ -59,7 +60,7 @@ def run_audit(output_path: Path) -> int:
             )
             continue
 
-        gate = evaluate_kpi_gate(featured, BACKTEST_GATE_CONFIG)
+        gate = evaluate_kpi_gate(featured, BACKTEST_GATE_CONFIG, ticker_code=code)
         entries.append(
             {
                 "ticker": code,
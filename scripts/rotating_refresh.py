@@ -15,7 +15,7 @@ if str(ROOT_DIR) not in sys.path:
     sys.path.insert(0, str(ROOT_DIR))
 
 from src.config import TICKERS
-from src.data_loader import update_data
+from src.data_loader import update_many
 from src.timeutil import now_jst_iso, today_jst
 
 
@@ -31,22 +31,22 @@ def run_rotating_refresh(output_path: Path, buckets: int) -> int:
         if idx % buckets == weekday % buckets:
             selected.append(ticker)
 
+    results, errors = update_many([item["code"] for item in selected])
     refreshed = []
     failed = []
     for item in selected:
         code = item["code"]
         name = item["name"]
-        try:
-            df = update_data(code)
-            refreshed.append(
-                {
-                    "ticker": code,
-                    "name": name,
-                    "status": "ok" if df is not None else "no_data",
-                }
-            )
-        except Exception as e:
-            failed.append({"ticker": code, "name": name, "error": str(e)})
+        if code in errors:
+            failed.append({"ticker": code, "name": name, "error": str(errors[code])})
+            continue
+        refreshed.append(
+            {
+                "ticker": code,
+                "name": name,
+                "status": "ok" if results.get(code) is not None else "no_data",
+            }
+        )
 
     payload = {
         "generated_at": now_jst_iso(),
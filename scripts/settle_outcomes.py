@@ -116,6 +116,8 @@ def _settle_for_ticker(
     df = df.sort_values("date").reset_index(drop=True)
     df["date"] = pd.to_datetime(df["date"]).dt.strftime("%Y-%m-%d")
     date_to_idx = {d: i for i, d in enumerate(df["date"].tolist())}
+    highs = df["high"].to_numpy(dtype=float)
+    lows = df["low"].to_numpy(dtype=float)
 
     settled = 0
     for sig in signals:
@@ -134,13 +136,13 @@ def _settle_for_ticker(
                 continue
             if window is None:
                 continue  # not enough forward data yet; settle on a later run
-            path = df.iloc[window.entry_index : window.exit_index + 1]
+            path = slice(window.entry_index, window.exit_index + 1)
             payload = compute_outcome(
                 action=sig["action"],
                 entry_close=window.entry_price,
                 exit_close=window.exit_price,
-                path_highs=path["high"].astype(float).tolist(),
-                path_lows=path["low"].astype(float).tolist(),
+                path_highs=highs[path],
+                path_lows=lows[path],
             )
             benchmark_ret = compute_benchmark_ret(
                 topix_open_by_date,
@@ -19,8 +19,8 @@ if str(ROOT_DIR) not in sys.path:
 
 from src.backtest import evaluate_kpi_gate
 from src.config import BACKTEST_GATE_CONFIG, TICKERS
-from src.data_loader import load_data
-from src.model import add_features
+from src.data_loader import load_frames
+from src.model import build_feature_frame
 from src.timeutil import now_jst_iso
 
 
@@ -30,10 +30,11 @@ def run_stress_test(output_path: Path, cost_bps: float, slippage_bps: float) ->
     stressed_config["slippage_bps"] = float(slippage_bps)
 
     entries = []
+    frames = load_frames([item["code"] for item in TICKERS])
     for item in TICKERS:
         code = item["code"]
         name = item["name"]
-        df = load_data(code)
+        df = frames.get(code)
         warnings = df.attrs.get("validation_warnings", []) if df is not None else []
         if df is None or df.empty:
             entries.append(
@@ -46,7 +47,7 @@ def run_stress_test(output_path: Path, cost_bps: float, slippage_bps: float) ->
             )
             continue
 
-        featured = add_features(df)
+        featured = build_feature_frame(df, ticker_info=item, macro_enabled=False)
         if featured.empty:
             entries.append(
                 {
@@ -58,7 +59,7 @@ def run_stress_test(output_path: Path, cost_bps: float, slippage_bps: float) ->
             )
             continue
 
-        gate = evaluate_kpi_gate(featured, stressed_config)
+        gate = evaluate_kpi_gate(featured, stressed_config, ticker_code=code)
         entries.append(
             {
                 "ticker": code,
@@ -3,7 +3,9 @@
 Technical screening for AI ticker curation (daily).
 
 Reads local price parquet for the candidate pool + current enabled + watchlist,
-computes technical indicators (reusing src.model.add_features), and writes:
+computes technical indicators of the latest bar (src.feature_state's persisted
+incremental state, or src.model.build_feature_frame when it is disabled), and
+writes:
 
   - docs/curation/technical_features.json   raw numbers (input for the agent)
   - docs/curation/technical_latest.json     deterministic baseline scores
@@ -39,7 +41,9 @@ from curation_common import (
 import sys
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
-from src.model import add_features  # noqa: E402
+from src import feature_state  # noqa: E402
+from src.data_loader import read_validated_file  # noqa: E402
+from src.model import build_feature_frame  # noqa: E402
 
 
 def _clamp(x: float, lo: float = 0.0, hi: float = 1.0) -> float:
@@ -52,22 +56,32 @@ def _scale(x: float, lo: float, hi: float) -> float:
     return _clamp((x - lo) / (hi - lo))
 
 
-def _load_price(code: str) -> pd.DataFrame | None:
-    """Prefer top-level data/, fall back to data/watchlist/."""
+def _load_price(code: str) -> tuple[pd.DataFrame | None, Path | None]:
+    """Prefer top-level data/, fall back to data/watchlist/.
+
+    Returns (frame, path of the file it came from). Files written by
+    update_data() are returned as stored (their validation record is
+    trusted); others are normalized and validated on read.
+    """
     for path in (DATA_DIR / f"{code}.parquet", WATCHLIST_DIR / f"{code}.parquet"):
         if path.exists():
             try:
-                df = pd.read_parquet(path)
+                df = read_validated_file(path, code)
             except Exception:
                 continue
-            if df is None or df.empty or "date" not in df.columns:
-                continue
-            df = df.copy()
-            df["date"] = pd.to_datetime(df["date"], errors="coerce")
-            df = df.dropna(subset=["date"]).sort_values("date").reset_index(drop=True)
-            if not df.empty:
-                return df
-    return None
+            if df is not None and not df.empty:
+                return df, path
+    return None, None
+
+
+def _latest_features(df: pd.DataFrame, path: Path, code: str) -> pd.Series:
+    """Technical features of the last bar (incremental when enabled)."""
+    if feature_state.incremental_enabled():
+        return feature_state.latest_features(df, path, code).iloc[-1]
+    featured = build_feature_frame(
+        df, ticker_info={"code": code}, dropna_features=False, macro_enabled=False
+    )
+    return featured.iloc[-1]
 
 
 def _safe(value) -> float | None:
@@ -82,7 +96,7 @@ def _safe(value) -> float | None:
 
 def compute_entry(code: str, name: str, sector: str | None) -> dict:
     """Compute raw technical features for one ticker. Always returns a dict."""
-    df = _load_price(code)
+    df, path = _load_price(code)
     rows = 0 if df is None else int(len(df))
     entry = {
         "code": code,
@@ -94,8 +108,7 @@ def compute_entry(code: str, name: str, sector: str | None) -> dict:
         entry["insufficient_data"] = True
         return entry
 
-    feat = add_features(df, dropna=False)
-    last = feat.iloc[-1]
+    last = _latest_features(df, path, code)
 
     close = _safe(last.get("close"))
     ma_200 = _safe(df["close"].rolling(200).mean().iloc[-1]) if rows >= 200 else None
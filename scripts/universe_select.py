@@ -69,6 +69,7 @@ except ModuleNotFoundError:
     )
 
 from src.config import DATA_DIR, get_cross_section_config
+from src.price_store import read_ticker_file
 from src.universe import (
     compute_liquidity,
     load_universe_candidates,
@@ -93,13 +94,13 @@ def _load_parquet(code: str, source: str) -> pd.DataFrame | None:
         path = DATA_DIR / f"{code}.parquet"
         if path.exists():
             try:
-                return pd.read_parquet(path)
+                return read_ticker_file(path)
             except Exception:
                 return None
         watchlist_path = WATCHLIST_DIR / f"{code}.parquet"
         if watchlist_path.exists():
             try:
-                return pd.read_parquet(watchlist_path)
+                return read_ticker_file(watchlist_path)
             except Exception:
                 return None
         return None
@@ -107,13 +108,13 @@ def _load_parquet(code: str, source: str) -> pd.DataFrame | None:
         watchlist_path = WATCHLIST_DIR / f"{code}.parquet"
         if watchlist_path.exists():
             try:
-                return pd.read_parquet(watchlist_path)
+                return read_ticker_file(watchlist_path)
             except Exception:
                 pass
         data_path = DATA_DIR / f"{code}.parquet"
         if data_path.exists():
             try:
-                return pd.read_parquet(data_path)
+                return read_ticker_file(data_path)
             except Exception:
                 pass
         return None
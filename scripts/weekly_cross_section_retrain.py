@@ -47,7 +47,7 @@ from src.config import (  # noqa: E402
 )
 from src.cross_section import build_cs_panel  # noqa: E402
 from src.cs_model import train_cs_model  # noqa: E402
-from src.data_loader import load_data, update_data  # noqa: E402
+from src.data_loader import load_data, load_frames, update_many  # noqa: E402
 from src.execution import (  # noqa: E402
     ENTRY_PRICE_BASIS,
     EXECUTION_CONTRACT_VERSION,
@@ -207,17 +207,25 @@ def run_retrain(output_path: Path, version: str, *, dry_run: bool) -> int:
     # --- Build tickers_data: update + load each enabled ticker ---
     tickers_data = []
     skipped = 0
+    _, update_errors = update_many([ticker["code"] for ticker in TICKERS])
+    try:
+        frames = load_frames([ticker["code"] for ticker in TICKERS])
+    except Exception as e:  # noqa: BLE001
+        print(
+            f"cs-retrain: bulk price load failed, loading per ticker: "
+            f"{type(e).__name__}: {e}"
+        )
+        frames = None
     for ticker in TICKERS:
         code = ticker["code"]
-        try:
-            update_data(code)
-        except Exception as e:  # noqa: BLE001 — fetch failure must not abort
+        if code in update_errors:  # fetch failure must not abort
+            e = update_errors[code]
             print(
                 f"cs-retrain: update_data({code}) failed (ignored): {type(e).__name__}: {e}"
             )
 
         try:
-            df = load_data(code)
+            df = frames.get(code) if frames is not None else load_data(code)
         except Exception as e:  # noqa: BLE001
             print(
                 f"cs-retrain: load_data({code}) failed (ignored): {type(e).__name__}: {e}"
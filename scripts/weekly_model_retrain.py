@@ -45,9 +45,13 @@ from src.config import (  # noqa: E402
     get_label_config,
     get_model_runtime_config,
 )
-from src.data_loader import load_data, update_data  # noqa: E402
+from src.data_loader import load_data, update_many  # noqa: E402
 from src.macro import load_macro_panel  # noqa: E402
-from src.model import build_feature_frame, phase1_feature_cols  # noqa: E402
+from src.model import (  # noqa: E402
+    build_feature_frame,
+    phase1_feature_cols,
+    training_history_window,
+)
 from src.phase1 import train_ticker_bundle  # noqa: E402
 from scripts.curation_common import now_jst_iso, today_jst_iso  # noqa: E402
 
@@ -208,15 +212,25 @@ def run_retrain(output_path: Path, version: str) -> int:
 
     if staging_model_dir is not None:
         try:
+            updates, update_errors = update_many(target_tickers)
             for ticker in TICKERS:
                 code = ticker["code"]
                 warnings: list[str] = []
                 try:
-                    updated = update_data(code)
+                    if code in update_errors:
+                        raise update_errors[code]
+                    updated = updates.get(code)
                     if updated is not None:
                         warnings = updated.attrs.get("validation_warnings", []) or []
 
-                    df = load_data(code)
+                    df = load_data(
+                        code,
+                        **training_history_window(
+                            BACKTEST_GATE_CONFIG["validation_years"],
+                            code,
+                            horizon=artifact_contract["effective_horizon_days"],
+                        ),
+                    )
                     if df is not None:
                         warnings = list(
                             dict.fromkeys(
@@ -6,7 +6,9 @@ from datetime import timedelta
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
 
+from . import oos_cache
 from .config import DOCS_DIR, get_label_config
 from .execution import EXECUTION_CONTRACT_VERSION, execution_contract_metadata
 from .labels import build_labelled_frame, effective_horizon
@@ -16,7 +18,7 @@ from .model import (
     resolve_purge_gap,
     train_with_purged_internal_validation,
 )
-from .predictor import action_from_probability, resolve_thresholds
+from .predictor import resolve_thresholds
 from .timeutil import now_jst_iso
 
 _LONG_ONLY_POSITION = {
@@ -42,6 +44,10 @@ _AUTO_THRESHOLD_CANDIDATES = {
     "sell": [0.05, 0.10, 0.15, 0.20],
     "volatility_limit": [0.03, 0.04, 0.05],
 }
+# Pruned threshold search: the coarse pass keeps every other grid value, and
+# the refinement evaluates candidates in batches of this many.
+_COARSE_GRID_STEP = 2
+_REFINE_BATCH = 64
 
 
 def _prepare_labelled_data(df, config, label_config):
@@ -156,18 +162,35 @@ def _collect_oos_predictions(labelled, config, horizon=1):
     return oos
 
 
+def _cached_oos_predictions(df, labelled, config, label_config, horizon, ticker_code):
+    """_collect_oos_predictions() through the on-disk OOS cache (src/oos_cache.py).
+
+    Keyed by the gate's input frame, so a hit skips the fold training; the
+    threshold search and simulation always rerun on the returned frame. A
+    failed cache write (full or read-only data dir) only loses the entry.
+    """
+    if not oos_cache.cache_enabled():
+        return _collect_oos_predictions(labelled, config, horizon=horizon)
+    key = oos_cache.cache_key(df, config, label_config)
+    oos = oos_cache.load(key, ticker_code)
+    if oos is None:
+        oos = _collect_oos_predictions(labelled, config, horizon=horizon)
+        try:
+            oos_cache.store(key, oos, ticker_code)
+        except (OSError, pa.ArrowException) as e:
+            print(f"OOS cache write failed for {ticker_code or 'frame'}: {e}")
+    return oos
+
+
 def _execution_window_bounds(frame, horizon):
     """Return inclusive execution-row bounds for an OOS decision frame."""
     if frame.empty:
         return None, None
 
-    execution_rows = []
     if "execution_path_market_rows" in frame.columns:
-        for value in frame["execution_path_market_rows"]:
-            if isinstance(value, (list, tuple, np.ndarray)):
-                execution_rows.extend(int(row) for row in value)
-    if execution_rows:
-        return min(execution_rows), max(execution_rows)
+        first, last = frame.execution_path.market_row_bounds()
+        if first is not None:
+            return first, last
 
     if "market_row_number" in frame.columns:
         decision_rows = pd.to_numeric(
@@ -294,12 +317,6 @@ def _split_oos_for_thresholding(oos, config, horizon=1):
     )
 
 
-def _to_position(action, allow_short):
-    if allow_short:
-        return _LONG_SHORT_POSITION.get(action, 0.0)
-    return _LONG_ONLY_POSITION.get(action, 0.0)
-
-
 def _threshold_signature(thresholds):
     t = resolve_thresholds(thresholds)
     return (
@@ -356,6 +373,95 @@ def _build_threshold_candidates(config):
     return candidates
 
 
+def _positions(oos, thresholds, allow_short):
+    """Sleeve position of every OOS row for one threshold set."""
+    return _position_matrix(oos, [thresholds], allow_short)[:, 0]
+
+
+def _position_matrix(oos, candidates, allow_short):
+    """(rows x candidates) sleeve positions of resolved threshold sets.
+
+    predictor.action_from_probability() on whole columns, mapped through the
+    long-only / long-short position table: a missing or NaN volatility never
+    downgrades BUY, and a NaN prob_up is HOLD.
+    """
+    t = {
+        key: np.array([candidate[key] for candidate in candidates], dtype=float)
+        for key in ("buy", "mild_buy", "mild_sell", "sell", "volatility_limit")
+    }
+    table = _LONG_SHORT_POSITION if allow_short else _LONG_ONLY_POSITION
+    prob_up = pd.to_numeric(oos["prob_up"], errors="coerce").to_numpy(dtype=float)
+    volatility = pd.to_numeric(oos["volatility"], errors="coerce").to_numpy(dtype=float)
+    prob_up = prob_up[:, None]
+    volatility = volatility[:, None]
+    calm = np.isnan(volatility) | (volatility <= t["volatility_limit"])
+    buy = prob_up >= t["buy"]
+    return np.select(
+        [
+            buy & calm,
+            buy | (prob_up >= t["mild_buy"]),
+            prob_up <= t["sell"],
+            prob_up <= t["mild_sell"],
+        ],
+        [table["BUY"], table["MILD_BUY"], table["SELL"], table["MILD_SELL"]],
+        default=table["HOLD"],
+    )
+
+
+def _sleeve_sessions(paths, positions, horizon):
+    """Per-session sleeve sums for (rows x K) position columns.
+
+    Returns (market rows, session dates, columns) with one session per market
+    row any valid path touches; every column is a (sessions x K) array, or
+    None when no row has a path. np.bincount folds the path cells in
+    row-major order, i.e. decision by decision and then session by session, so
+    every float sum is accumulated in the same order as a per-decision loop
+    would.
+    """
+    rows = np.flatnonzero(paths.valid)
+    if rows.size == 0:
+        return None
+    h = horizon
+    keys, first, slots = np.unique(
+        paths.market_rows[rows].ravel(), return_index=True, return_inverse=True
+    )
+    slots = slots.reshape(-1)
+    sleeves = np.repeat(positions[rows] / h, h, axis=0)  # one row per path cell
+    held = sleeves != 0.0
+    offset = np.tile(np.arange(h), rows.size)[:, None]
+    entry = held & (offset == 0)
+    exit_ = held & (offset == h - 1)
+
+    def _sessions_sum(values, at=slots):
+        # One bin per (session, column); bincount adds each bin's weights in
+        # input order, and its float64 sums of counts are exact.
+        k = values.shape[1]
+        bins = (at[:, None] * k + np.arange(k)).ravel()
+        out = np.bincount(bins, weights=values.ravel(), minlength=len(keys) * k)
+        return out.reshape(len(keys), k).astype(values.dtype, copy=False)
+
+    # Entry and scheduled-exit notional of a cell; with H == 1 both land on
+    # one session, entry first.
+    traded = np.stack(
+        [np.where(entry, np.abs(sleeves), 0.0), np.where(exit_, np.abs(sleeves), 0.0)],
+        axis=1,
+    ).reshape(-1, sleeves.shape[1])
+    columns = {
+        "exposure": _sessions_sum(sleeves),
+        "gross_exposure": _sessions_sum(np.abs(sleeves)),
+        "gross_return": _sessions_sum(sleeves * paths.returns[rows].reshape(-1, 1)),
+        "turnover": _sessions_sum(traded, np.repeat(slots, 2)),
+        "active_sleeves": _sessions_sum(held.astype(np.int64)),
+        "entry_cohorts": _sessions_sum(entry.astype(np.int64)),
+        "exit_exposure": _sessions_sum(np.where(exit_, sleeves, 0.0)),
+    }
+    return keys, paths.dates[rows].ravel()[first], columns
+
+
+def _fee_rate(config):
+    return (float(config["cost_bps"]) + float(config["slippage_bps"])) / 10000.0
+
+
 def _simulate_strategy(oos, config, thresholds=None, horizon=1):
     """
     Executable overlapping-sleeve simulation.
@@ -373,68 +479,20 @@ def _simulate_strategy(oos, config, thresholds=None, horizon=1):
 
     t = resolve_thresholds(thresholds)
     h = max(1, int(horizon))
-    sim = oos.copy()
-    sim["action"] = [
-        action_from_probability(
-            prob_up=row.prob_up, volatility=row.volatility, thresholds=t
-        )
-        for row in sim.itertuples(index=False)
-    ]
-    sim["position"] = [
-        _to_position(action, allow_short=bool(config["allow_short"]))
-        for action in sim["action"]
-    ]
-    events: dict[int, dict] = {}
-    for row in sim.itertuples(index=False):
-        path_returns = row.execution_path_returns
-        path_dates = row.execution_path_dates
-        path_market_rows = row.execution_path_market_rows
-        if not (
-            isinstance(path_returns, list)
-            and isinstance(path_dates, list)
-            and isinstance(path_market_rows, list)
-            and len(path_returns) == h
-            and len(path_dates) == h
-            and len(path_market_rows) == h
-        ):
-            continue
-
-        sleeve = float(row.position) / h
-        for offset, (asset_return, session_date, market_row) in enumerate(
-            zip(path_returns, path_dates, path_market_rows)
-        ):
-            event = events.setdefault(
-                int(market_row),
-                {
-                    "date": session_date,
-                    "market_row_number": int(market_row),
-                    "exposure": 0.0,
-                    "gross_exposure": 0.0,
-                    "gross_return": 0.0,
-                    "turnover": 0.0,
-                    "active_sleeves": 0,
-                    "entry_cohorts": 0,
-                    "exit_exposure": 0.0,
-                },
-            )
-            event["exposure"] += sleeve
-            event["gross_exposure"] += abs(sleeve)
-            event["gross_return"] += sleeve * float(asset_return)
-            if sleeve != 0.0:
-                event["active_sleeves"] += 1
-            if offset == 0 and sleeve != 0.0:
-                event["entry_cohorts"] += 1
-                event["turnover"] += abs(sleeve)
-            if offset == h - 1 and sleeve != 0.0:
-                event["turnover"] += abs(sleeve)
-                event["exit_exposure"] += sleeve
-
-    if not events:
+    positions = _positions(oos, t, allow_short=bool(config["allow_short"]))
+    sessions = _sleeve_sessions(oos.execution_path.paths(h), positions[:, None], h)
+    if sessions is None:
         return pd.DataFrame()
 
-    sim = pd.DataFrame([events[key] for key in sorted(events)])
-    fee_rate = (float(config["cost_bps"]) + float(config["slippage_bps"])) / 10000.0
-    sim["cost_return"] = sim["turnover"] * fee_rate
+    keys, dates, columns = sessions
+    sim = pd.DataFrame(
+        {
+            "date": dates,
+            "market_row_number": keys,
+            **{name: values[:, 0] for name, values in columns.items()},
+        }
+    )
+    sim["cost_return"] = sim["turnover"] * _fee_rate(config)
     sim["net_return"] = sim["gross_return"] - sim["cost_return"]
     sim["equity"] = (1.0 + sim["net_return"]).cumprod()
     sim["ending_exposure"] = sim["exposure"] - sim["exit_exposure"]
@@ -442,6 +500,40 @@ def _simulate_strategy(oos, config, thresholds=None, horizon=1):
     return sim
 
 
+def _threshold_grid_metrics(oos, config, candidates, horizon=1):
+    """
+    _compute_metrics(_simulate_strategy(oos, config, t, horizon)) for every
+    threshold set ``t`` of ``candidates``, in one pass.
+
+    Candidates that open the same sleeves on every row (the same position
+    column) share one simulation. The kept columns are simulated together on
+    one session axis, and _session_metrics() computes their metrics
+    column-wise.
+    """
+    if oos.empty:
+        return [_compute_metrics(oos, horizon=horizon) for _ in candidates]
+    h = max(1, int(horizon))
+    resolved = [resolve_thresholds(candidate) for candidate in candidates]
+    positions = _position_matrix(oos, resolved, allow_short=bool(config["allow_short"]))
+    unique, inverse = np.unique(positions, axis=1, return_inverse=True)
+    sessions = _sleeve_sessions(oos.execution_path.paths(h), unique, h)
+    if sessions is None:
+        return [_compute_metrics(pd.DataFrame(), horizon=h) for _ in candidates]
+
+    keys, _, columns = sessions
+    net_returns = columns["gross_return"] - columns["turnover"] * _fee_rate(config)
+    metrics = _session_metrics(
+        keys,
+        net_returns=net_returns,
+        turnover=columns["turnover"],
+        exposure=columns["exposure"],
+        ending_exposure=columns["exposure"] - columns["exit_exposure"],
+        entry_cohorts=columns["entry_cohorts"],
+        horizon=h,
+    )
+    return [dict(metrics[k]) for k in inverse.reshape(-1)]
+
+
 _METRICS_SEMANTICS = {
     "turnover_days": "sessions with non-zero entry or exit notional",
     "round_trips": "completed aggregate signed-position episodes",
@@ -460,15 +552,6 @@ _METRICS_SEMANTICS = {
 _METRICS_SCHEMA_VERSION = 3
 
 
-def _position_sign(value, tolerance=1e-12):
-    numeric = float(value)
-    if numeric > tolerance:
-        return 1
-    if numeric < -tolerance:
-        return -1
-    return 0
-
-
 def _completed_round_trip_returns(sim):
     """Compound net returns for completed aggregate-position episodes."""
     if sim.empty or "net_return" not in sim.columns or "exposure" not in sim.columns:
@@ -485,35 +568,46 @@ def _completed_round_trip_returns(sim):
         # exposure approximates the position remaining after this close.
         ending_exposures = exposures.shift(-1, fill_value=0.0)
 
-    completed = []
-    active_sign = 0
-    growth = 1.0
+    return _round_trip_returns(net_returns, exposures, ending_exposures)
 
-    for net_return, exposure, ending_exposure in zip(
-        net_returns, exposures, ending_exposures
-    ):
-        session_sign = _position_sign(exposure)
-        ending_sign = _position_sign(ending_exposure)
 
-        # A sign change before this session begins completes the old episode.
-        if active_sign != 0 and session_sign != active_sign:
-            completed.append(float(growth - 1.0))
-            active_sign = 0
-            growth = 1.0
-        if active_sign == 0 and session_sign != 0:
-            active_sign = session_sign
+def _position_signs(values, tolerance=1e-12):
+    """Sign of every position; within ``tolerance`` of zero (or NaN) is flat."""
+    values = np.asarray(values, dtype=float)
+    return np.where(values > tolerance, 1, np.where(values < -tolerance, -1, 0))
 
-        if active_sign != 0:
-            growth *= 1.0 + float(net_return)
 
-        # Scheduled exits (or an end-of-session reversal) complete the episode
-        # after including this session's return and transaction costs.
-        if active_sign != 0 and ending_sign != active_sign:
-            completed.append(float(growth - 1.0))
-            active_sign = ending_sign
-            growth = 1.0
+def _round_trip_returns(net_returns, exposures, ending_exposures):
+    """_completed_round_trip_returns() of one session series (NaN-free).
 
-    return completed
+    A session holds the sign of its exposure; an episode completes before a
+    session whose sign differs from the sign carried over from the previous
+    close, and after a held session whose ending sign differs from its own
+    (a reversal carries the ending sign into the next session). Each
+    completion cuts the session axis; an episode's return is the product of
+    ``1 + net_return`` over its held sessions, multiplied in session order.
+    """
+    net_returns = np.asarray(net_returns, dtype=float)
+    held = _position_signs(exposures)
+    ending = _position_signs(ending_exposures)
+    closes_after = (held != 0) & (ending != held)
+    carried = np.concatenate([[0], np.where(closes_after, ending, held)[:-1]])
+    closes_before = (carried != 0) & (held != carried)
+
+    # Cut positions in completion order: before session t is t, after is t + 1.
+    sessions = np.arange(len(held))
+    cuts = np.column_stack([sessions, sessions + 1])[
+        np.column_stack([closes_before, closes_after])
+    ]
+    if cuts.size == 0:
+        return []
+    starts = np.concatenate([[0], cuts[:-1]])
+    growth = np.ones(len(cuts))
+    spans = starts < cuts  # an empty episode completes at 0.0
+    if spans.any():
+        factors = np.where(held != 0, 1.0 + net_returns, 1.0)[: cuts[-1]]
+        growth[spans] = np.multiply.reduceat(factors, starts[spans])
+    return (growth - 1.0).tolist()
 
 
 def _independent_signal_cohorts(sim, horizon=1):
@@ -530,43 +624,102 @@ def _independent_signal_cohorts(sim, horizon=1):
     else:
         positions = pd.Series(np.arange(len(sim)), dtype=float)
 
+    return _independent_cohort_count(positions, entries.reset_index(drop=True), h)
+
+
+def _independent_cohort_count(positions, entries, h):
+    """_independent_signal_cohorts() of per-session positions / entry counts.
+
+    Entry sessions are taken greedily: each counted one blocks the next
+    ``h`` market rows. For positions in market-row order the next eligible
+    entry of every entry is one searchsorted, and the length of the chain
+    from the first entry is found by pointer doubling.
+    """
+    positions = np.asarray(positions, dtype=float)
+    entries = np.asarray(entries, dtype=float)
+    rows = np.trunc(positions[~(entries <= 0) & np.isfinite(positions)])
+    if rows.size == 0:
+        return 0
+    if (np.diff(rows) < 0).any():
+        return _greedy_cohort_count(rows, h)
+
+    n = rows.size
+    jumps = [np.append(np.searchsorted(rows, rows + h, side="left"), n)]
+    while jumps[-1][0] < n:
+        jumps.append(jumps[-1][jumps[-1]])
+    count, node = 1, 0
+    for level in range(len(jumps) - 2, -1, -1):
+        if jumps[level][node] < n:
+            node = jumps[level][node]
+            count += 1 << level
+    return count
+
+
+def _greedy_cohort_count(rows, h):
+    """Sequential greedy count for entry rows out of market-row order."""
     count = 0
     next_eligible = None
-    for position, entry_count in zip(positions, entries.reset_index(drop=True)):
-        if entry_count <= 0 or not np.isfinite(position):
-            continue
-        current = int(position)
+    for current in rows:
         if next_eligible is None or current >= next_eligible:
             count += 1
             next_eligible = current + h
     return count
 
 
+def _metrics_record(
+    *,
+    oos_days,
+    turnover_days,
+    round_trips,
+    signal_cohorts,
+    independent_signal_cohorts,
+    avg_daily_net_return,
+    expectancy_per_trade,
+    avg_daily_turnover,
+    cagr,
+    max_drawdown,
+    sharpe,
+    net_return_total,
+):
+    return {
+        "metrics_schema_version": _METRICS_SCHEMA_VERSION,
+        "metrics_semantics": dict(_METRICS_SEMANTICS),
+        "oos_days": oos_days,
+        "turnover_days": turnover_days,
+        "round_trips": round_trips,
+        "signal_cohorts": signal_cohorts,
+        "independent_signal_cohorts": independent_signal_cohorts,
+        "avg_daily_net_return": avg_daily_net_return,
+        "expectancy_per_trade": expectancy_per_trade,
+        "avg_daily_turnover": avg_daily_turnover,
+        "cagr": cagr,
+        "max_drawdown": max_drawdown,
+        "sharpe": sharpe,
+        "net_return_total": net_return_total,
+        # Compatibility aliases. Their v2 meanings are explicitly declared in
+        # metrics_semantics; no turnover-day-only return mean is emitted.
+        "trades": round_trips,
+        "expectancy": expectancy_per_trade,
+        "turnover": avg_daily_turnover,
+    }
+
+
 def _compute_metrics(sim, horizon=1):
     if sim.empty:
-        avg_daily_net_return = 0.0
-        expectancy_per_trade = 0.0
-        avg_daily_turnover = 0.0
-        round_trips = 0
-        return {
-            "metrics_schema_version": _METRICS_SCHEMA_VERSION,
-            "metrics_semantics": dict(_METRICS_SEMANTICS),
-            "oos_days": 0,
-            "turnover_days": 0,
-            "round_trips": round_trips,
-            "signal_cohorts": 0,
-            "independent_signal_cohorts": 0,
-            "avg_daily_net_return": avg_daily_net_return,
-            "expectancy_per_trade": expectancy_per_trade,
-            "avg_daily_turnover": avg_daily_turnover,
-            "cagr": 0.0,
-            "max_drawdown": 0.0,
-            "sharpe": 0.0,
-            "net_return_total": 0.0,
-            "trades": round_trips,
-            "expectancy": expectancy_per_trade,
-            "turnover": avg_daily_turnover,
-        }
+        return _metrics_record(
+            oos_days=0,
+            turnover_days=0,
+            round_trips=0,
+            signal_cohorts=0,
+            independent_signal_cohorts=0,
+            avg_daily_net_return=0.0,
+            expectancy_per_trade=0.0,
+            avg_daily_turnover=0.0,
+            cagr=0.0,
+            max_drawdown=0.0,
+            sharpe=0.0,
+            net_return_total=0.0,
+        )
 
     oos_days = len(sim)
     net_returns = pd.to_numeric(sim["net_return"], errors="coerce").fillna(0.0)
@@ -605,27 +758,98 @@ def _compute_metrics(sim, horizon=1):
     )
     avg_daily_turnover = float(turnover.mean())
 
-    return {
-        "metrics_schema_version": _METRICS_SCHEMA_VERSION,
-        "metrics_semantics": dict(_METRICS_SEMANTICS),
-        "oos_days": int(oos_days),
-        "turnover_days": turnover_days,
-        "round_trips": round_trips,
-        "signal_cohorts": signal_cohorts,
-        "independent_signal_cohorts": independent_signal_cohorts,
-        "avg_daily_net_return": avg_daily_net_return,
-        "expectancy_per_trade": expectancy_per_trade,
-        "avg_daily_turnover": avg_daily_turnover,
-        "cagr": cagr,
-        "max_drawdown": max_drawdown,
-        "sharpe": sharpe,
-        "net_return_total": total_return,
-        # Compatibility aliases. Their v2 meanings are explicitly declared in
-        # metrics_semantics; no turnover-day-only return mean is emitted.
-        "trades": round_trips,
-        "expectancy": expectancy_per_trade,
-        "turnover": avg_daily_turnover,
-    }
+    return _metrics_record(
+        oos_days=int(oos_days),
+        turnover_days=turnover_days,
+        round_trips=round_trips,
+        signal_cohorts=signal_cohorts,
+        independent_signal_cohorts=independent_signal_cohorts,
+        avg_daily_net_return=avg_daily_net_return,
+        expectancy_per_trade=expectancy_per_trade,
+        avg_daily_turnover=avg_daily_turnover,
+        cagr=cagr,
+        max_drawdown=max_drawdown,
+        sharpe=sharpe,
+        net_return_total=total_return,
+    )
+
+
+def _session_metrics(
+    market_rows,
+    *,
+    net_returns,
+    turnover,
+    exposure,
+    ending_exposure,
+    entry_cohorts,
+    horizon,
+):
+    """_compute_metrics() of K simulations that share one session axis.
+
+    Every keyword array is (sessions x K), one simulation per column.
+    Equity, drawdown, mean/std and the turnover / cohort counts are computed
+    for all columns together; the means and stds go through pandas on
+    (K x sessions) rows so each column reduces exactly like the per-simulation
+    Series does.
+    """
+
+    def _rows(values):
+        return np.ascontiguousarray(np.where(np.isnan(values), 0.0, values).T)
+
+    net_returns = _rows(net_returns)
+    turnover = _rows(turnover)
+    exposure = _rows(exposure)
+    ending_exposure = _rows(ending_exposure)
+    entry_cohorts = np.ascontiguousarray(entry_cohorts.T)
+
+    oos_days = net_returns.shape[1]
+    equity = np.cumprod(1.0 + net_returns, axis=1)
+    peaks = np.maximum.accumulate(equity, axis=1)
+    max_drawdowns = (equity / peaks - 1.0).min(axis=1)
+    means = pd.DataFrame(net_returns.T).mean().to_numpy()
+    stds = pd.DataFrame(net_returns.T).std(ddof=0).to_numpy()
+    avg_turnovers = pd.DataFrame(turnover.T).mean().to_numpy()
+    turnover_days = (turnover > 0).sum(axis=1)
+    signal_cohorts = entry_cohorts.sum(axis=1)
+    years = oos_days / 252.0
+
+    out = []
+    for k in range(net_returns.shape[0]):
+        final = equity[k, -1]
+        if years > 0 and final > 0:
+            cagr = float(final ** (1.0 / years) - 1.0)
+        else:
+            cagr = -1.0
+        avg_daily_net_return = float(means[k])
+        daily_std = float(stds[k])
+        if daily_std > 0:
+            sharpe = float(np.sqrt(252.0) * avg_daily_net_return / daily_std)
+        else:
+            sharpe = 0.0
+        round_trip_returns = _round_trip_returns(
+            net_returns[k], exposure[k], ending_exposure[k]
+        )
+        out.append(
+            _metrics_record(
+                oos_days=int(oos_days),
+                turnover_days=int(turnover_days[k]),
+                round_trips=len(round_trip_returns),
+                signal_cohorts=int(signal_cohorts[k]),
+                independent_signal_cohorts=_independent_cohort_count(
+                    market_rows, entry_cohorts[k], horizon
+                ),
+                avg_daily_net_return=avg_daily_net_return,
+                expectancy_per_trade=(
+                    float(np.mean(round_trip_returns)) if round_trip_returns else 0.0
+                ),
+                avg_daily_turnover=float(avg_turnovers[k]),
+                cagr=cagr,
+                max_drawdown=float(max_drawdowns[k]),
+                sharpe=sharpe,
+                net_return_total=float(final - 1.0),
+            )
+        )
+    return out
 
 
 def _sample_sufficiency(config, *, auto_threshold=False):
@@ -721,6 +945,168 @@ def _score_for_objective(metrics, objective):
     return float(metrics["avg_daily_net_return"])
 
 
+def _probability_bucket_candidates(oos, resolved, allow_short):
+    """Index of the first candidate of every class of equivalent threshold sets.
+
+    Each threshold only matters through the OOS rows it admits, i.e. its
+    position in the sorted finite prob_up (or volatility) values. Candidates
+    whose thresholds all fall into the same buckets open the same positions
+    on every row; sell / mild_sell open none when shorting is off.
+    """
+    prob_up = pd.to_numeric(oos["prob_up"], errors="coerce").to_numpy(dtype=float)
+    volatility = pd.to_numeric(oos["volatility"], errors="coerce").to_numpy(dtype=float)
+    prob_up = np.sort(prob_up[np.isfinite(prob_up)])
+    volatility = np.sort(volatility[np.isfinite(volatility)])
+
+    def _values(key):
+        return np.array([t[key] for t in resolved], dtype=float)
+
+    buckets = [
+        np.searchsorted(prob_up, _values("buy"), side="left"),
+        np.searchsorted(prob_up, _values("mild_buy"), side="left"),
+        np.searchsorted(volatility, _values("volatility_limit"), side="right"),
+    ]
+    if allow_short:
+        buckets += [
+            np.searchsorted(prob_up, _values("mild_sell"), side="right"),
+            np.searchsorted(prob_up, _values("sell"), side="right"),
+        ]
+    _, first = np.unique(np.column_stack(buckets), axis=0, return_index=True)
+    return np.sort(first)
+
+
+def _on_coarse_grid(thresholds):
+    """True when every threshold is an even-indexed auto-threshold grid value."""
+    for key, values in _AUTO_THRESHOLD_CANDIDATES.items():
+        index = np.flatnonzero(np.isclose(values, thresholds[key], rtol=0, atol=1e-9))
+        if index.size == 0 or index[0] % _COARSE_GRID_STEP:
+            return False
+    return True
+
+
+def _search_threshold_grid(
+    tuning_oos,
+    config,
+    candidates,
+    horizon,
+    *,
+    objective,
+    sample_metric,
+    min_sample_count,
+):
+    """
+    Metrics of every candidate _optimize_thresholds() has to compare.
+
+    Returns ({candidate index: metrics}, search stats). ``exhaustive``
+    evaluates every candidate. ``pruned`` (default) skips candidates that
+    cannot change the selection:
+
+      - equivalent: a later candidate in the same probability buckets as an
+        earlier one (_probability_bucket_candidates) has identical metrics and
+        so never outranks it,
+      - infeasible: a candidate opening n sleeves on executable rows has at
+        most n entry sessions, hence at most n independent signal cohorts and
+        at most 2n round trips (every episode starts at an entry or an exit
+        session); fewer than min_sample_count can never be selected,
+      - by score: avg_daily_net_return is additive over sleeves, so each
+        candidate's score is known up to rounding before simulating it. The
+        coarse grid (every other grid value per threshold) is evaluated first,
+        then the rest in descending estimated score, stopping once no
+        remaining estimate reaches the best feasible score found so far.
+
+    The comparison in candidate order only ever drops strictly lower-ranked
+    or tied-but-later candidates, so the selection matches ``exhaustive``.
+    When nothing is feasible every distinct candidate is evaluated, keeping
+    the best-any diagnostic identical as well.
+    """
+    mode = str(config.get("auto_threshold_search", "pruned")).strip().lower()
+    if mode == "exhaustive":
+        metrics = _threshold_grid_metrics(
+            tuning_oos, config, candidates, horizon=horizon
+        )
+        stats = {
+            "mode": mode,
+            "evaluated": len(candidates),
+            "coarse_evaluated": 0,
+            "pruned_equivalent": 0,
+            "pruned_infeasible": 0,
+            "pruned_by_score": 0,
+        }
+        return dict(enumerate(metrics)), stats
+    if mode != "pruned":
+        raise ValueError(f"unsupported threshold search mode: {mode!r}")
+
+    h = max(1, int(horizon))
+    allow_short = bool(config["allow_short"])
+    resolved = [resolve_thresholds(candidate) for candidate in candidates]
+    distinct = _probability_bucket_candidates(tuning_oos, resolved, allow_short)
+    positions = _position_matrix(
+        tuning_oos, [resolved[i] for i in distinct], allow_short
+    )
+    paths = tuning_oos.execution_path.paths(h)
+    opened = (positions[paths.valid] != 0.0).sum(axis=0)
+    if sample_metric == "round_trips":
+        opened = 2 * opened
+    feasible = opened >= min_sample_count
+    estimates = {}
+    sessions = len(np.unique(paths.market_rows[paths.valid]))
+    if objective == "avg_daily_net_return" and sessions:
+        # Per sleeve: sleeve * (sum of its path returns) - |sleeve| * 2 * fee.
+        sleeves = positions[paths.valid][:, feasible] / h
+        path_returns = paths.returns[paths.valid].sum(axis=1)[:, None]
+        costs = 2.0 * _fee_rate(config)
+        estimate = (sleeves * path_returns - np.abs(sleeves) * costs).sum(axis=0)
+        mass = (np.abs(sleeves) * (np.abs(path_returns) + costs)).sum(axis=0)
+        bounds = (estimate + 1e-9 * mass) / sessions + 1e-15
+        # NaN estimates (non-finite path returns) are never pruned.
+        bounds = np.where(np.isnan(bounds), np.inf, bounds)
+        estimates = dict(zip(distinct[feasible].tolist(), bounds.tolist()))
+
+    evaluated = {}
+    best = None
+
+    def _evaluate(indices):
+        nonlocal best
+        batch = _threshold_grid_metrics(
+            tuning_oos, config, [candidates[i] for i in indices], horizon=h
+        )
+        for i, metrics in zip(indices, batch):
+            evaluated[i] = metrics
+            if int(metrics[sample_metric]) >= min_sample_count:
+                score = _score_for_objective(metrics, objective)
+                best = score if best is None else max(best, score)
+
+    survivors = distinct[feasible].tolist()
+    coarse = [i for i in survivors if i == 0 or _on_coarse_grid(resolved[i])]
+    if coarse:
+        _evaluate(coarse)
+    remaining = [i for i in survivors if i not in evaluated]
+    remaining.sort(key=lambda i: -estimates.get(i, np.inf))
+    pruned_by_score = 0
+    while remaining:
+        if best is not None and estimates:
+            reachable = [i for i in remaining if not estimates[i] < best]
+            pruned_by_score += len(remaining) - len(reachable)
+            remaining = reachable
+            if not remaining:
+                break
+        _evaluate(remaining[:_REFINE_BATCH])
+        remaining = remaining[_REFINE_BATCH:]
+    unevaluated = [i for i in distinct.tolist() if i not in evaluated]
+    if best is None and unevaluated:
+        _evaluate(unevaluated)
+
+    stats = {
+        "mode": mode,
+        "evaluated": len(evaluated),
+        "coarse_evaluated": len(coarse),
+        "pruned_equivalent": len(candidates) - len(distinct),
+        "pruned_infeasible": int((~feasible).sum()) if best is not None else 0,
+        "pruned_by_score": pruned_by_score,
+    }
+    return evaluated, stats
+
+
 def _optimize_thresholds(tuning_oos, config, horizon=1):
     default_thresholds = resolve_thresholds()
     enabled = bool(config.get("auto_threshold_enabled", True))
@@ -747,11 +1133,19 @@ def _optimize_thresholds(tuning_oos, config, horizon=1):
     best_feasible = None
     default_candidate = None
 
-    for threshold in candidates:
-        sim = _simulate_strategy(
-            tuning_oos, config, thresholds=threshold, horizon=horizon
-        )
-        metrics = _compute_metrics(sim, horizon=horizon)
+    grid_metrics, search = _search_threshold_grid(
+        tuning_oos,
+        config,
+        candidates,
+        horizon,
+        objective=objective,
+        sample_metric=sample_metric,
+        min_sample_count=min_sample_count,
+    )
+    for index, threshold in enumerate(candidates):
+        if index not in grid_metrics:
+            continue
+        metrics = grid_metrics[index]
         score = _score_for_objective(metrics, objective)
         rank = (score, metrics["sharpe"], metrics["cagr"], metrics["net_return_total"])
         candidate = {
@@ -782,6 +1176,7 @@ def _optimize_thresholds(tuning_oos, config, horizon=1):
             "sample_sufficiency_metric": sample_metric,
             "min_sample_count": min_sample_count,
             "candidate_count": len(candidates),
+            "threshold_search": search,
             "selection": "default_no_feasible_candidate",
         }
         if selected_default is not None:
@@ -814,6 +1209,7 @@ def _optimize_thresholds(tuning_oos, config, horizon=1):
             "sample_sufficiency_metric": sample_metric,
             "min_sample_count": min_sample_count,
             "candidate_count": len(candidates),
+            "threshold_search": search,
             "selection": "default",
         }
 
@@ -828,6 +1224,7 @@ def _optimize_thresholds(tuning_oos, config, horizon=1):
         "sample_sufficiency_metric": sample_metric,
         "min_sample_count": min_sample_count,
         "candidate_count": len(candidates),
+        "threshold_search": search,
         "selection": "feasible_best",
         "selected_score": float(selected["score"]),
         "selected_round_trips": int(selected["round_trips"]),
@@ -837,7 +1234,12 @@ def _optimize_thresholds(tuning_oos, config, horizon=1):
     }
 
 
-def evaluate_kpi_gate(df, config, label_config=None):
+def evaluate_kpi_gate(df, config, label_config=None, *, ticker_code=None):
+    """Walk-forward KPI gate for one ticker's featured frame.
+
+    ``ticker_code`` only names the OOS cache entry (src/oos_cache.py) so
+    reruns on newer data replace the ticker's older entry.
+    """
     default_thresholds = resolve_thresholds()
     label_cfg = label_config or get_label_config()
     horizon = effective_horizon(label_cfg)
@@ -932,7 +1334,7 @@ def evaluate_kpi_gate(df, config, label_config=None):
             },
         }
 
-    oos = _collect_oos_predictions(labelled, config, horizon=horizon)
+    oos = _cached_oos_predictions(df, labelled, config, label_cfg, horizon, ticker_code)
     oos_training_splits = list(oos.attrs.get("training_splits") or [])
     tuning_oos, holdout_oos, split_info = _split_oos_for_thresholding(
         oos, config, horizon=horizon
@@ -0,0 +1,77 @@
+"""
+Opt-in compact dtypes for the Phase 2 long panel (TRADER_CS_COMPACT_DTYPES).
+
+build_cs_panel() produces one float64 column per feature and stores ``ticker``
+and ``sector`` as Python string objects, so a large universe over several
+years of sessions needs many GB. In compact mode each pipeline stage hands on
+a narrower frame:
+
+  - float64 feature columns become float32 once no later stage reads them at
+    full precision (prices, labels and execution prices never do),
+  - ``ticker`` / ``sector`` become categoricals whose categories are sorted,
+    so ``sort_values(["date", "ticker"])`` keeps the same row order,
+  - calendar features become int8.
+
+feature_matrix() hands LightGBM one column-major array in the frame's own
+float width, which LightGBM reads without a further conversion or copy.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from .feature_engine import CALENDAR_COLS
+
+CATEGORY_COLS = ("ticker", "sector")
+# float64 columns that compact_frame() never narrows: raw prices, labels and
+# execution prices feed returns and training targets, not split thresholds.
+FULL_PRECISION_COLS = (
+    "open",
+    "high",
+    "low",
+    "close",
+    "volume",
+    "fwd_return",
+    "target_vol_norm",
+    "target_up",
+    "target_rank_bucket",
+    "entry_price",
+    "execution_exit_price",
+)
+
+
+def compact_frame(frame: pd.DataFrame, keep=()) -> pd.DataFrame:
+    """``frame`` with compact dtypes; columns in ``keep`` stay float64."""
+    keep = set(FULL_PRECISION_COLS).union(keep)
+    dtypes = {}
+    for col, dtype in frame.dtypes.items():
+        if col in CATEGORY_COLS and not isinstance(dtype, pd.CategoricalDtype):
+            dtypes[col] = "category"
+        elif col in CALENDAR_COLS and pd.api.types.is_integer_dtype(dtype):
+            if dtype != np.int8:
+                dtypes[col] = np.int8
+        elif dtype == np.float64 and col not in keep:
+            dtypes[col] = np.float32
+    return frame.astype(dtypes) if dtypes else frame
+
+
+def frame_nbytes(frame: pd.DataFrame) -> int:
+    """Deep memory footprint of ``frame`` (strings and categories included)."""
+    return int(frame.memory_usage(deep=True, index=True).sum())
+
+
+def feature_matrix(frame: pd.DataFrame, columns: list[str]) -> np.ndarray:
+    """Column-major (rows x columns) float array of ``frame[columns]``.
+
+    float32 when every column already is (a compact panel), float64
+    otherwise; NA and missing columns are NaN.
+    """
+    present = [frame[col].dtype for col in columns if col in frame.columns]
+    narrow = bool(present) and all(dtype == np.float32 for dtype in present)
+    dtype = np.float32 if narrow else np.float64
+    out = np.full((len(frame), len(columns)), np.nan, dtype=dtype, order="F")
+    for j, col in enumerate(columns):
+        if col in frame.columns:
+            out[:, j] = frame[col].to_numpy(dtype=dtype, na_value=np.nan)
+    return out
@@ -243,6 +243,9 @@ def get_backtest_gate_config():
         ),
         "auto_threshold_objective": _get_auto_threshold_objective(),
         "auto_threshold_min_gap": _get_env_float("TRADER_AUTO_THRESHOLD_MIN_GAP", 0.05),
+        "auto_threshold_search": _get_env_choice(
+            "TRADER_AUTO_THRESHOLD_SEARCH", "pruned", {"pruned", "exhaustive"}
+        ),
     }
     # Deprecated dictionary aliases remain readable by older reports/scripts.
     # Semantics are canonical: completed position episodes and all-day returns.
@@ -316,6 +319,7 @@ def get_cross_section_config():
             1, _get_env_int("TRADER_CS_PANEL_LOOKBACK_YEARS", 5)
         ),
         "universe_target_size": _get_env_int("TRADER_UNIVERSE_TARGET_SIZE", 40),
+        "compact_dtypes": _get_env_bool("TRADER_CS_COMPACT_DTYPES", False),
     }
 
 
@@ -12,9 +12,10 @@ Assembles a long panel (one row per date × ticker) with:
 Design constraints
 ------------------
 - NO future leakage: all cross-sectional normalizations use only same-date rows
-  (groupby("date").transform). Labels apply the shared execution contract per
-  ticker: decide with the current close, enter at the next session open, and
-  exit at the H-th session close. There is no cross-ticker contamination.
+  (within-date groups, src/cs_features.py). Labels apply the shared execution
+  contract per ticker: decide with the current close, enter at the next
+  session open, and exit at the H-th session close. There is no cross-ticker
+  contamination.
 - Robustness: missing macro / sector / liquidity never raise; they leave NaN
   columns that LightGBM tolerates.
 - Deterministic: no random state in pure functions.
@@ -27,7 +28,14 @@ import math
 import numpy as np
 import pandas as pd
 
+from .compact_dtypes import compact_frame
 from .config import get_cross_section_config
+from .cs_features import (
+    group_codes,
+    group_ranks,
+    group_zscores_and_ranks,
+    value_matrix,
+)
 from .execution import (
     ENTRY_PRICE_BASIS,
     EXECUTION_CONTRACT_VERSION,
@@ -36,6 +44,7 @@ from .execution import (
 )
 from .macro import MACRO_FEATURE_COLS
 from .model import build_feature_frame
+from .panel_features import panel_feature_frame, panel_inputs
 
 # ---------------------------------------------------------------------------
 # Module-level column lists (stable contract — Tasks 4/5 depend on these)
@@ -55,6 +64,13 @@ CS_BASE_FEATURES = [
 # Features that also get a within-date, within-SECTOR relative rank.
 SECTOR_REL_FEATURES = ["return_20d", "return_5d"]
 
+# Columns the CS-feature / label stages read; compact build_cs_panel() keeps
+# them in float64 until those stages have run.
+CS_INPUT_COLS = list(dict.fromkeys(CS_BASE_FEATURES + SECTOR_REL_FEATURES)) + [
+    "turnover"
+]
+LABEL_INPUT_COLS = ["volatility"]
+
 
 # ---------------------------------------------------------------------------
 # 1. build_ticker_feature_frame
@@ -119,11 +135,34 @@ def build_panel(
     """
     Build a stacked LONG panel from a list of (ticker_info, ohlcv_df) tuples.
 
-    Each entry is processed by build_ticker_feature_frame; empty results are
-    skipped. The resulting rows are concatenated and sorted by ["date", "ticker"].
+    Plain date + OHLCV frames are computed for all tickers at once on the
+    (date × ticker) grid (src/panel_features.py), which emits the panel
+    already sorted by ["date", "ticker"]. Other inputs go through
+    build_panel_per_ticker, with the same result.
 
     Returns an empty DataFrame when no ticker yields usable data.
     """
+    inputs = panel_inputs(tickers_data)
+    if inputs is not None:
+        return panel_feature_frame(
+            inputs, macro_panel=macro_panel, macro_enabled=macro_enabled
+        )
+    return build_panel_per_ticker(
+        tickers_data, macro_panel=macro_panel, macro_enabled=macro_enabled
+    )
+
+
+def build_panel_per_ticker(
+    tickers_data: list[tuple[dict, pd.DataFrame]],
+    macro_panel: pd.DataFrame | None = None,
+    macro_enabled: bool = True,
+) -> pd.DataFrame:
+    """
+    build_panel one ticker at a time.
+
+    Each entry is processed by build_ticker_feature_frame; empty results are
+    skipped. The resulting rows are concatenated and sorted by ["date", "ticker"].
+    """
     frames: list[pd.DataFrame] = []
     for ticker_info, ohlcv_df in tickers_data:
         try:
@@ -161,34 +200,36 @@ def add_cross_sectional_features(panel: pd.DataFrame) -> pd.DataFrame:
       - ``cs_rank_<f>`` : within-date percentile rank in (0, 1] via
                           rank(pct=True, method="average"). NaN stays NaN.
 
-    Uses only same-date rows — NO future leakage.
+    Uses only same-date rows — NO future leakage. Dates are factorized once
+    and all features are computed together (src/cs_features.py).
     """
-    panel = panel.copy()
+    return _with_columns(panel, _cross_sectional_columns(panel))
 
-    for f in CS_BASE_FEATURES:
-        if f not in panel.columns:
-            continue
 
-        g = panel.groupby("date")[f]
+def _date_groups(panel: pd.DataFrame) -> tuple[np.ndarray, int]:
+    return group_codes(panel["date"])
 
-        # --- z-score (NaN-aware, population std ddof=0) ---
-        mean = g.transform("mean")
-        std_pop = g.transform(lambda s: s.std(ddof=0))
 
-        col_z = f"cs_z_{f}"
-        raw = panel[f]
-        denom = std_pop.where(std_pop > 0)  # NaN when std==0 or NaN
-        z = (raw - mean) / denom
-        # Where x is finite but denom is NaN -> z becomes NaN; replace with 0.0
-        finite_x = raw.notna() & np.isfinite(raw.values.astype(float))
-        bad_denom = denom.isna()
-        z = z.where(~(finite_x & bad_denom), other=0.0)
-        panel[col_z] = z
+def _cross_sectional_columns(panel, date_groups=None) -> dict[str, np.ndarray]:
+    features = [f for f in CS_BASE_FEATURES if f in panel.columns]
+    if not features:
+        return {}
+    codes, n_groups = date_groups or _date_groups(panel)
+    z, ranks = group_zscores_and_ranks(
+        value_matrix(panel, features), codes, n_groups
+    )
+    columns: dict[str, np.ndarray] = {}
+    for j, f in enumerate(features):
+        columns[f"cs_z_{f}"] = z[:, j]
+        columns[f"cs_rank_{f}"] = ranks[:, j]
+    return columns
 
-        # --- percentile rank ---
-        col_r = f"cs_rank_{f}"
-        panel[col_r] = g.rank(pct=True, method="average")
 
+def _with_columns(panel: pd.DataFrame, columns: dict) -> pd.DataFrame:
+    """Copy of ``panel`` with ``columns`` set, in a single assignment."""
+    panel = panel.copy()
+    if columns:
+        panel[list(columns)] = pd.DataFrame(columns, index=panel.index)
     return panel
 
 
@@ -206,22 +247,19 @@ def add_sector_features(panel: pd.DataFrame) -> pd.DataFrame:
     Rows with sector None form their own group via a ``"__NA__"`` sentinel,
     so they are ranked among themselves rather than silently dropped.
     """
-    panel = panel.copy()
+    return _with_columns(panel, _sector_columns(panel))
 
-    # Fill sentinel for None/NaN sectors so they are not dropped by groupby.
-    sector_col = panel["sector"].fillna("__NA__")
 
-    for f in SECTOR_REL_FEATURES:
-        if f not in panel.columns:
-            continue
-        col_r = f"sect_rank_{f}"
-        panel[col_r] = (
-            panel.groupby([panel["date"], sector_col])[f]
-            .rank(pct=True, method="average")
-            .values  # align back by position (same order)
-        )
-
-    return panel
+def _sector_columns(panel: pd.DataFrame) -> dict[str, np.ndarray]:
+    features = [f for f in SECTOR_REL_FEATURES if f in panel.columns]
+    if not features:
+        return {}
+    # Fill sentinel for None/NaN sectors so they are not dropped by grouping.
+    # As objects: a compact (categorical) sector has no "__NA__" category.
+    sectors = panel["sector"].astype(object).fillna("__NA__")
+    codes, n_groups = group_codes(panel["date"], sectors)
+    ranks = group_ranks(value_matrix(panel, features), codes, n_groups)
+    return {f"sect_rank_{f}": ranks[:, j] for j, f in enumerate(features)}
 
 
 # ---------------------------------------------------------------------------
@@ -239,39 +277,45 @@ def add_liquidity_features(panel: pd.DataFrame) -> pd.DataFrame:
 
     Additionally adds ``cs_rank_turnover`` (within-date pct rank of turnover).
     """
-    panel = panel.copy()
+    return _with_columns(panel, _liquidity_columns(panel))
+
+
+def _liquidity_columns(
+    panel, present=(), date_groups=None
+) -> dict[str, np.ndarray]:
+    """The liquidity columns missing from both ``panel`` and ``present``."""
+    missing = [
+        col
+        for col in ("cs_z_adv20", "cs_rank_adv20", "cs_rank_turnover")
+        if col not in panel.columns and col not in present
+    ]
+    if not missing:
+        return {}
+    columns = {col: np.full(len(panel), np.nan) for col in missing}
+    date_groups = date_groups or _date_groups(panel)
+    adv_missing = [col for col in missing if col != "cs_rank_turnover"]
+    if adv_missing and "adv20" in panel.columns:
+        z, ranks = group_zscores_and_ranks(
+            value_matrix(panel, ["adv20"]), *date_groups
+        )
+        computed = {"cs_z_adv20": z[:, 0], "cs_rank_adv20": ranks[:, 0]}
+        columns.update({col: computed[col] for col in adv_missing})
+    if "cs_rank_turnover" in missing and "turnover" in panel.columns:
+        ranks = group_ranks(value_matrix(panel, ["turnover"]), *date_groups)
+        columns["cs_rank_turnover"] = ranks[:, 0]
+    return columns
 
-    # Idempotent: adv20 cross-sectional columns (added by add_cross_sectional_features).
-    for col in ("cs_z_adv20", "cs_rank_adv20"):
-        if col not in panel.columns:
-            # Fallback: add from raw adv20 if present.
-            if "adv20" in panel.columns:
-                g = panel.groupby("date")["adv20"]
-                if col == "cs_z_adv20":
-                    mean = g.transform("mean")
-                    std_pop = g.transform(lambda s: s.std(ddof=0))
-                    denom = std_pop.where(std_pop > 0)
-                    raw = panel["adv20"]
-                    z = (raw - mean) / denom
-                    finite_x = raw.notna() & np.isfinite(raw.values.astype(float))
-                    bad_denom = denom.isna()
-                    z = z.where(~(finite_x & bad_denom), other=0.0)
-                    panel[col] = z
-                else:
-                    panel[col] = g.rank(pct=True, method="average")
-            else:
-                panel[col] = np.nan
-
-    # Within-date percentile rank of raw turnover.
-    if "cs_rank_turnover" not in panel.columns:
-        if "turnover" in panel.columns:
-            panel["cs_rank_turnover"] = panel.groupby("date")["turnover"].rank(
-                pct=True, method="average"
-            )
-        else:
-            panel["cs_rank_turnover"] = np.nan
 
-    return panel
+def add_panel_cs_features(panel: pd.DataFrame) -> pd.DataFrame:
+    """
+    add_cross_sectional_features + add_sector_features +
+    add_liquidity_features with one date factorization and one panel copy.
+    """
+    date_groups = _date_groups(panel)
+    columns = _cross_sectional_columns(panel, date_groups)
+    columns.update(_sector_columns(panel))
+    columns.update(_liquidity_columns(panel, columns, date_groups))
+    return _with_columns(panel, columns)
 
 
 # ---------------------------------------------------------------------------
@@ -323,7 +367,9 @@ def build_cs_labels(
     # stacked panel) is the isolation boundary that prevents a ticker's last
     # row from using another ticker's first open/close.
     labelled_groups: list[pd.DataFrame] = []
-    for _, grp in panel.groupby("ticker", sort=False, dropna=False):
+    for _, grp in panel.groupby(
+        "ticker", sort=False, dropna=False, observed=True
+    ):
         ordered = grp.sort_values("date").reset_index(drop=True)
         labelled_groups.append(add_execution_columns(ordered, h))
 
@@ -447,6 +493,7 @@ def build_cs_panel(
     macro_enabled: bool = True,
     with_labels: bool = True,
     label_config: dict | None = None,
+    compact: bool | None = None,
 ) -> pd.DataFrame:
     """
     Full cross-sectional panel pipeline.
@@ -455,23 +502,31 @@ def build_cs_panel(
       1. build_panel
       2. add_cross_sectional_features
       3. add_sector_features
-      4. add_liquidity_features
+      4. add_liquidity_features  (2-4 in one pass: add_panel_cs_features)
       5. (if with_labels) build_cs_labels
 
+    compact (default: get_cross_section_config()["compact_dtypes"]) narrows
+    every stage's output with compact_frame(), keeping the columns a later
+    stage still reads (CS inputs, volatility) in float64 until it has run.
+
     Does NOT drop small-group dates or NaN labels — caller decides.
     Suitable for both training (with_labels=True) and daily inference
     (with_labels=False, then take the latest date).
     """
+    if compact is None:
+        compact = get_cross_section_config()["compact_dtypes"]
     panel = build_panel(
         tickers_data, macro_panel=macro_panel, macro_enabled=macro_enabled
     )
     if panel.empty:
         return panel
 
-    panel = add_cross_sectional_features(panel)
-    panel = add_sector_features(panel)
-    panel = add_liquidity_features(panel)
+    if compact:
+        panel = compact_frame(panel, keep=CS_INPUT_COLS + LABEL_INPUT_COLS)
+    panel = add_panel_cs_features(panel)
     if with_labels:
+        if compact:
+            panel = compact_frame(panel, keep=LABEL_INPUT_COLS)
         panel = build_cs_labels(panel, label_config=label_config)
 
-    return panel
+    return compact_frame(panel) if compact else panel
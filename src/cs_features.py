@@ -0,0 +1,214 @@
+"""
+Within-group z-scores and percentile ranks behind the cross-sectional features.
+
+add_cross_sectional_features() used to call ``groupby("date")`` once per
+CS_BASE_FEATURES column and compute the within-date std with a Python lambda
+per date, and add_sector_features() / add_liquidity_features() grouped the
+panel again. This module factorizes the grouping key once and computes every
+feature of a (rows x features) array together:
+
+  - the rows are laid out on a (feature x group x slot) grid, NaN-padded, so
+    the counts, means, population variances and the within-group sort of all
+    features are single reductions / one argsort along the slot axis,
+  - within a group, tied values share the average of their 1-based positions
+    and NaN sort last, exactly like ``rank(method="average", pct=True)``,
+  - when the groups are so uneven that the padding would exceed
+    MAX_GRID_FILL times the rows (e.g. one large sector among many small
+    ones), the same statistics come from flat (feature, group) keys with
+    np.bincount and one argsort of the keys instead.
+
+Semantics follow the groupby implementation: NaN values are ignored, rows
+without a group (NaT date) get no rank, and a z-score whose group std is zero
+or undefined is 0.0 for a finite value and NaN otherwise. A group whose
+values are all equal has std exactly 0 here, where the two-pass float std
+could leave a rounding residue.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+# Largest (group x slot) grid, relative to the grouped rows, worth padding to.
+MAX_GRID_FILL = 2
+
+
+def group_codes(dates, sectors=None) -> tuple[np.ndarray, int]:
+    """Dense group id per row (date, or date x sector) and the group count.
+
+    Rows with a missing date get -1 and stay out of every group, like
+    groupby's default dropna; missing sectors must be filled by the caller.
+    """
+    codes, uniques = pd.factorize(dates)
+    if sectors is None:
+        return codes.astype(np.int64), len(uniques)
+    sector_codes, sector_uniques = pd.factorize(sectors)
+    grouped = codes >= 0
+    pairs = (
+        codes[grouped].astype(np.int64) * len(sector_uniques) + sector_codes[grouped]
+    )
+    dense, pair_uniques = pd.factorize(pairs)
+    out = np.full(len(codes), -1, dtype=np.int64)
+    out[grouped] = dense
+    return out, len(pair_uniques)
+
+
+def value_matrix(panel: pd.DataFrame, columns: list[str]) -> np.ndarray:
+    """float64 (rows x columns) array of ``panel[columns]``, NaN for NA."""
+    out = np.empty((len(panel), len(columns)))
+    for j, col in enumerate(columns):
+        out[:, j] = panel[col].to_numpy(dtype=np.float64, na_value=np.nan)
+    return out
+
+
+def group_ranks(
+    values: np.ndarray, codes: np.ndarray, n_groups: int
+) -> np.ndarray:
+    """Within-group ``rank(pct=True, method="average")`` of every column."""
+    return _group_stats(values, codes, n_groups, zscore=False)[1]
+
+
+def group_zscores_and_ranks(
+    values: np.ndarray, codes: np.ndarray, n_groups: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Within-group (z-score with ddof=0, pct rank) of every column."""
+    return _group_stats(values, codes, n_groups, zscore=True)
+
+
+def _group_stats(values, codes, n_groups, zscore):
+    """(z-scores or None, ranks), both shaped like ``values``."""
+    rows = np.flatnonzero(codes >= 0)
+    if (np.diff(codes[rows]) < 0).any():
+        rows = rows[np.argsort(codes[rows], kind="stable")]
+    elif len(rows) == len(codes):  # a date-sorted panel: no row shuffling
+        return _stats(values, codes, n_groups, zscore)
+
+    z = np.where(np.isfinite(values), 0.0, np.nan) if zscore else None
+    ranks = np.full(values.shape, np.nan)
+    if len(rows):
+        group_z, ranks[rows] = _stats(values[rows], codes[rows], n_groups, zscore)
+        if zscore:
+            z[rows] = group_z
+    return z, ranks
+
+
+def _stats(values, codes, n_groups, zscore):
+    """_grid_stats() or _flat_stats() for rows sorted by their group."""
+    sizes = np.bincount(codes, minlength=n_groups)
+    if n_groups * sizes.max() <= MAX_GRID_FILL * len(codes):
+        return _grid_stats(values, codes, sizes, zscore)
+    return _flat_stats(values, codes, sizes, zscore)
+
+
+def _zscores(values, mean, std, low, high):
+    """(x - mean) / std, 0.0 for finite x where std is zero or undefined."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        std = np.where(low == high, 0.0, std)  # all-equal groups: no spread
+        denom = np.where(std > 0, std, np.nan)
+        z = (values - mean) / denom
+    return np.where(np.isfinite(values) & np.isnan(denom), 0.0, z)
+
+
+def _grid_stats(values, codes, sizes, zscore):
+    """Statistics on a NaN-padded (feature x group x slot) grid.
+
+    ``values`` rows are sorted by ``codes``.
+    """
+    n_features = values.shape[1]
+    n_groups, n_slots = len(sizes), int(sizes.max())
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    cells = codes * n_slots + np.arange(len(codes)) - starts[codes]
+    grid = np.full((n_features, n_groups * n_slots), np.nan)
+    grid[:, cells] = values.T
+    grid = grid.reshape(n_features, n_groups, n_slots)
+
+    order = np.argsort(grid, axis=-1)  # NaN last
+    ordered = np.take_along_axis(grid, order, axis=-1)
+    valid = ~np.isnan(grid)
+    counts = valid.sum(axis=-1, keepdims=True)
+
+    # Runs of tied values share the average of their 1-based positions.
+    position = np.arange(n_slots)
+    tied = ordered[..., 1:] == ordered[..., :-1]
+    if tied.any():
+        run_start = np.ones(ordered.shape, dtype=bool)
+        run_start[..., 1:] = ~tied
+        first = np.maximum.accumulate(np.where(run_start, position, 0), axis=-1)
+        run_end = np.ones(ordered.shape, dtype=bool)
+        run_end[..., :-1] = run_start[..., 1:]
+        last = np.minimum.accumulate(
+            np.where(run_end, position, n_slots)[..., ::-1], axis=-1
+        )[..., ::-1]
+        average = (first + last) / 2 + 1
+    else:
+        average = position + 1.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sorted_ranks = np.where(position < counts, average / counts, np.nan)
+    ranks = np.empty(grid.shape)
+    np.put_along_axis(ranks, order, sorted_ranks, axis=-1)
+    ranks = ranks.reshape(n_features, -1).take(cells, axis=1).T
+    if not zscore:
+        return None, ranks
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.where(valid, grid, 0.0).sum(axis=-1, keepdims=True) / counts
+        deviation = grid - mean
+        squares = np.where(valid, deviation * deviation, 0.0)
+        var = squares.sum(axis=-1, keepdims=True) / counts
+    low = ordered[..., :1]
+    high = np.take_along_axis(ordered, np.maximum(counts - 1, 0), axis=-1)
+    z = _zscores(grid, mean, np.sqrt(var), low, high)
+    return z.reshape(n_features, -1).take(cells, axis=1).T, ranks
+
+
+def _flat_stats(values, codes, sizes, zscore):
+    """Statistics on flat (feature, group) keys, for very uneven groups.
+
+    ``values`` rows are sorted by ``codes``.
+    """
+    n_rows, n_features = values.shape
+    n_keys = n_features * len(sizes)
+    flat = values.T.ravel()
+    keys = (np.arange(n_features)[:, None] * len(sizes) + codes).ravel()
+    valid = ~np.isnan(flat)
+    counts = np.bincount(keys, weights=valid, minlength=n_keys).astype(np.int64)
+    key_starts = np.concatenate(
+        [[0], np.cumsum(np.bincount(keys, minlength=n_keys))[:-1]]
+    )
+
+    # One argsort of (key, position in value order): within a key, values
+    # ascend and NaN come last.
+    value_pos = np.empty(len(flat), dtype=np.int64)
+    value_pos[np.argsort(flat)] = np.arange(len(flat))
+    order = np.argsort(keys * len(flat) + value_pos)
+    ordered = flat[order]
+    position = np.arange(len(flat)) - key_starts[keys]  # keys ascend already
+
+    # Runs of tied values share the average of their 1-based positions.
+    run_start = position == 0
+    run_start[1:] |= ordered[1:] != ordered[:-1]
+    run_id = np.cumsum(run_start) - 1
+    run_length = np.bincount(run_id)
+    average = position[run_start][run_id] + (run_length[run_id] + 1) / 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sorted_ranks = np.where(
+            position < counts[keys], average / counts[keys], np.nan
+        )
+    ranks = np.empty(len(flat))
+    ranks[order] = sorted_ranks
+    ranks = ranks.reshape(n_features, n_rows).T
+    if not zscore:
+        return None, ranks
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        total = np.bincount(
+            keys, weights=np.where(valid, flat, 0.0), minlength=n_keys
+        )
+        mean = (total / counts)[keys]
+        deviation = flat - mean
+        squares = np.where(valid, deviation * deviation, 0.0)
+        std = np.sqrt(np.bincount(keys, weights=squares, minlength=n_keys) / counts)
+    low = ordered[key_starts]
+    high = ordered[key_starts + np.maximum(counts - 1, 0)]
+    z = _zscores(flat, mean, std[keys], low[keys], high[keys])
+    return z.reshape(n_features, n_rows).T, ranks
@@ -41,6 +41,7 @@ import numpy as np
 import pandas as pd
 
 from .calibration import brier_score
+from .compact_dtypes import feature_matrix
 from .config import BACKTEST_GATE_CONFIG, get_cross_section_config
 from .cross_section import cross_sectional_feature_cols, drop_small_date_groups
 
@@ -221,13 +222,12 @@ def train_cs_model(panel, config=None, *, macro_enabled: bool = True, seed: int
         if booster is None:
             continue
 
-        val_X = val_rows[feature_cols]
-        preds = booster.predict(val_X)
+        preds = booster.predict(feature_matrix(val_rows, feature_cols))
 
         part = pd.DataFrame(
             {
                 "date": val_rows["date"].values,
-                "ticker": val_rows["ticker"].values,
+                "ticker": val_rows["ticker"].to_numpy(),  # str, even if categorical
                 "raw_score": np.asarray(preds, dtype="float64"),
                 "fwd_return": pd.to_numeric(
                     val_rows.get("fwd_return"), errors="coerce"
@@ -331,17 +331,19 @@ def _fit_booster(rows, feature_cols, label_col, objective, seed):
     """Train one booster on a date-sorted frame. Returns None on failure."""
     if rows.empty:
         return None
-    X = rows[feature_cols]
+    # One float array in the panel's own width: LightGBM reads it in place.
+    X = feature_matrix(rows, feature_cols)
     y = pd.to_numeric(rows[label_col], errors="coerce").to_numpy()
     params = _lgb_params(objective, seed)
+    named = {"feature_name": list(feature_cols), "free_raw_data": False}
 
     if objective == "ranker":
         group = _group_sizes(rows)
         if sum(group) != len(rows):  # defensive: should never trip
             return None
-        dataset = lgb.Dataset(X, label=y, group=group, free_raw_data=False)
+        dataset = lgb.Dataset(X, label=y, group=group, **named)
     else:
-        dataset = lgb.Dataset(X, label=y, free_raw_data=False)
+        dataset = lgb.Dataset(X, label=y, **named)
 
     try:
         booster = lgb.train(params, dataset, num_boost_round=_NUM_BOOST_ROUND)
@@ -443,12 +445,12 @@ def predict_cs_model(bundle, latest_panel) -> pd.DataFrame:
     feature_cols = bundle.get("feature_cols")
     if not feature_cols:
         feature_cols = (bundle.get("feature_schema") or {}).get("feature_cols", [])
-    X = rows.reindex(columns=feature_cols)  # missing cols -> NaN (LightGBM tolerates)
+    X = feature_matrix(rows, feature_cols)  # missing cols -> NaN (LightGBM tolerates)
 
     raw_score = np.asarray(bundle["booster"].predict(X), dtype="float64")
     out = pd.DataFrame(
         {
-            "ticker": rows["ticker"].values,
+            "ticker": rows["ticker"].to_numpy(),
             "raw_score": raw_score,
         }
     )
@@ -19,7 +19,7 @@ from .config import (
     get_model_runtime_config,
 )
 from .data_loader import load_data
-from .model import add_features
+from .model import FEATURE_WARMUP_ROWS, technical_features
 from . import db, model_store, performance
 from .db_records import summarize_performance
 from .execution import EXECUTION_CONTRACT_VERSION, execution_contract_metadata
@@ -398,10 +398,12 @@ def export_dashboard_data():
         latest_signal = signal_history[0]["signal"] if signal_history else None
 
         records: list[dict[str, Any]] = []
-        df = load_data(code)
+        df = load_data(
+            code, tail_rows=MAX_DASHBOARD_ROWS, warmup_rows=FEATURE_WARMUP_ROWS
+        )
         if df is not None and not df.empty:
             # Add features without dropping NaNs to preserve chart continuity.
-            featured = add_features(df, dropna=False)
+            featured = technical_features(df, dropna=False, ticker_code=code)
             records = _to_dashboard_records(featured)
 
         latest_data = records[-1] if records else None
@@ -1,13 +1,19 @@
 import io
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, date, datetime, timedelta
+from functools import partial
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
 import requests
 import yfinance as yf
 
+from . import feature_state, feature_store, price_store, provider_health, run_cache
 from .config import DATA_DIR
 from .env import get_env_bool, get_env_float, get_env_int
 from .timeutil import today_jst
@@ -17,7 +23,29 @@ DEFAULT_HTTP_TIMEOUT_SEC = 20
 DEFAULT_STALE_OPEN_DAYS = 0
 DEFAULT_YF_FALLBACK_ENABLED = True
 DEFAULT_MAX_DAILY_MOVE = 0.50
+DEFAULT_SKIP_FRESH = True
+DEFAULT_DELTA_ENABLED = True
+DEFAULT_APPEND_ENABLED = True
+# Delta files per ticker before they are folded back into the base parquet.
+DEFAULT_COMPACT_EVERY = 20
+DEFAULT_DELTA_OVERLAP_DAYS = 10
+DEFAULT_VERIFY_ON_LOAD = False
+# Parquet footer key of the write-time validation record (see _validation_record).
+VALIDATION_META_KEY = "trader.ohlcv_validation"
+VALIDATION_RECORD_VERSION = 1
+# Stored and re-fetched overlap prices must agree to this relative tolerance;
+# a back-adjusted restatement moves them by far more than float noise.
+DELTA_OVERLAP_RTOL = 1e-4
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_PER_HOST_RATE = 2.0
+# yfinance.download() keeps per-call results in module-level dicts, so two
+# concurrent downloads can clobber each other; it stays serialized.
+DEFAULT_PROVIDER_CONCURRENCY = {"stooq": 4, "yfinance": 1}
+DEFAULT_YF_BATCH_ENABLED = True
+# Symbols per multi-ticker yfinance request in the batched fallback.
+DEFAULT_YF_BATCH_SIZE = 40
 JPX_HOLIDAY_CACHE = DATA_DIR / "jpx_holidays.json"
+_PROVIDER_LABELS = {"stooq": "Stooq", "yfinance": "yfinance"}
 
 
 _get_env_int = get_env_int
@@ -136,6 +164,12 @@ def _normalize_ohlcv(df):
     return normalized
 
 
+def _max_daily_move() -> float:
+    return max(
+        0.0, _get_env_float("TRADER_DATA_MAX_DAILY_MOVE", DEFAULT_MAX_DAILY_MOVE)
+    )
+
+
 def _validate_ohlcv(df, ticker_code=None, source=None):
     if df is None or df.empty:
         return df
@@ -175,9 +209,7 @@ def _validate_ohlcv(df, ticker_code=None, source=None):
             validated = validated.loc[relation_mask].copy()
 
     if not validated.empty:
-        max_daily_move = max(
-            0.0, _get_env_float("TRADER_DATA_MAX_DAILY_MOVE", DEFAULT_MAX_DAILY_MOVE)
-        )
+        max_daily_move = _max_daily_move()
         if max_daily_move > 0:
             daily_moves = validated["close"].pct_change().abs()
             extreme_moves = daily_moves[daily_moves > max_daily_move]
@@ -195,6 +227,189 @@ def _validate_ohlcv(df, ticker_code=None, source=None):
     return validated
 
 
+def _validation_record(validated) -> dict:
+    """
+    Validation record stored in the footer of every parquet update_data writes.
+
+    Written rows already passed the row-dropping checks, so validating them
+    again on load can only reproduce the extreme close-move warnings. The
+    record keeps those moves by date so a load of any window can rebuild its
+    warnings without re-normalizing or re-validating the rows.
+    """
+    threshold = _max_daily_move()
+    moves = {}
+    if threshold > 0 and len(validated) > 1:
+        daily_moves = validated["close"].pct_change().abs()
+        hit = daily_moves > threshold
+        moves = {
+            ts.strftime("%Y-%m-%d"): float(move)
+            for ts, move in zip(validated.loc[hit, "date"], daily_moves[hit])
+        }
+    return {
+        "version": VALIDATION_RECORD_VERSION,
+        "max_daily_move": threshold,
+        "extreme_moves": moves,
+    }
+
+
+def _validation_metadata(validated) -> dict:
+    return {VALIDATION_META_KEY: _validation_record(validated)}
+
+
+def _stored_validation(file_path) -> dict | None:
+    """Merged validation record of a ticker file and its deltas.
+
+    None when any fragment lacks a record, or it was written by another
+    record version or under a different TRADER_DATA_MAX_DAILY_MOVE.
+    """
+    threshold = _max_daily_move()
+    moves = {}
+    for record in price_store.read_metadata(file_path, VALIDATION_META_KEY):
+        if (
+            not isinstance(record, dict)
+            or record.get("version") != VALIDATION_RECORD_VERSION
+            or record.get("max_daily_move") != threshold
+        ):
+            return None
+        moves.update(record.get("extreme_moves") or {})
+    return {
+        "version": VALIDATION_RECORD_VERSION,
+        "max_daily_move": threshold,
+        "extreme_moves": moves,
+    }
+
+
+def _from_validated_store(df, record, ticker_code=None, source=None):
+    """Stored rows as _validate_ohlcv would return them, warnings from record."""
+    frame = df.reset_index(drop=True)
+    warnings = []
+    if len(frame) > 1:
+        first, last = frame["date"].iloc[0], frame["date"].iloc[-1]
+        # A move is visible only when its previous session is loaded too.
+        moves = [
+            move
+            for day, move in record["extreme_moves"].items()
+            if first < pd.Timestamp(day) <= last
+        ]
+        if moves:
+            warnings.append(f"extreme_close_move:{len(moves)} max={max(moves):.1%}")
+    if warnings:
+        label = f"{ticker_code or 'unknown'}" + (f"/{source}" if source else "")
+        print(f"OHLCV validation warnings for {label}: {', '.join(warnings)}")
+    frame.attrs["validation_warnings"] = warnings
+    return frame
+
+
+def read_validated_file(
+    file_path, ticker_code=None, *, source="local", start=None, end=None, verify=None
+):
+    """
+    Validated OHLCV rows of one stored ticker file (base + deltas), or None.
+
+    Files written by update_data() carry a validation record in their parquet
+    footer; their rows are returned as stored, with warnings rebuilt from the
+    record, instead of being re-normalized and re-validated. Other files
+    (legacy, or written under a different TRADER_DATA_MAX_DAILY_MOVE) go
+    through _normalize_ohlcv/_validate_ohlcv as before. verify=True (or
+    TRADER_DATA_VERIFY_ON_LOAD=true) always runs the full validation.
+    An empty window returns an empty frame; missing OHLCV columns return None.
+    """
+    if verify is None:
+        verify = _get_env_bool("TRADER_DATA_VERIFY_ON_LOAD", DEFAULT_VERIFY_ON_LOAD)
+    record = None if verify else _stored_validation(file_path)
+    df = price_store.read_ticker_file(file_path, start=start, end=end)
+    if df.empty:
+        return df
+    if record is not None and list(df.columns) == REQUIRED_COLS:
+        return _from_validated_store(df, record, ticker_code, source)
+    normalized = _normalize_ohlcv(df)
+    if normalized is None:
+        return None
+    return _validate_ohlcv(normalized, ticker_code=ticker_code, source=source)
+
+
+def _compact(file_path, ticker_code=None) -> bool:
+    """Fold a ticker's deltas into its base file, keeping a validation record."""
+    if not price_store.delta_paths(file_path):
+        return False
+    record = _stored_validation(file_path)
+    if record is not None:
+        return price_store.compact(file_path, {VALIDATION_META_KEY: record})
+    validated = read_validated_file(file_path, ticker_code, verify=True)
+    if validated is None or validated.empty:
+        return price_store.compact(file_path)
+    price_store.write_ticker_file(file_path, validated, _validation_metadata(validated))
+    return True
+
+
+class _ProviderLimiter:
+    """Bound in-flight requests and request-start rate for one provider host."""
+
+    def __init__(self, max_concurrency, per_host_rate):
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.per_host_rate = max(0.0, float(per_host_rate))
+        self._semaphore = threading.BoundedSemaphore(self.max_concurrency)
+        self._lock = threading.Lock()
+        self._interval = 1.0 / self.per_host_rate if self.per_host_rate > 0 else 0.0
+        self._next_start = 0.0
+
+    def __enter__(self):
+        self._semaphore.acquire()
+        if self._interval > 0:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start)
+                self._next_start = start + self._interval
+            if start > now:
+                time.sleep(start - now)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._semaphore.release()
+        return False
+
+
+_PROVIDER_LIMITERS: dict[str, _ProviderLimiter] = {}
+_PROVIDER_LIMITERS_LOCK = threading.Lock()
+
+
+def _provider_concurrency(provider):
+    default = DEFAULT_PROVIDER_CONCURRENCY.get(provider, 1)
+    env_name = {
+        "stooq": "TRADER_DATA_STOOQ_CONCURRENCY",
+        "yfinance": "TRADER_DATA_YF_CONCURRENCY",
+    }.get(provider)
+    if env_name is None:
+        return default
+    return max(1, _get_env_int(env_name, default))
+
+
+def _configure_provider_limiters(per_host_rate=None, provider_concurrency=None):
+    """Install fresh per-provider limiters for the next batch of requests."""
+    rate = (
+        _get_env_float("TRADER_DATA_PER_HOST_RATE", DEFAULT_PER_HOST_RATE)
+        if per_host_rate is None
+        else float(per_host_rate)
+    )
+    overrides = provider_concurrency or {}
+    with _PROVIDER_LIMITERS_LOCK:
+        _PROVIDER_LIMITERS.clear()
+        for provider in DEFAULT_PROVIDER_CONCURRENCY:
+            limit = overrides.get(provider, _provider_concurrency(provider))
+            _PROVIDER_LIMITERS[provider] = _ProviderLimiter(limit, rate)
+
+
+def _provider_slot(provider):
+    """Context manager that holds one request slot for ``provider``."""
+    with _PROVIDER_LIMITERS_LOCK:
+        limiter = _PROVIDER_LIMITERS.get(provider)
+    if limiter is None:
+        _configure_provider_limiters()
+        with _PROVIDER_LIMITERS_LOCK:
+            limiter = _PROVIDER_LIMITERS[provider]
+    return limiter
+
+
 def _to_yfinance_symbol(ticker_code):
     code = str(ticker_code).strip().upper()
     if code.endswith(".JP"):
@@ -202,17 +417,22 @@ def _to_yfinance_symbol(ticker_code):
     return code
 
 
-def download_stooq_data(ticker_code):
+def download_stooq_data(ticker_code, start=None, end=None):
     """
     Download historical data from Stooq.
     Stooq URL format for CSV download: https://stooq.com/q/d/l/?s={code}&i=d
+    start/end (dates) narrow the request to a d1..d2 window (inclusive).
     """
     url = f"https://stooq.com/q/d/l/?s={ticker_code}&i=d"
+    if start is not None:
+        end = end or _today_jst()
+        url += f"&d1={start:%Y%m%d}&d2={end:%Y%m%d}"
     headers = {"User-Agent": "Mozilla/5.0"}
     timeout_sec = _get_env_int("TRADER_DATA_HTTP_TIMEOUT_SEC", DEFAULT_HTTP_TIMEOUT_SEC)
 
     try:
-        response = requests.get(url, headers=headers, timeout=timeout_sec)
+        with _provider_slot("stooq"):
+            response = requests.get(url, headers=headers, timeout=timeout_sec)
         response.raise_for_status()
 
         # Check if content is valid CSV (sometimes Stooq returns an HTML page on error)
@@ -246,23 +466,32 @@ def download_stooq_data(ticker_code):
         return None
 
 
-def download_yfinance_data(ticker_code):
+def download_yfinance_data(ticker_code, start=None):
     """
     Download historical daily OHLCV from Yahoo Finance.
+    start (date) bounds the request to start..today instead of period="max".
+
+    Inside update_many()'s batched fallback the frame is served from the
+    multi-ticker request when it covers ``start``.
     """
     symbol = _to_yfinance_symbol(ticker_code)
     timeout_sec = _get_env_int("TRADER_DATA_HTTP_TIMEOUT_SEC", DEFAULT_HTTP_TIMEOUT_SEC)
+    window = {"period": "max"} if start is None else {"start": start.isoformat()}
 
     try:
-        df = yf.download(
-            symbol,
-            period="max",
-            interval="1d",
-            auto_adjust=False,
-            progress=False,
-            threads=False,
-            timeout=timeout_sec,
-        )
+        batch = _YF_BATCH
+        served, df = batch.frame_for(symbol, start) if batch else (False, None)
+        if not served:
+            with _provider_slot("yfinance"):
+                df = yf.download(
+                    symbol,
+                    **window,
+                    interval="1d",
+                    auto_adjust=False,
+                    progress=False,
+                    threads=False,
+                    timeout=timeout_sec,
+                )
         if df is None or df.empty:
             print(f"No data found on yfinance for {ticker_code} ({symbol}).")
             return None
@@ -295,115 +524,455 @@ def download_yfinance_data(ticker_code):
         return None
 
 
-def _download_with_fallback(ticker_code):
+def _split_batch_frame(raw, symbol):
+    """One symbol's rows from a multi-ticker yf.download(group_by="ticker")."""
+    if raw is None or raw.empty:
+        return None
+    if isinstance(raw.columns, pd.MultiIndex):
+        if symbol not in raw.columns.get_level_values(0):
+            return None
+        raw = raw[symbol]
+    # Dates are the union across the chunk; other symbols' sessions are NaN.
+    frame = raw.dropna(how="all")
+    return frame if not frame.empty else None
+
+
+def download_yfinance_batch(symbols, *, start=None, period="max", auto_adjust=False):
+    """
+    Raw daily frames for many yfinance symbols in chunked multi-ticker requests.
+
+    Returns {symbol: frame or None}; None means the request answered without
+    rows for that symbol. Symbols of a chunk whose request raised are left
+    out so callers can fall back to single-symbol requests for them. Frames
+    keep yfinance's layout (date index, title-case columns); callers run
+    their usual per-symbol normalization and validation.
+    """
+    symbols = list(dict.fromkeys(symbols))
+    size = max(1, _get_env_int("TRADER_DATA_YF_BATCH_SIZE", DEFAULT_YF_BATCH_SIZE))
+    timeout_sec = _get_env_int("TRADER_DATA_HTTP_TIMEOUT_SEC", DEFAULT_HTTP_TIMEOUT_SEC)
+    window = {"period": period} if start is None else {"start": start.isoformat()}
+    out = {}
+    for offset in range(0, len(symbols), size):
+        chunk = symbols[offset : offset + size]
+        try:
+            with _provider_slot("yfinance"):
+                raw = yf.download(
+                    chunk,
+                    **window,
+                    interval="1d",
+                    auto_adjust=auto_adjust,
+                    group_by="ticker",
+                    progress=False,
+                    threads=True,
+                    timeout=timeout_sec,
+                )
+        except Exception as e:  # noqa: BLE001 -- chunk falls back per symbol
+            print(f"yfinance batch request failed for {len(chunk)} symbols: {e}")
+            continue
+        for symbol in chunk:
+            out[symbol] = _split_batch_frame(raw, symbol)
+    return out
+
+
+class YFinanceBatch:
+    """
+    Deferred yfinance fallback served from chunked multi-ticker requests.
+
+    While collecting, callers ask defers(provider, symbol, start) before each
+    request: yfinance requests are recorded instead of sent, and resolve()
+    drops a symbol another provider answered freshly. fetch() then downloads
+    every recorded symbol in a few multi-ticker requests (grouped by start)
+    and switches to serving: frame_for() hands out those frames, and the
+    other providers, which already answered in the first pass, are skipped
+    for the recorded symbols.
+    """
+
+    def __init__(self, *, period="max", auto_adjust=False):
+        self.period = period
+        self.auto_adjust = auto_adjust
+        self.serving = False
+        self.requests: dict[str, date | None] = {}
+        self._frames: dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def defers(self, provider, symbol, start=None) -> bool:
+        """True when ``provider`` must not be requested for ``symbol`` now."""
+        if provider != "yfinance":
+            return self.serving and symbol in self.requests
+        if self.serving:
+            return False
+        with self._lock:
+            # The first request of a ticker is its delta window; a later
+            # full-history retry in the same pass must not widen the batch.
+            self.requests.setdefault(symbol, start)
+        return True
+
+    def pending(self, symbol) -> bool:
+        """True while ``symbol`` waits for the batch (before fetch())."""
+        return not self.serving and symbol in self.requests
+
+    def resolve(self, symbol) -> None:
+        if not self.serving:
+            with self._lock:
+                self.requests.pop(symbol, None)
+
+    def fetch(self) -> None:
+        """Download every recorded symbol, then start serving."""
+        groups: dict = {}
+        for symbol, start in self.requests.items():
+            groups.setdefault(start, []).append(symbol)
+        started = time.monotonic()
+        calls = 0
+        size = max(1, _get_env_int("TRADER_DATA_YF_BATCH_SIZE", DEFAULT_YF_BATCH_SIZE))
+        for start, symbols in groups.items():
+            frames = download_yfinance_batch(
+                symbols, start=start, period=self.period, auto_adjust=self.auto_adjust
+            )
+            calls += -(-len(symbols) // size)
+            for symbol, frame in frames.items():
+                self._frames[symbol] = (start, frame)
+        self.serving = True
+        print(
+            f"yfinance batch fallback: {len(self.requests)} symbols in {calls} "
+            f"request(s), "
+            f"{sum(f is not None for _, f in self._frames.values())} answered, "
+            f"{time.monotonic() - started:.1f}s."
+        )
+
+    def frame_for(self, symbol, start=None):
+        """(served, raw frame) for a request of ``symbol`` from ``start``.
+
+        served is False when the batch did not answer for the symbol (absent
+        from the answer, or only NaN rows: yfinance reports per-ticker errors
+        and rate limits in batch mode that way) or fetched a later window than
+        requested; the caller then sends its own request.
+        """
+        entry = self._frames.get(symbol) if self.serving else None
+        if entry is None:
+            return False, None
+        batch_start, frame = entry
+        if frame is None:
+            return False, None
+        if batch_start is not None and (start is None or start < batch_start):
+            return False, None
+        return True, frame
+
+
+# Batch of the update_many() call in progress (None outside one).
+_YF_BATCH: YFinanceBatch | None = None
+
+
+def _download_with_fallback(ticker_code, start=None):
+    """Fetch from the healthiest provider first, falling back on failure/staleness.
+
+    Provider order comes from the shared health tracker: a provider with an
+    open circuit is skipped and the rest are tried by recent success rate
+    (Stooq first while nothing is known). When every candidate is stale the
+    fresher frame wins, with ties going to the configured priority.
+    """
     stale_open_days = max(
         0, _get_env_int("TRADER_DATA_STALE_OPEN_DAYS", DEFAULT_STALE_OPEN_DAYS)
     )
     use_yf_fallback = _get_env_bool(
         "TRADER_YF_FALLBACK_ENABLED", DEFAULT_YF_FALLBACK_ENABLED
     )
+    downloaders = {
+        "stooq": download_stooq_data,
+        "yfinance": download_yfinance_data,
+    }
+    configured = ["stooq", "yfinance"] if use_yf_fallback else ["stooq"]
+    tracker = provider_health.get_tracker()
 
-    stooq_df = download_stooq_data(ticker_code)
-    stooq_freshness = _assess_freshness(stooq_df, stale_open_days=stale_open_days)
+    batch = _YF_BATCH
+    symbol = _to_yfinance_symbol(ticker_code)
+    candidates = []
+    freshness = _assess_freshness(None, stale_open_days=stale_open_days)
+    for provider in tracker.order(configured):
+        if batch is not None and batch.defers(provider, symbol, start):
+            if provider == "yfinance":
+                print(f"Deferring yfinance fallback for {ticker_code} to the batch.")
+            continue
+        if candidates:
+            print(f"Trying {provider} fallback for {ticker_code}...")
+        started = time.monotonic()
+        df = downloaders[provider](ticker_code, start=start)
+        freshness = _assess_freshness(df, stale_open_days=stale_open_days)
+        if df is None:
+            outcome = provider_health.OUTCOME_FAIL
+        elif freshness["is_stale"]:
+            outcome = provider_health.OUTCOME_STALE
+        else:
+            outcome = provider_health.OUTCOME_OK
+        tracker.record(provider, outcome, time.monotonic() - started)
+
+        if outcome == provider_health.OUTCOME_OK:
+            if batch is not None:
+                batch.resolve(symbol)
+            return df, provider, freshness
+        if df is None:
+            print(f"{_PROVIDER_LABELS[provider]} download failed for {ticker_code}.")
+            continue
+        print(
+            f"{_PROVIDER_LABELS[provider]} data is stale for "
+            f"{ticker_code}: latest={freshness['latest_date']}, "
+            f"required>={freshness['required_latest_date']} "
+            f"(open-day gap={freshness['open_day_gap']})."
+        )
+        candidates.append((df, provider, freshness))
 
-    if stooq_df is not None and not stooq_freshness["is_stale"]:
-        return stooq_df, "stooq", stooq_freshness
+    if not candidates:
+        return None, "none", freshness
 
-    if stooq_df is None:
-        print(f"Stooq download failed for {ticker_code}.")
-    else:
+    # Every provider that answered is stale: use the fresher one by latest date.
+    def _rank(candidate):
+        latest = candidate[2]["latest_date"]
+        return (latest or date.min, -configured.index(candidate[1]))
+
+    best = max(candidates, key=_rank)
+    if len(candidates) > 1 and best is not candidates[0]:
         print(
-            "Stooq data is stale for "
-            f"{ticker_code}: latest={stooq_freshness['latest_date']}, "
-            f"required>={stooq_freshness['required_latest_date']} "
-            f"(open-day gap={stooq_freshness['open_day_gap']})."
+            f"Using {best[1]} for {ticker_code} because it is fresher than "
+            f"{candidates[0][1]}."
         )
+    return best
+
 
-    if not use_yf_fallback:
-        return stooq_df, "stooq", stooq_freshness
+def _delta_start(old_df):
+    """First date to request in delta mode, or None when a full fetch is needed."""
+    if not _get_env_bool("TRADER_DATA_DELTA_ENABLED", DEFAULT_DELTA_ENABLED):
+        return None
+    if old_df is None or old_df.empty or "date" not in old_df.columns:
+        return None
+    last = pd.to_datetime(old_df["date"], errors="coerce").max()
+    if pd.isna(last):
+        return None
+    overlap_days = max(
+        1,
+        _get_env_int("TRADER_DATA_DELTA_OVERLAP_DAYS", DEFAULT_DELTA_OVERLAP_DAYS),
+    )
+    return last.date() - timedelta(days=overlap_days)
 
-    print(f"Trying yfinance fallback for {ticker_code}...")
-    yf_df = download_yfinance_data(ticker_code)
-    yf_freshness = _assess_freshness(yf_df, stale_open_days=stale_open_days)
 
-    if yf_df is not None and not yf_freshness["is_stale"]:
-        return yf_df, "yfinance", yf_freshness
+def _delta_overlap_mismatch(old_df, new_df):
+    """Why the delta's overlap rows disagree with stored history, or None.
 
-    if yf_df is not None:
-        print(
-            "yfinance data is also stale for "
-            f"{ticker_code}: latest={yf_freshness['latest_date']}, "
-            f"required>={yf_freshness['required_latest_date']} "
-            f"(open-day gap={yf_freshness['open_day_gap']})."
-        )
+    The delta window deliberately re-fetches a few stored sessions. A provider
+    that restated them (split/dividend back-adjustment) has changed the price
+    basis of the whole history, which only a full refetch can repair.
+    """
+    stored = _normalize_ohlcv(old_df)
+    if stored is None or stored.empty:
+        return "stored_history_unreadable"
+    overlap = stored.merge(new_df, on="date", suffixes=("_old", "_new"))
+    if overlap.empty:
+        return "no_overlap_rows"
+    for col in ["open", "high", "low", "close"]:
+        old_values = overlap[f"{col}_old"].to_numpy(dtype="float64")
+        new_values = overlap[f"{col}_new"].to_numpy(dtype="float64")
+        if not np.allclose(
+            old_values, new_values, rtol=DELTA_OVERLAP_RTOL, atol=0.0
+        ):
+            return f"overlap_{col}_restated"
+    return None
 
-    if stooq_df is None and yf_df is None:
-        return None, "none", yf_freshness
 
-    if stooq_df is None:
-        return yf_df, "yfinance", yf_freshness
-    if yf_df is None:
-        return stooq_df, "stooq", stooq_freshness
+def _local_covers_required_day(old_df) -> bool:
+    """True when stored data already reaches the latest completed JPX open day."""
+    if old_df is None or old_df.empty or "date" not in old_df.columns:
+        return False
+    # No stale tolerance here: TRADER_DATA_STALE_OPEN_DAYS decides whether a
+    # download is good enough, not whether to skip looking for a newer one.
+    return not _assess_freshness(old_df, stale_open_days=0)["is_stale"]
 
-    # If both are stale, use the fresher one by latest date.
-    stooq_latest = stooq_freshness["latest_date"]
-    yf_latest = yf_freshness["latest_date"]
-    if yf_latest and (stooq_latest is None or yf_latest > stooq_latest):
-        print(f"Using yfinance for {ticker_code} because it is fresher than Stooq.")
-        return yf_df, "yfinance", yf_freshness
 
-    return stooq_df, "stooq", stooq_freshness
+def _match_stored_dtypes(rows, stored):
+    """Cast appended rows to the stored column dtypes when no value changes."""
+    out = rows.copy()
+    for col in REQUIRED_COLS:
+        target = stored[col].dtype
+        if out[col].dtype == target:
+            continue
+        try:
+            cast = out[col].astype(target)
+        except (TypeError, ValueError):
+            continue
+        if (cast == out[col]).all():
+            out[col] = cast
+    return out
 
 
-def update_data(ticker_code, dest_dir=None):
+def _append_tail(ticker_code, file_path, old_df, new_df, source):
+    """
+    Append only the rows after the last stored date as a delta file.
+
+    old_df is the validated stored history (read_validated_file). The tail
+    is validated together with the last stored row, so the continuity checks
+    (daily move) still see its predecessor; the stored history is not
+    re-validated. Every
+    TRADER_DATA_COMPACT_EVERY deltas are folded back into the base file.
+    Returns (full history frame, write_mode).
+    """
+    stored = old_df
+    last_date = stored["date"].max()
+    tail = new_df[new_df["date"] > last_date]
+    if tail.empty:
+        stored.attrs["validation_warnings"] = []
+        return stored, "none"
+
+    checked = _validate_ohlcv(
+        pd.concat([stored.tail(1), tail], ignore_index=True),
+        ticker_code=ticker_code,
+        source=source,
+    )
+    warnings = list(checked.attrs.get("validation_warnings", []))
+    appended = checked[checked["date"] > last_date]
+    write_mode = "none"
+    if not appended.empty:
+        appended = _match_stored_dtypes(appended, stored)
+        price_store.append_rows(file_path, appended, _validation_metadata(checked))
+        write_mode = "append"
+        compact_every = max(
+            1, _get_env_int("TRADER_DATA_COMPACT_EVERY", DEFAULT_COMPACT_EVERY)
+        )
+        if len(price_store.delta_paths(file_path)) >= compact_every:
+            _compact(file_path, ticker_code)
+            write_mode = "append+compact"
+        stored = pd.concat([stored, appended], ignore_index=True)
+    stored.attrs["validation_warnings"] = warnings
+    return stored, write_mode
+
+
+def update_data(
+    ticker_code, dest_dir=None, *, full_refresh=False, force=None, append=None
+):
     """
     Update local parquet file using Stooq and automatic yfinance fallback.
 
     dest_dir: optional output directory. Defaults to DATA_DIR (top level).
     Used by the curation warmup to persist candidate data under
     data/watchlist/ (a subdirectory that sync_data_files does not archive).
+
+    When a parquet already exists, only the window from a few sessions
+    before its last stored date is requested (delta mode). The re-fetched
+    overlap rows must match stored prices; otherwise, or when the delta fetch
+    fails, the full history is refetched as before. full_refresh=True (or
+    TRADER_DATA_DELTA_ENABLED=false) always fetches the full history.
+
+    When the stored parquet already contains the latest completed JPX open
+    day (a retry workflow or a second manual run), no request is made and the
+    stored frame is returned with attrs["fetch_mode"] == "skipped_fresh".
+    force=True (or TRADER_DATA_FORCE_REFRESH=true) always downloads.
+
+    A delta fetch whose overlap matched is written append-only: the new rows
+    are validated against the last stored row and saved as a delta file next
+    to the parquet (attrs["write_mode"] == "append"), so the daily write is
+    O(new rows). Full fetches rewrite the file and fold any deltas in.
+    append defaults to TRADER_DATA_APPEND_ENABLED for the top-level data dir
+    only; dest_dir files (watchlist) are moved around whole and always rewrite.
     """
+    target_dir = Path(dest_dir) if dest_dir is not None else DATA_DIR
+    file_path = target_dir / f"{ticker_code}.parquet"
+    old_df = None
+    if file_path.exists():
+        old_df = read_validated_file(file_path, ticker_code)
+        if old_df is not None and old_df.empty:
+            old_df = None
+
+    if force is None:
+        force = _get_env_bool("TRADER_DATA_FORCE_REFRESH", False)
+    skip_fresh = _get_env_bool("TRADER_DATA_SKIP_FRESH_ENABLED", DEFAULT_SKIP_FRESH)
+    if (
+        skip_fresh
+        and not (force or full_refresh)
+        and _local_covers_required_day(old_df)
+    ):
+        old_df.attrs["fetch_mode"] = "skipped_fresh"
+        latest = old_df["date"].max().strftime("%Y-%m-%d")
+        print(
+            f"Local data for {ticker_code} already covers {latest}; "
+            "skipping download."
+        )
+        return old_df
+
     print(f"Updating data for {ticker_code}...")
 
     # Download fresh data with stale-data fallback.
-    new_df, source, freshness = _download_with_fallback(ticker_code)
+    start = None if full_refresh else _delta_start(old_df)
+    fetch_mode = "full"
+    if start is not None:
+        new_df, source, freshness = _download_with_fallback(ticker_code, start=start)
+        if new_df is None or new_df.empty:
+            batch = _YF_BATCH
+            if batch is not None and batch.pending(_to_yfinance_symbol(ticker_code)):
+                # The batched yfinance fallback may still answer the delta;
+                # a full-history retry now would only ask Stooq again.
+                print(f"Delta fetch for {ticker_code} waits for the yfinance batch.")
+                return None
+            fetch_mode = "full_after_delta_failure"
+            print(f"Delta fetch failed for {ticker_code}; refetching full history.")
+        else:
+            mismatch = _delta_overlap_mismatch(old_df, new_df)
+            if mismatch is None:
+                fetch_mode = "delta"
+            else:
+                fetch_mode = "full_after_overlap_mismatch"
+                print(
+                    f"Delta overlap check failed for {ticker_code} ({mismatch}); "
+                    "refetching full history."
+                )
+    if fetch_mode != "delta":
+        new_df, source, freshness = _download_with_fallback(ticker_code)
 
     if new_df is None or new_df.empty:
         print(f"No new data found for {ticker_code}.")
         return None
-    print(f"Selected source for {ticker_code}: {source}")
+    print(f"Selected source for {ticker_code}: {source} ({fetch_mode})")
 
-    target_dir = Path(dest_dir) if dest_dir is not None else DATA_DIR
     target_dir.mkdir(parents=True, exist_ok=True)
-    file_path = target_dir / f"{ticker_code}.parquet"
+    if append is None:
+        append = dest_dir is None and _get_env_bool(
+            "TRADER_DATA_APPEND_ENABLED", DEFAULT_APPEND_ENABLED
+        )
 
-    if file_path.exists():
-        old_df = pd.read_parquet(file_path)
-        # Combine and drop duplicates based on Date
-        combined_df = pd.concat([old_df, new_df]).drop_duplicates(
-            subset=["date"], keep="last"
+    if fetch_mode == "delta" and append:
+        combined_df, write_mode = _append_tail(
+            ticker_code, file_path, old_df, new_df, source
         )
-        combined_df = combined_df.sort_values("date").reset_index(drop=True)
     else:
-        combined_df = new_df
+        if old_df is not None:
+            # Combine and drop duplicates based on Date
+            combined_df = pd.concat([old_df, new_df]).drop_duplicates(
+                subset=["date"], keep="last"
+            )
+            combined_df = combined_df.sort_values("date").reset_index(drop=True)
+        else:
+            combined_df = new_df
 
-    combined_df = _normalize_ohlcv(combined_df)
-    if combined_df is None or combined_df.empty:
-        print(f"No normalizable data remains for {ticker_code}.")
-        return None
+        combined_df = _normalize_ohlcv(combined_df)
+        if combined_df is None or combined_df.empty:
+            print(f"No normalizable data remains for {ticker_code}.")
+            return None
 
-    combined_df = _validate_ohlcv(combined_df, ticker_code=ticker_code, source=source)
-    if combined_df is None or combined_df.empty:
-        print(f"No valid data remains for {ticker_code} after OHLCV validation.")
-        return None
+        combined_df = _validate_ohlcv(
+            combined_df, ticker_code=ticker_code, source=source
+        )
+        if combined_df is None or combined_df.empty:
+            print(f"No valid data remains for {ticker_code} after OHLCV validation.")
+            return None
+        write_mode = "rewrite"
 
     validation_warnings = []
     validation_warnings.extend(new_df.attrs.get("validation_warnings", []))
     validation_warnings.extend(combined_df.attrs.get("validation_warnings", []))
     combined_df.attrs["validation_warnings"] = list(dict.fromkeys(validation_warnings))
+    combined_df.attrs["fetch_mode"] = fetch_mode
+    combined_df.attrs["write_mode"] = write_mode
 
-    # Save to parquet
-    combined_df.to_parquet(file_path)
+    # Save to parquet (the append path has already written its delta).
+    if write_mode == "rewrite":
+        price_store.write_ticker_file(
+            file_path, combined_df, _validation_metadata(combined_df)
+        )
     latest = combined_df["date"].max().strftime("%Y-%m-%d")
     stale_note = ""
     if freshness.get("is_stale"):
@@ -413,22 +982,335 @@ def update_data(ticker_code, dest_dir=None):
             f"open-day gap={freshness.get('open_day_gap')}]"
         )
     print(
-        f"Data saved to {file_path}. Latest date: {latest} (source={source}){stale_note}"
+        f"Data saved to {file_path} ({write_mode}). Latest date: {latest} "
+        f"(source={source}){stale_note}"
     )
 
     return combined_df
 
 
-def load_data(ticker_code):
+def update_many(
+    ticker_codes,
+    dest_dir=None,
+    *,
+    max_workers=None,
+    per_host_rate=None,
+    provider_concurrency=None,
+    force=None,
+):
+    """
+    Refresh several tickers concurrently behind per-provider request limits.
+
+    Every ticker still goes through update_data(), so validation, merge and
+    parquet write semantics are unchanged; only the network wait overlaps.
+
+    The yfinance fallback is batched: tickers that reach it in the first pass
+    are updated again after one chunked multi-ticker yfinance download
+    (TRADER_DATA_YF_BATCH_ENABLED / TRADER_DATA_YF_BATCH_SIZE), instead of
+    one yfinance session per ticker. Their primary providers are not asked
+    twice: a delta fetch that fell through to the batch retries the full
+    history only in the second pass, after the batch failed to answer it.
+
+    max_workers: ticker-level threads (TRADER_DATA_MAX_WORKERS, default 4).
+    per_host_rate: request starts per second per provider
+        (TRADER_DATA_PER_HOST_RATE, default 2.0; 0 disables pacing).
+    provider_concurrency: optional {"stooq": n, "yfinance": n} override of the
+        in-flight request caps (TRADER_DATA_STOOQ_CONCURRENCY /
+        TRADER_DATA_YF_CONCURRENCY).
+    force: passed to update_data(); True downloads even tickers whose local
+        data is already fresh.
+
+    Returns ``(results, errors)``. ``results`` maps each code whose update
+    returned to its frame (or None); ``errors`` maps each code whose update
+    raised to the exception, so callers keep their per-ticker failure handling.
+    """
+    codes = list(dict.fromkeys(code for code in ticker_codes if code))
+    results = {}
+    errors = {}
+    if not codes:
+        return results, errors
+
+    if max_workers is None:
+        max_workers = _get_env_int("TRADER_DATA_MAX_WORKERS", DEFAULT_MAX_WORKERS)
+    workers = max(1, min(int(max_workers), len(codes)))
+    _configure_provider_limiters(
+        per_host_rate=per_host_rate, provider_concurrency=provider_concurrency
+    )
+
+    def _run(code):
+        try:
+            return code, update_data(code, dest_dir=dest_dir, force=force), None
+        except Exception as e:  # noqa: BLE001 -- surfaced per ticker
+            return code, None, e
+
+    def _run_all(batch_codes):
+        if workers == 1:
+            return [_run(code) for code in batch_codes]
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="update-data"
+        ) as pool:
+            return list(pool.map(_run, batch_codes))
+
+    global _YF_BATCH
+    started = time.monotonic()
+    if len(codes) > 1 and _get_env_bool(
+        "TRADER_DATA_YF_BATCH_ENABLED", DEFAULT_YF_BATCH_ENABLED
+    ):
+        _YF_BATCH = YFinanceBatch()
+    try:
+        outcomes = _run_all(codes)
+        batch = _YF_BATCH
+        if batch is not None and batch.requests:
+            # Second pass: tickers that needed the yfinance fallback, now
+            # served from a few multi-ticker requests.
+            batch.fetch()
+            retry = [c for c in codes if _to_yfinance_symbol(c) in batch.requests]
+            retried = {outcome[0]: outcome for outcome in _run_all(retry)}
+            outcomes = [retried.get(outcome[0], outcome) for outcome in outcomes]
+    finally:
+        _YF_BATCH = None
+
+    for code, df, error in outcomes:
+        if error is not None:
+            print(f"Failed to update data for {code}: {type(error).__name__}: {error}")
+            errors[code] = error
+        else:
+            results[code] = df
+    elapsed = time.monotonic() - started
+    skipped = sum(
+        1
+        for df in results.values()
+        if df is not None and df.attrs.get("fetch_mode") == "skipped_fresh"
+    )
+    print(
+        f"Bulk data refresh: {len(results)} refreshed ({skipped} already fresh), "
+        f"{len(errors)} failed in {elapsed:.1f}s (workers={workers})."
+    )
+    tracker = provider_health.get_tracker()
+    print(f"Provider health: {tracker.format_run_summary()}")
+    tracker.save()
+    return results, errors
+
+
+def load_data(
+    ticker_code,
+    since=None,
+    until=None,
+    columns=None,
+    warmup_rows=0,
+    *,
+    tail_rows=None,
+    verify=None,
+):
+    """Validated local OHLCV for ticker_code, or None.
+
+    Callers declare the history they need instead of always getting the full
+    multi-decade file:
+
+      - since / until: inclusive date window,
+      - tail_rows: the last N stored rows (inference, charts),
+      - warmup_rows: extra stored rows before the window start so rolling
+        features are complete at its first row (see model.FEATURE_WARMUP_ROWS),
+      - columns: OHLCV value columns to return ("date" is always kept).
+
+    The date bounds are pushed down to parquet row-group statistics, so old
+    years are never read. Validation needs every price column to decide which
+    rows are valid, so ``columns`` is applied after it (use
+    load_panel(validate=False) for a raw projected read). With no arguments
+    the full history is returned, as before.
+
+    Rows written by update_data() are trusted through their stored validation
+    record (read_validated_file); verify=True re-validates them.
+
+    Inside a run_cache.run_scope() each (ticker, window) is read and validated
+    once per file version and later calls get a copy from memory.
+    """
+    if columns is not None:
+        columns = tuple(c for c in columns if c != "date")
+        unknown = [c for c in columns if c not in REQUIRED_COLS]
+        if unknown:
+            raise ValueError(f"unknown OHLCV columns: {unknown}")
+    window = (since, until, columns, int(warmup_rows), tail_rows, verify)
+    loader = partial(
+        _load_data_uncached,
+        since=since,
+        until=until,
+        columns=columns,
+        warmup_rows=warmup_rows,
+        tail_rows=tail_rows,
+        verify=verify,
+    )
+    cache = run_cache.active()
+    if cache is not None:
+        return cache.load_ohlcv(
+            ticker_code, DATA_DIR / f"{ticker_code}.parquet", loader, window=window
+        )
+    return loader(ticker_code)
+
+
+def _load_data_uncached(
+    ticker_code,
+    since=None,
+    until=None,
+    columns=None,
+    warmup_rows=0,
+    tail_rows=None,
+    verify=None,
+):
     file_path = DATA_DIR / f"{ticker_code}.parquet"
-    if file_path.exists():
-        df = pd.read_parquet(file_path)
-        normalized = _normalize_ohlcv(df)
-        if normalized is None:
-            print(f"Local data for {ticker_code} is missing required OHLCV columns.")
-            return None
-        return _validate_ohlcv(normalized, ticker_code=ticker_code, source="local")
-    return None
+    if not file_path.exists():
+        return None
+    start, end = price_store.window_bounds(
+        file_path, since, until, warmup_rows=warmup_rows, tail_rows=tail_rows
+    )
+    validated = read_validated_file(
+        file_path, ticker_code, start=start, end=end, verify=verify
+    )
+    if validated is None:
+        print(f"Local data for {ticker_code} is missing required OHLCV columns.")
+        return None
+    if validated.empty:
+        print(f"No usable local data for {ticker_code} in the requested window.")
+        return None
+    if columns is not None:
+        attrs = dict(validated.attrs)
+        validated = validated[["date", *columns]].copy()
+        validated.attrs = attrs
+    return validated
+
+
+def load_frames(codes=None, start=None, end=None, *, data_dir=None):
+    """
+    Validated OHLCV for many tickers from one price-store scan.
+
+    Same normalization/validation as load_data(), but all files are read in a
+    single multi-threaded dataset scan with the [start, end] date predicate
+    pushed down. Like read_validated_file(), tickers whose files carry a
+    current validation record are returned as stored instead of being
+    re-validated. Returns {code: frame} in request order; tickers without a
+    file or without valid rows are omitted. Volume is float64 (panel schema).
+
+    When the scan fails (an unreadable or foreign-schema file), every ticker
+    is read on its own instead and the unreadable ones are skipped.
+    """
+    data_dir = Path(data_dir) if data_dir is not None else DATA_DIR
+    _compact_before_scan(codes, data_dir)
+    try:
+        table = price_store.scan(codes, start, end, data_dir=data_dir)
+    except (OSError, ValueError, pa.ArrowException) as e:
+        print(f"Price-store scan failed ({e}); reading tickers one by one.")
+        return _load_frames_per_file(codes, start, end, data_dir)
+    if table.num_rows == 0:
+        return {}
+    verify = _get_env_bool("TRADER_DATA_VERIFY_ON_LOAD", DEFAULT_VERIFY_ON_LOAD)
+    paths = {} if verify else price_store.ticker_paths(codes, data_dir)
+    panel = table.to_pandas()
+    frames = {}
+    for code, group in panel.groupby("ticker", sort=False):
+        stored = group.drop(columns="ticker")
+        record = _stored_validation(paths[code]) if code in paths else None
+        if record is not None and not stored["date"].duplicated().any():
+            frames[code] = _from_validated_store(stored, record, code, "local")
+            continue
+        normalized = _normalize_ohlcv(stored)
+        if normalized is None or normalized.empty:
+            print(f"Local data for {code} has no usable OHLCV rows.")
+            continue
+        frames[code] = _validate_ohlcv(normalized, ticker_code=code, source="local")
+    if codes is None:
+        return frames
+    return {code: frames[code] for code in dict.fromkeys(codes) if code in frames}
+
+
+def _compact_before_scan(codes, data_dir):
+    """Fold pending deltas so a scan opens one file per ticker.
+
+    update_data() only compacts every TRADER_DATA_COMPACT_EVERY appends; a
+    bulk read would otherwise open every ticker's delta files as well. A
+    ticker that cannot be rewritten (read-only data dir) is scanned as is.
+    """
+    for code, path in price_store.ticker_paths(codes, data_dir).items():
+        if not price_store.delta_paths(path):
+            continue
+        try:
+            _compact(path, code)
+        except (OSError, ValueError, pa.ArrowException) as e:
+            print(f"Could not compact deltas of {code} before the scan: {e}")
+
+
+def _load_frames_per_file(codes, start, end, data_dir):
+    """load_frames() one ticker file at a time, skipping unreadable ones."""
+    frames = {}
+    for code, path in price_store.ticker_paths(codes, data_dir).items():
+        try:
+            frame = read_validated_file(path, code, start=start, end=end)
+        except (OSError, ValueError, pa.ArrowException):
+            frame = None
+        if frame is None or frame.empty:
+            print(f"Local data for {code} has no usable OHLCV rows.")
+            continue
+        frames[code] = frame.astype({"volume": "float64"})
+    return frames
+
+
+def load_panel(
+    codes=None,
+    start=None,
+    end=None,
+    columns=None,
+    *,
+    layout="long",
+    validate=True,
+    data_dir=None,
+):
+    """
+    Price panel for many tickers in one read.
+
+    layout="long" returns [ticker, date, <columns>] sorted by (ticker, date);
+    layout="wide" returns a date-indexed frame with one column per ticker
+    (a (column, ticker) MultiIndex when several columns are requested).
+
+    validate=True (default) runs every ticker through load_data()'s
+    normalization/validation, which needs all OHLCV columns, so ``columns``
+    only trims the output; per-ticker warnings are kept in
+    attrs["validation_warnings"] as {code: [...]}. validate=False returns the
+    stored rows as-is and also pushes the column projection down to parquet.
+    """
+    if layout not in ("long", "wide"):
+        raise ValueError(f"layout must be 'long' or 'wide', got {layout!r}")
+    value_cols = [c for c in (columns or REQUIRED_COLS) if c not in ("ticker", "date")]
+    unknown = [c for c in value_cols if c not in REQUIRED_COLS]
+    if unknown:
+        raise ValueError(f"unknown price columns: {unknown}")
+
+    warnings = {}
+    if validate:
+        frames = load_frames(codes, start, end, data_dir=data_dir)
+        parts = []
+        for code, frame in frames.items():
+            part = frame[["date"] + value_cols].copy()
+            part.insert(0, "ticker", code)
+            parts.append(part)
+            if frame.attrs.get("validation_warnings"):
+                warnings[code] = list(frame.attrs["validation_warnings"])
+        if parts:
+            long = pd.concat(parts, ignore_index=True)
+        else:
+            long = pd.DataFrame(columns=["ticker", "date"] + value_cols)
+    else:
+        data_dir = Path(data_dir) if data_dir is not None else DATA_DIR
+        _compact_before_scan(codes, data_dir)
+        long = price_store.scan(
+            codes, start, end, columns=value_cols, data_dir=data_dir
+        ).to_pandas()
+
+    if layout == "wide":
+        values = value_cols[0] if len(value_cols) == 1 else value_cols
+        out = long.pivot(index="date", columns="ticker", values=values)
+    else:
+        out = long
+    out.attrs["validation_warnings"] = warnings
+    return out
 
 
 def load_archived_data(ticker_code):
@@ -440,18 +1322,11 @@ def load_archived_data(ticker_code):
         reverse=True,
     )
     for file_path in candidates:
-        df = pd.read_parquet(file_path)
-        normalized = _normalize_ohlcv(df)
-        if normalized is None:
-            print(
-                f"Archived data for {ticker_code} is missing required OHLCV columns."
-            )
+        validated = read_validated_file(file_path, ticker_code, source="archive")
+        if validated is None or validated.empty:
+            print(f"Archived data for {ticker_code} has no usable OHLCV rows.")
             continue
-        validated = _validate_ohlcv(
-            normalized, ticker_code=ticker_code, source="archive"
-        )
-        if validated is not None:
-            return validated
+        return validated
     return None
 
 
@@ -481,8 +1356,13 @@ def sync_data_files(active_ticker_codes):
         if ticker_code in active_codes:
             continue
 
+        # Archives stay single files (load_archived_data reads them whole).
+        _compact(file_path, ticker_code)
         target_path = _archive_target_path(file_path)
         file_path.replace(target_path)
+        # Derived state; rebuilt from the price history if the ticker returns.
+        feature_state.state_path(file_path).unlink(missing_ok=True)
+        feature_store.discard(ticker_code, file_path.parent / "features")
         archived_codes.append(ticker_code)
 
     if archived_codes:
@@ -308,8 +308,9 @@ def compute_outcome(
 
     realized_ret = float(exit_close) / entry - 1.0
 
-    highs = [float(h) for h in (path_highs or [])]
-    lows = [float(low) for low in (path_lows or [])]
+    # Any sequence or array (settlement passes price-array slices).
+    highs = [float(h) for h in (path_highs if path_highs is not None else [])]
+    lows = [float(low) for low in (path_lows if path_lows is not None else [])]
     mfe = (max(highs) / entry - 1.0) if highs else realized_ret
     mae = (min(lows) / entry - 1.0) if lows else realized_ret
 
@@ -13,10 +13,13 @@ label generation, OOS simulation, and DB settlement cannot drift apart.
 
 from __future__ import annotations
 
+import json
 from dataclasses import dataclass
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 
 LEGACY_EXECUTION_CONTRACT_VERSION = "close_to_close_v1"
@@ -164,30 +167,306 @@ def add_execution_columns(
     out["fwd_return"] = out["execution_exit_price"] / out["entry_price"] - 1.0
     out["entry_session_return"] = close.shift(-1) / open_price.shift(-1) - 1.0
     out["continuation_session_return"] = close.shift(-1) / close - 1.0
-    path_returns: list[list[float] | None] = []
-    path_dates: list[list[pd.Timestamp] | None] = []
-    path_market_rows: list[list[int] | None] = []
-    for i in range(len(out)):
-        if i + h >= len(out):
-            path_returns.append(None)
-            path_dates.append(None)
-            path_market_rows.append(None)
-            continue
-        returns = [float(close.iloc[i + 1] / open_price.iloc[i + 1] - 1.0)]
-        returns.extend(
-            float(close.iloc[j] / close.iloc[j - 1] - 1.0)
-            for j in range(i + 2, i + h + 1)
-        )
-        path_returns.append(returns)
-        path_dates.append([pd.Timestamp(date.iloc[j]) for j in range(i + 1, i + h + 1)])
-        path_market_rows.append(list(range(i + 1, i + h + 1)))
-    out["execution_path_returns"] = path_returns
-    out["execution_path_dates"] = path_dates
-    out["execution_path_market_rows"] = path_market_rows
+    paths = execution_paths(
+        open_price.to_numpy(dtype="float64"),
+        close.to_numpy(dtype="float64"),
+        date.to_numpy(dtype="datetime64[ns]"),
+        h,
+    )
+    for column, values in zip(PATH_COLUMNS, paths.arrays()):
+        out[column] = _fixed_size_list_column(values, out.index)
     out["execution_contract_version"] = EXECUTION_CONTRACT_VERSION
     return out
 
 
+# ---------------------------------------------------------------------------
+# Execution paths
+# ---------------------------------------------------------------------------
+
+# Per-row H-session paths written by add_execution_columns(): session i+1+k's
+# return for a sleeve opened at row i (k=0: next open -> close; k>0:
+# close -> close), that session's date and its market row number. They are
+# Arrow fixed-size lists, which plain pd.read_parquet() cannot rebuild; read
+# such parquet files back with read_parquet() below.
+PATH_COLUMNS = (
+    "execution_path_returns",
+    "execution_path_dates",
+    "execution_path_market_rows",
+)
+
+
+@dataclass(frozen=True)
+class ExecutionPaths:
+    """(rows x H) execution paths; rows in ``~valid`` hold no usable path.
+
+    Rows without a path carry NaN returns, NaT dates and market row -1.
+    """
+
+    returns: np.ndarray
+    dates: np.ndarray
+    market_rows: np.ndarray
+    valid: np.ndarray
+
+    @property
+    def horizon(self) -> int:
+        return self.returns.shape[1]
+
+    def arrays(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(returns, dates, market_rows) in PATH_COLUMNS order."""
+        return self.returns, self.dates, self.market_rows
+
+
+def empty_paths(n_rows: int, horizon: int) -> ExecutionPaths:
+    shape = (n_rows, max(0, int(horizon)))
+    return ExecutionPaths(
+        returns=np.full(shape, np.nan),
+        dates=np.full(shape, np.datetime64("NaT", "ns")),
+        market_rows=np.full(shape, -1, dtype=np.int64),
+        valid=np.zeros(n_rows, dtype=bool),
+    )
+
+
+def execution_paths(open_price, close, dates, horizon_days: int) -> ExecutionPaths:
+    """Paths of every market-as-of row from one ticker's positional arrays.
+
+    Row i has a path when i + H is a market row. Returns are sliding windows
+    over the per-session close-to-close returns with the first session
+    replaced by its open-to-close return.
+    """
+    h = max(1, int(horizon_days))
+    n = len(close)
+    paths = empty_paths(n, h)
+    m = max(0, n - h)  # rows with a complete path
+    if m == 0:
+        return paths
+    windows = np.lib.stride_tricks.sliding_window_view
+    session = np.empty(n)
+    session[0] = np.nan
+    session[1:] = close[1:] / close[:-1] - 1.0
+    paths.returns[:m] = windows(session[1:], h)
+    paths.returns[:m, 0] = close[1 : m + 1] / open_price[1 : m + 1] - 1.0
+    paths.dates[:m] = windows(dates[1:], h)
+    paths.market_rows[:m] = windows(np.arange(1, n, dtype=np.int64), h)
+    paths.valid[:m] = True
+    return paths
+
+
+def _fixed_size_list_column(values: np.ndarray, index) -> pd.Series:
+    """One (rows x H) array as a fixed-size-list column (one flat buffer)."""
+    lists = pa.FixedSizeListArray.from_arrays(pa.array(values.ravel()), values.shape[1])
+    return pd.Series(pd.arrays.ArrowExtensionArray(lists), index=index)
+
+
+def _fixed_size_list_values(series: pd.Series, dtype) -> np.ndarray:
+    lists = pa.array(series.array)
+    flat = lists.flatten().to_numpy(zero_copy_only=False)
+    return flat.astype(dtype, copy=False).reshape(len(series), lists.type.list_size)
+
+
+def path_types_mapper(arrow_type):
+    """Arrow-to-pandas ``types_mapper`` keeping fixed-size lists as ArrowDtype."""
+    if pa.types.is_fixed_size_list(arrow_type):
+        return pd.ArrowDtype(arrow_type)
+    return None
+
+
+def read_parquet(path, columns=None) -> pd.DataFrame:
+    """pd.read_parquet() for frames carrying PATH_COLUMNS (attrs included)."""
+    table = pq.read_table(path, columns=columns)
+    meta = table.schema.pandas_metadata
+    if meta:
+        # pyarrow parses the stored dtype string of every column in the pandas
+        # metadata, projected away or not; only the mapper may type the lists.
+        present = set(table.column_names)
+        meta["columns"] = [
+            col
+            for col in meta["columns"]
+            if col.get("field_name", col["name"]) in present
+        ]
+        table = table.replace_schema_metadata(
+            {**table.schema.metadata, b"pandas": json.dumps(meta).encode()}
+        )
+    return table.to_pandas(types_mapper=path_types_mapper)
+
+
+def _is_fixed_size_list(series: pd.Series) -> bool:
+    dtype = series.dtype
+    return isinstance(dtype, pd.ArrowDtype) and pa.types.is_fixed_size_list(
+        dtype.pyarrow_dtype
+    )
+
+
+@pd.api.extensions.register_dataframe_accessor("execution_path")
+class ExecutionPathAccessor:
+    """``frame.execution_path``: the frame's PATH_COLUMNS as arrays.
+
+    add_execution_columns() stores each column as a fixed-size list, read
+    here without building per-row Python objects. Frames whose columns hold
+    per-row lists (the pre-array format) are converted row by row.
+    """
+
+    def __init__(self, frame: pd.DataFrame):
+        self._frame = frame
+
+    @property
+    def present(self) -> bool:
+        return all(column in self._frame.columns for column in PATH_COLUMNS)
+
+    def paths(self, horizon: int | None = None) -> ExecutionPaths:
+        """(rows x H) paths; rows without a complete H-session path are invalid.
+
+        ``horizon`` defaults to the stored path length. A frame without the
+        path columns yields only invalid rows.
+        """
+        frame = self._frame
+        if not self.present:
+            return empty_paths(len(frame), horizon or 0)
+        columns = [frame[column] for column in PATH_COLUMNS]
+        if all(_is_fixed_size_list(column) for column in columns):
+            market_rows = _fixed_size_list_values(columns[2], np.int64)
+            stored = ExecutionPaths(
+                returns=_fixed_size_list_values(columns[0], np.float64),
+                dates=_fixed_size_list_values(columns[1], "datetime64[ns]"),
+                market_rows=market_rows,
+                valid=(market_rows >= 0).all(axis=1),
+            )
+            if horizon is None or int(horizon) == stored.horizon:
+                return stored
+            return empty_paths(len(frame), horizon)
+        return _paths_from_lists(columns, horizon)
+
+    def market_row_bounds(self) -> tuple[int | None, int | None]:
+        """Inclusive (first, last) market row of any path, or (None, None).
+
+        Only execution_path_market_rows is read; every listed row counts.
+        """
+        column = self._frame.get(PATH_COLUMNS[2])
+        if column is None:
+            return None, None
+        if _is_fixed_size_list(column):
+            rows = _fixed_size_list_values(column, np.int64)
+        else:
+            rows = np.array(
+                [
+                    int(row)
+                    for value in column
+                    if isinstance(value, (list, tuple, np.ndarray))
+                    for row in value
+                ],
+                dtype=np.int64,
+            )
+        rows = rows[rows >= 0]
+        if rows.size == 0:
+            return None, None
+        return int(rows.min()), int(rows.max())
+
+
+def _paths_from_lists(columns, horizon) -> ExecutionPaths:
+    """ExecutionPaths from per-row list columns.
+
+    A row is valid when all three values are sequences of length H; H
+    defaults to the longest stored sequence.
+    """
+    sequences = [
+        [v if isinstance(v, (list, tuple, np.ndarray)) else None for v in column]
+        for column in columns
+    ]
+    if horizon is None:
+        horizon = max((len(v) for v in sequences[2] if v is not None), default=0)
+    paths = empty_paths(len(columns[0]), horizon)
+    h = paths.horizon
+    for i, (returns, dates, rows) in enumerate(zip(*sequences)):
+        if all(v is not None and len(v) == h for v in (returns, dates, rows)):
+            paths.market_rows[i] = rows
+            paths.returns[i] = returns
+            paths.dates[i] = pd.to_datetime(list(dates)).to_numpy("datetime64[ns]")
+            paths.valid[i] = True
+    return paths
+
+
+# Reasons BarrierSessions.first_touches() reports, in per-session precedence
+# order.
+BARRIER_REASONS = ("sl_gap", "tp_gap", "sl", "tp")
+
+
+@dataclass(frozen=True)
+class BarrierSessions:
+    """Open/high/low of sessions i+1..i+H for every row i, as (rows x H) arrays.
+
+    Sessions past the last row and non-finite prices are NaN, so they never
+    touch a barrier. One instance serves every barrier scan of up to H
+    sessions: a shorter horizon reads the leading columns.
+    """
+
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+
+    @property
+    def horizon(self) -> int:
+        return self.open.shape[1]
+
+    def first_touches(
+        self, take_profit, stop_loss, horizon_days: int | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """first_barrier_touch() for every row i over sessions i+1..i+H at once.
+
+        ``take_profit`` / ``stop_loss`` are per-row levels (NaN for rows
+        without barriers); H defaults to the stored horizon. Returns (exit
+        row, reason): -1 / None where no barrier is touched or row i has
+        fewer than H sessions ahead. argmax over the per-session touch masks
+        finds the first touched session and the per-session precedence (open
+        gap before the intraday range, SL before TP) picks its reason.
+        """
+        h = self.horizon if horizon_days is None else max(1, int(horizon_days))
+        if h > self.horizon:
+            raise ValueError(
+                f"horizon {h} exceeds the stored {self.horizon} sessions"
+            )
+        n = len(self.open)
+        exit_rows = np.full(n, -1, dtype=np.int64)
+        reasons = np.full(n, None, dtype=object)
+        m = max(0, n - h)
+        if m == 0:
+            return exit_rows, reasons
+
+        tp = np.asarray(take_profit, dtype=np.float64)[:m, None]
+        sl = np.asarray(stop_loss, dtype=np.float64)[:m, None]
+        opens = self.open[:m, :h]
+        # NaN compares False, so missing prices never touch a barrier.
+        touches = [  # BARRIER_REASONS order
+            opens <= sl,
+            opens >= tp,
+            self.low[:m, :h] <= sl,
+            self.high[:m, :h] >= tp,
+        ]
+        touched = touches[0] | touches[1] | touches[2] | touches[3]
+        rows = np.flatnonzero(touched.any(axis=1))
+        first = touched[rows].argmax(axis=1)
+        reason = np.select(
+            [t[rows, first] for t in touches[:3]], [0, 1, 2], default=3
+        )
+        exit_rows[rows] = rows + 1 + first
+        reasons[rows] = np.array(BARRIER_REASONS, dtype=object)[reason]
+        return exit_rows, reasons
+
+
+def barrier_sessions(open_price, high, low, horizon_days: int) -> BarrierSessions:
+    """BarrierSessions of one ticker's positional price arrays."""
+    h = max(1, int(horizon_days))
+
+    def sessions(values):
+        values = np.asarray(values, dtype=np.float64)
+        ahead = np.full(len(values) + h, np.nan)
+        ahead[: max(0, len(values) - 1)] = values[1:]
+        window = np.lib.stride_tricks.sliding_window_view(ahead, h)[: len(values)]
+        return np.where(np.isfinite(window), window, np.nan)
+
+    return BarrierSessions(
+        open=sessions(open_price), high=sessions(high), low=sessions(low)
+    )
+
+
 def first_barrier_touch(
     market_frame: pd.DataFrame,
     *,
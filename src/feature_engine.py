@@ -0,0 +1,285 @@
+"""
+Array-level technical feature engine behind model.add_features().
+
+add_features() used to assemble its indicators column by column on a
+DataFrame, walking the up/down streak with a per-row ``.iloc`` loop over the
+full history of every ticker and building ``pd.concat(...).max(axis=1)`` and
+``.replace(0, np.nan)`` temporaries for the candle and ATR features. This
+module computes the same columns from the raw close/high/low/open/volume
+arrays in one pass:
+
+  - element-wise features (returns, divergences, candle shape, gap) are plain
+    NumPy expressions,
+  - the streak is a run-length encoding of the up/down flags,
+  - sliding statistics (rolling mean/std/max/min, EWMA) use pandas' window
+    kernels directly on the arrays, so every value is bit-for-bit what the
+    Series implementation produced.
+
+Inputs are 1-D (one ticker, rows = sessions) or 2-D (rows = sessions,
+columns = independent series); every output has the input's shape. Values are
+computed in float64.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+RETURN_HORIZONS = (1, 2, 3, 5, 10, 20)
+MA_WINDOWS = (5, 10, 20, 60)
+RSI_PERIOD = 14
+MACD_SPANS = (12, 26, 9)
+BB_PERIOD = 20
+BB_NUM_STD = 2
+ATR_PERIOD = 14
+VOLATILITY_WINDOW = 20
+VOLUME_WINDOWS = (5, 20)
+RANGE_WINDOW = 20
+# Leading rows of any input that still lack a full ma_60 window (and are
+# therefore dropped by add_features(dropna=True)).
+INCOMPLETE_LEAD_ROWS = max(MA_WINDOWS) - 1
+CALENDAR_COLS = ("day_of_week", "month", "is_month_end", "is_month_start")
+
+# Every column technical_feature_arrays() returns, in add_features' order.
+# The ma_*, atr, vol_ma_* and high/low_20d intermediates are kept because the
+# dashboard, predictor and technical screen read them.
+TECHNICAL_OUTPUT_COLS = (
+    [f"return_{d}d" for d in RETURN_HORIZONS]
+    + [c for w in MA_WINDOWS for c in (f"ma_{w}", f"div_ma_{w}")]
+    + [
+        "ma_5_20_cross",
+        "ma_20_60_cross",
+        "rsi",
+        "rsi_change",
+        "macd",
+        "macd_signal",
+        "macd_hist",
+        "macd_hist_change",
+        "bb_pct_b",
+        "bb_bandwidth",
+        "atr",
+        "atr_pct",
+        "volatility",
+        "vol_change",
+        "vol_ma_5",
+        "vol_ma_20",
+        "vol_ratio",
+        "candle_body_pct",
+        "upper_shadow_pct",
+        "lower_shadow_pct",
+        "day_of_week",
+        "month",
+        "is_month_end",
+        "is_month_start",
+        "streak",
+        "gap",
+        "high_20d",
+        "low_20d",
+        "price_position_20d",
+    ]
+)
+
+
+# --- array primitives -------------------------------------------------------
+
+
+def _frame(x: np.ndarray):
+    return pd.Series(x) if x.ndim == 1 else pd.DataFrame(x)
+
+
+def rolling(x: np.ndarray, window: int, how: str) -> np.ndarray:
+    """pandas ``rolling(window).<how>()`` along axis 0 (mean/std/max/min)."""
+    return getattr(_frame(x).rolling(window=window), how)().to_numpy()
+
+
+def sliding(x: np.ndarray, window: int, how: str) -> np.ndarray:
+    """rolling() on NumPy sliding windows: equal up to rounding, no pandas
+    overhead. Meant for short arrays where that overhead dominates."""
+    out = np.full(x.shape, np.nan)
+    if len(x) >= window:
+        views = np.lib.stride_tricks.sliding_window_view(x, window, axis=0)
+        if how == "std":
+            out[window - 1 :] = views.std(axis=-1, ddof=1)
+        else:
+            out[window - 1 :] = getattr(views, how)(axis=-1)
+    return out
+
+
+def ewm_mean(x: np.ndarray, span: int) -> np.ndarray:
+    """pandas ``ewm(span=span, adjust=False).mean()`` along axis 0."""
+    return _frame(x).ewm(span=span, adjust=False).mean().to_numpy()
+
+
+def shift(x: np.ndarray, periods: int = 1) -> np.ndarray:
+    """x shifted down by ``periods`` rows, NaN-filled."""
+    out = np.full(x.shape, np.nan)
+    if periods < len(x):
+        out[periods:] = x[: len(x) - periods]
+    return out
+
+
+def diff(x: np.ndarray, periods: int = 1) -> np.ndarray:
+    return x - shift(x, periods)
+
+
+def ffill(x: np.ndarray) -> np.ndarray:
+    """Forward-fill NaN along axis 0 (leading NaN stay NaN)."""
+    missing = np.isnan(x)
+    if not missing.any():
+        return x
+    rows = np.arange(len(x)).reshape((-1,) + (1,) * (x.ndim - 1))
+    last = np.maximum.accumulate(np.where(missing, 0, rows), axis=0)
+    return np.take_along_axis(x, np.broadcast_to(last, x.shape), axis=0)
+
+
+def pct_change(x: np.ndarray, periods: int = 1) -> np.ndarray:
+    """pandas ``pct_change(periods)`` with its default pad fill."""
+    x = ffill(x)
+    return x / shift(x, periods) - 1
+
+
+def nonzero(x: np.ndarray) -> np.ndarray:
+    """x with exact zeros replaced by NaN (``replace(0, np.nan)``)."""
+    return np.where(x == 0, np.nan, x)
+
+
+def up_down_streak(up: np.ndarray) -> np.ndarray:
+    """Signed length of the current run of up (1) / not-up (0) flags.
+
+    Positive counts consecutive ups, negative consecutive non-ups. The leading
+    run counts from up[0] itself (add_features' historical definition), so a
+    history that opens on non-up rows starts at 0.
+    """
+    up = up.astype(np.int64)
+    rows = np.arange(len(up)).reshape((-1,) + (1,) * (up.ndim - 1))
+    starts = np.ones(up.shape, dtype=bool)
+    starts[1:] = up[1:] != up[:-1]
+    run_start = np.maximum.accumulate(np.where(starts, rows, 0), axis=0)
+    length = rows - run_start + 1
+    length = np.where(run_start == 0, length - 1 + up[:1], length)
+    return length * np.where(up == 0, -1, 1)
+
+
+# --- feature engine ---------------------------------------------------------
+
+
+def calendar_arrays(dates, shape=None) -> dict[str, np.ndarray]:
+    """Calendar feature columns for ``dates`` (broadcast to a 2-D ``shape``)."""
+    dates = pd.DatetimeIndex(dates)
+    columns = {
+        "day_of_week": dates.dayofweek.to_numpy(),  # Mon=0 ... Fri=4
+        "month": dates.month.to_numpy(),
+        "is_month_end": dates.is_month_end.astype(int),
+        "is_month_start": np.asarray(dates.day <= 3).astype(int),
+    }
+    if shape is None or len(shape) == 1:
+        return columns
+    return {
+        name: np.broadcast_to(values[:, None], shape)
+        for name, values in columns.items()
+    }
+
+
+def technical_feature_arrays(
+    dates, open_, high, low, close, volume, *, exact=True
+) -> dict[str, np.ndarray]:
+    """Every TECHNICAL_OUTPUT_COLS column computed from the raw arrays.
+
+    ``dates`` has one entry per row; the price/volume arrays share one shape
+    (1-D or 2-D, rows sorted by date). dates=None omits the calendar columns
+    (for layouts whose rows are not one date, see panel_features). exact=False
+    computes the rolling statistics with sliding() instead of the pandas
+    kernels.
+    """
+    roll = rolling if exact else sliding
+    # Zero ranges/averages yield NaN/inf exactly like the pandas operators.
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return _technical_feature_arrays(
+            dates, open_, high, low, close, volume, roll
+        )
+
+
+def _technical_feature_arrays(dates, open_, high, low, close, volume, roll):
+    open_, high, low, close, volume = (
+        np.asarray(a, dtype=np.float64) for a in (open_, high, low, close, volume)
+    )
+    out: dict[str, np.ndarray] = {}
+
+    # Returns (multi-horizon)
+    for d in RETURN_HORIZONS:
+        out[f"return_{d}d"] = pct_change(close, d)
+
+    # Moving averages and their divergence
+    ma = {}
+    for w in MA_WINDOWS:
+        ma[w] = roll(close, w, "mean")
+        out[f"ma_{w}"] = ma[w]
+        out[f"div_ma_{w}"] = (close - ma[w]) / ma[w]
+    out["ma_5_20_cross"] = ma[5] / ma[20] - 1  # golden/dead cross proximity
+    out["ma_20_60_cross"] = ma[20] / ma[60] - 1
+
+    # RSI
+    delta = diff(close)
+    gain = roll(np.where(delta > 0, delta, 0.0), RSI_PERIOD, "mean")
+    loss = roll(-np.where(delta < 0, delta, 0.0), RSI_PERIOD, "mean")
+    rsi = 100 - (100 / (1 + gain / loss))
+    out["rsi"] = rsi
+    out["rsi_change"] = diff(rsi)
+
+    # MACD
+    fast, slow, signal = MACD_SPANS
+    macd = ewm_mean(close, fast) - ewm_mean(close, slow)
+    macd_signal = ewm_mean(macd, signal)
+    macd_hist = macd - macd_signal
+    out["macd"] = macd
+    out["macd_signal"] = macd_signal
+    out["macd_hist"] = macd_hist
+    out["macd_hist_change"] = diff(macd_hist)  # momentum of momentum
+
+    # Bollinger bands
+    sma = roll(close, BB_PERIOD, "mean")
+    std = roll(close, BB_PERIOD, "std")
+    upper = sma + BB_NUM_STD * std
+    lower = sma - BB_NUM_STD * std
+    out["bb_pct_b"] = (close - lower) / (upper - lower)
+    out["bb_bandwidth"] = (upper - lower) / sma
+
+    # ATR (volatility); fmax skips the missing previous close like max(axis=1)
+    prev_close = shift(close)
+    true_range = np.fmax(
+        np.fmax(high - low, np.abs(high - prev_close)), np.abs(low - prev_close)
+    )
+    atr = roll(true_range, ATR_PERIOD, "mean")
+    out["atr"] = atr
+    out["atr_pct"] = atr / close
+
+    out["volatility"] = roll(out["return_1d"], VOLATILITY_WINDOW, "std")
+
+    # Volume
+    out["vol_change"] = pct_change(volume)
+    short, long = VOLUME_WINDOWS
+    out[f"vol_ma_{short}"] = roll(volume, short, "mean")
+    out[f"vol_ma_{long}"] = roll(volume, long, "mean")
+    out["vol_ratio"] = out[f"vol_ma_{short}"] / out[f"vol_ma_{long}"]
+
+    # Candlestick shape
+    candle_range = nonzero(high - low)
+    out["candle_body_pct"] = (close - open_) / candle_range
+    out["upper_shadow_pct"] = (high - np.fmax(close, open_)) / candle_range
+    out["lower_shadow_pct"] = (np.fmin(close, open_) - low) / candle_range
+
+    if dates is not None:
+        out.update(calendar_arrays(dates, close.shape))
+
+    # Streak: consecutive up/down days (positive = consecutive ups)
+    out["streak"] = up_down_streak(out["return_1d"] > 0)
+
+    out["gap"] = open_ / prev_close - 1  # overnight gap
+
+    # High / low position
+    high_20d = roll(high, RANGE_WINDOW, "max")
+    low_20d = roll(low, RANGE_WINDOW, "min")
+    out["high_20d"] = high_20d
+    out["low_20d"] = low_20d
+    out["price_position_20d"] = (close - low_20d) / nonzero(high_20d - low_20d)
+    return out
@@ -0,0 +1,356 @@
+"""
+Incremental technical features from persisted per-ticker indicator state.
+
+Consumers such as scripts/technical_screen.py only read the latest feature
+row, yet add_features() recomputes every indicator over the full history of
+every ticker on each run. This module keeps a small state file next to each
+price file (``data/<code>.features.json``) holding what the indicators need
+to advance by one bar:
+
+  - the last TAIL_ROWS OHLCV rows (ring buffer for the 5/10/20/60 windows,
+    RSI/ATR/Bollinger/volatility and the multi-horizon returns),
+  - the EWMA accumulators behind MACD and its signal line,
+  - the up/down streak counter and the last MACD histogram,
+  - the feature row of the last bar.
+
+latest_features() appends feature rows for the bars that arrived since the
+state was written and returns the last one. Windowed indicators are
+recomputed over the buffer with the array engine and the EWMAs/streak
+continue from the stored accumulators, so a new bar costs O(window) instead
+of O(history). The state is discarded and rebuilt with a full add_features()
+pass when it is missing, written by another engine version, or no longer
+matches the price history (e.g. a split-adjusted rewrite). Every
+TRADER_FEATURE_FULL_CHECK_EVERY appends the incremental row is compared
+against a full recompute and the state is rebuilt from it.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .env import get_env_bool, get_env_int
+from .feature_engine import (
+    CALENDAR_COLS,
+    MACD_SPANS,
+    TECHNICAL_OUTPUT_COLS,
+    calendar_arrays,
+    ewm_mean,
+    technical_feature_arrays,
+)
+
+FEATURE_STATE_VERSION = 1
+DEFAULT_INCREMENTAL_ENABLED = True
+DEFAULT_FULL_CHECK_EVERY = 20
+# Stored bars a new bar needs for complete windowed features: ma_60 reads the
+# 59 previous closes, everything else less.
+TAIL_ROWS = 60
+PRICE_COLS = ["open", "high", "low", "close", "volume"]
+# Incremental rows may differ from a full recompute by rounding only (the
+# rolling sums restart at the buffer); anything larger is a real mismatch.
+CHECK_RTOL = 1e-9
+CHECK_ATOL = 1e-12
+
+_SUFFIX = ".parquet"
+
+
+def incremental_enabled() -> bool:
+    return get_env_bool(
+        "TRADER_FEATURE_INCREMENTAL_ENABLED", DEFAULT_INCREMENTAL_ENABLED
+    )
+
+
+def state_path(price_path) -> Path:
+    """State file of one ticker's price file (``<code>.features.json``)."""
+    price_path = Path(price_path)
+    return price_path.with_name(price_path.name[: -len(_SUFFIX)] + ".features.json")
+
+
+# --- EWMA ------------------------------------------------------------------
+
+
+def _ewm_alpha(span: int) -> float:
+    # Same derivation as pandas (span -> center of mass -> alpha).
+    return 1.0 / (1.0 + (span - 1) / 2.0)
+
+
+def ewm_step(acc: list, value: float, span: int) -> list:
+    """Advance an ``ewm(span, adjust=False).mean()`` accumulator by one value.
+
+    acc is [weighted, old_weight] and follows pandas' recursion exactly, so
+    continuing from a stored accumulator reproduces the full-history value.
+    """
+    alpha = _ewm_alpha(span)
+    weighted, old_wt = acc
+    observed = value == value
+    if weighted == weighted:
+        old_wt *= 1.0 - alpha
+        if observed:
+            if weighted != value:
+                weighted = (old_wt * weighted + alpha * value) / (old_wt + alpha)
+            old_wt = 1.0
+    elif observed:
+        weighted = value
+    return [weighted, old_wt]
+
+
+def _ewm_accumulator(values: np.ndarray, span: int) -> list:
+    """ewm_step() accumulator after the last of ``values``."""
+    mean = ewm_mean(values, span)
+    # old_weight is reset by each observation and decays over trailing NaN.
+    old_wt = 1.0
+    for value in values[::-1]:
+        if value == value:
+            break
+        old_wt *= 1.0 - _ewm_alpha(span)
+    return [float(mean[-1]), old_wt]
+
+
+# --- state -----------------------------------------------------------------
+
+
+def _float_list(values) -> list:
+    return [float(v) for v in values]
+
+
+def _row_dict(row: pd.Series) -> dict:
+    # Calendar columns are rederived from the date when a row is served.
+    return {
+        col: int(row[col]) if col == "streak" else float(row[col])
+        for col in TECHNICAL_OUTPUT_COLS
+        if col not in CALENDAR_COLS
+    }
+
+
+def build_state(history: pd.DataFrame, featured: pd.DataFrame) -> dict:
+    """State after the last row of ``history`` (sorted), given its features."""
+    fast, slow, signal = MACD_SPANS
+    close = history["close"].to_numpy(dtype=np.float64)
+    ema_fast = _ewm_accumulator(close, fast)
+    ema_slow = _ewm_accumulator(close, slow)
+    # The stored full-history MACD line seeds the signal accumulator.
+    macd = featured["macd"].to_numpy(dtype=np.float64)
+    last = featured.iloc[-1]
+    tail = history.iloc[-TAIL_ROWS:]
+    return {
+        "version": FEATURE_STATE_VERSION,
+        "columns": list(TECHNICAL_OUTPUT_COLS),
+        "first_date": history["date"].iloc[0].isoformat(),
+        "last_date": history["date"].iloc[-1].isoformat(),
+        "rows": int(len(history)),
+        "appends_since_check": 0,
+        "tail": {
+            "date": [d.isoformat() for d in tail["date"]],
+            **{col: _float_list(tail[col]) for col in PRICE_COLS},
+        },
+        "ewm": {
+            "fast": ema_fast,
+            "slow": ema_slow,
+            "signal": _ewm_accumulator(macd, signal),
+        },
+        "up": int(last["streak"] > 0),
+        "run": abs(int(last["streak"])),
+        "last_row": _row_dict(last),
+    }
+
+
+def _tail_arrays(state: dict) -> tuple[np.ndarray, dict]:
+    tail = state["tail"]
+    dates = np.array(tail["date"], dtype="datetime64[ns]")
+    return dates, {col: np.asarray(tail[col], dtype=np.float64) for col in PRICE_COLS}
+
+
+def advance(state: dict, bars: pd.DataFrame) -> tuple[dict, dict]:
+    """Feature rows for ``bars`` (after state['last_date']) and the new state.
+
+    bars carries date + OHLCV, sorted; the rows come back as
+    {column: array with one value per bar} over TECHNICAL_OUTPUT_COLS.
+    """
+    fast, slow, signal = MACD_SPANS
+    tail_dates, tail = _tail_arrays(state)
+    dates = np.concatenate([tail_dates, bars["date"].to_numpy("datetime64[ns]")])
+    prices = {
+        col: np.concatenate([tail[col], bars[col].to_numpy(dtype=np.float64)])
+        for col in PRICE_COLS
+    }
+    arrays = technical_feature_arrays(
+        dates, *(prices[col] for col in PRICE_COLS), exact=False
+    )
+    new = slice(len(tail_dates), len(dates))
+    rows = {col: arrays[col][new] for col in TECHNICAL_OUTPUT_COLS}
+
+    # The buffer restarts the EWMAs and the streak; continue the stored ones.
+    ewm = {key: list(acc) for key, acc in state["ewm"].items()}
+    prev_hist = state["last_row"]["macd_hist"]
+    up, run = state["up"], state["run"]
+    macd, macd_signal, macd_hist, hist_change, streak = [], [], [], [], []
+    for close, ret in zip(prices["close"][new], rows["return_1d"]):
+        ewm["fast"] = ewm_step(ewm["fast"], float(close), fast)
+        ewm["slow"] = ewm_step(ewm["slow"], float(close), slow)
+        line = ewm["fast"][0] - ewm["slow"][0]
+        ewm["signal"] = ewm_step(ewm["signal"], line, signal)
+        hist = line - ewm["signal"][0]
+        macd.append(line)
+        macd_signal.append(ewm["signal"][0])
+        macd_hist.append(hist)
+        hist_change.append(hist - prev_hist)
+        prev_hist = hist
+        bar_up = int(ret > 0)
+        run = run + 1 if bar_up == up else 1
+        up = bar_up
+        streak.append(run if up else -run)
+    rows["macd"] = np.asarray(macd)
+    rows["macd_signal"] = np.asarray(macd_signal)
+    rows["macd_hist"] = np.asarray(macd_hist)
+    rows["macd_hist_change"] = np.asarray(hist_change)
+    rows["streak"] = np.asarray(streak, dtype=np.int64)
+
+    new_state = {
+        **state,
+        "last_date": pd.Timestamp(dates[-1]).isoformat(),
+        "rows": state["rows"] + len(bars),
+        "appends_since_check": state["appends_since_check"] + 1,
+        "tail": {
+            "date": [pd.Timestamp(d).isoformat() for d in dates[-TAIL_ROWS:]],
+            **{col: _float_list(prices[col][-TAIL_ROWS:]) for col in PRICE_COLS},
+        },
+        "ewm": ewm,
+        "up": up,
+        "run": run,
+        "last_row": {
+            col: int(values[-1]) if col == "streak" else float(values[-1])
+            for col, values in rows.items()
+            if col not in CALENDAR_COLS
+        },
+    }
+    return rows, new_state
+
+
+def load_state(path) -> dict | None:
+    path = Path(path)
+    if not path.exists():
+        return None
+    try:
+        state = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        print(f"feature state: ignoring unreadable {path}: {exc}")
+        return None
+    if (
+        state.get("version") != FEATURE_STATE_VERSION
+        or state.get("columns") != list(TECHNICAL_OUTPUT_COLS)
+    ):
+        return None
+    return state
+
+
+def save_state(path, state: dict) -> None:
+    path = Path(path)
+    temp_path = path.with_name(f".{path.name}.tmp")
+    temp_path.write_text(json.dumps(state, separators=(",", ":")), encoding="utf-8")
+    temp_path.replace(path)
+
+
+def _matches_history(state: dict, history: pd.DataFrame) -> bool:
+    """The stored buffer still equals the corresponding price rows."""
+    dates = history["date"].to_numpy("datetime64[ns]")
+    tail_dates, tail = _tail_arrays(state)
+    if dates[-1] < tail_dates[-1]:
+        return False
+    if dates[0] == np.datetime64(pd.Timestamp(state["first_date"])):
+        if int(np.searchsorted(dates, tail_dates[-1], side="right")) != state["rows"]:
+            return False
+    pos = np.searchsorted(dates, tail_dates)
+    if pos[-1] >= len(dates) or not np.array_equal(dates[pos], tail_dates):
+        return False
+    return all(
+        np.array_equal(
+            history[col].to_numpy(dtype=np.float64)[pos], tail[col], equal_nan=True
+        )
+        for col in PRICE_COLS
+    )
+
+
+def _full_rebuild(history: pd.DataFrame) -> tuple[pd.DataFrame, dict]:
+    from .model import add_features
+
+    featured = add_features(history, dropna=False)
+    return featured, build_state(history, featured)
+
+
+def _drifted_columns(row: dict, reference: pd.Series) -> list[str]:
+    return [
+        col
+        for col, value in row.items()
+        if not np.isclose(
+            value,
+            float(reference[col]),
+            rtol=CHECK_RTOL,
+            atol=CHECK_ATOL,
+            equal_nan=True,
+        )
+    ]
+
+
+def latest_features(
+    df: pd.DataFrame, price_path, ticker_code=None, *, check_every=None
+) -> pd.DataFrame:
+    """
+    add_features(df, dropna=False).iloc[[-1]] from the persisted state.
+
+    df is the ticker's full price history (as stored at ``price_path``); the
+    state next to that file is advanced over the bars it has not seen yet
+    and saved. Returns a one-row frame: df's last row plus every
+    TECHNICAL_OUTPUT_COLS column.
+    """
+    history = df.sort_values("date").reset_index(drop=True)
+    if history.empty:
+        return history
+    label = ticker_code or Path(price_path).name
+    path = state_path(price_path)
+    every = (
+        check_every
+        if check_every is not None
+        else get_env_int("TRADER_FEATURE_FULL_CHECK_EVERY", DEFAULT_FULL_CHECK_EVERY)
+    )
+
+    state = load_state(path)
+    if state is not None and not _matches_history(state, history):
+        print(f"feature state: {label} price history changed; rebuilding.")
+        state = None
+    if state is None:
+        featured, state = _full_rebuild(history)
+        save_state(path, state)
+        return featured.iloc[[-1]].reset_index(drop=True)
+
+    bars = history[history["date"] > pd.Timestamp(state["last_date"])]
+    if not bars.empty:
+        _, state = advance(state, bars)
+        if every > 0 and state["appends_since_check"] >= every:
+            featured, rebuilt = _full_rebuild(history)
+            drifted = _drifted_columns(state["last_row"], featured.iloc[-1])
+            if drifted:
+                print(
+                    f"feature state: {label} incremental features drifted from a "
+                    f"full recompute ({', '.join(drifted)}); rebuilt."
+                )
+            state = rebuilt
+        save_state(path, state)
+
+    return _served_row(history, state["last_row"])
+
+
+def _served_row(history: pd.DataFrame, values: dict) -> pd.DataFrame:
+    """history's last row + the feature values, typed like add_features()."""
+    last = history.iloc[[-1]]
+    features = {
+        **{col: np.asarray([value]) for col, value in values.items()},
+        **calendar_arrays(last["date"]),
+        "streak": np.asarray([values["streak"]], dtype=np.int64),
+    }
+    # Same column placement as add_features() on an already featured frame.
+    columns = {col: last[col].to_numpy() for col in history.columns}
+    columns.update({col: features[col] for col in TECHNICAL_OUTPUT_COLS})
+    return pd.DataFrame(columns)
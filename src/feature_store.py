@@ -0,0 +1,316 @@
+"""
+Persistent per-ticker feature store under ``data/features/``.
+
+main.py, drift_check, the weekly retrains, monthly_audit, stress_test and
+technical_screen each rebuilt build_feature_frame() output for the same
+tickers from the same price files. The store materializes a ticker's
+technical + macro frame once and serves later requests for rows of that
+history from disk:
+
+  - an entry is keyed by a SHA-256 fingerprint of the ticker's stored OHLCV
+    (its parquet base + delta files, hashed once per file version in a
+    process), phase1_feature_schema_hash() of the feature schema and a
+    fingerprint of the macro panel, so a new bar, a rewritten history, a
+    schema change or a refreshed macro panel all miss and rebuild, and by
+    the first date of the stored rows its features were computed from,
+  - an entry keeps the date/OHLCV columns it was computed from and is written
+    in ROW_GROUP_ROWS row groups, so a hit reads only the row groups of the
+    requested window and never reloads the price history,
+  - only entries of the newest data per ticker and schema are kept.
+
+features_for() is the build_feature_frame() path: it serves a caller's OHLCV
+frame when its rows equal the stored rows of the same dates and returns None
+otherwise (synthetic or modified frames, watchlist files), in which case the
+caller computes directly. Its entry starts at the caller's first row, so a
+windowed load (load_data(since=, warmup_rows=)) gets its own entry. Every
+feature only looks back, hence the served rows equal a direct computation on
+the caller's frame exactly, EWMA columns included, and dropna keeps the same
+rows. load_features() fetches a full, date or tail window of the full-history
+entry by ticker code.
+
+The directory is derived data and is not committed (.gitignore); workflows
+carry it between jobs with actions/cache.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from . import price_store
+from .config import DATA_DIR
+from .env import get_env_bool
+from .macro import MACRO_FEATURE_COLS, add_macro_features
+from .model_store import payload_sha256, phase1_feature_schema_hash
+from .timeutil import now_jst_iso
+
+FEATURE_STORE_DIR = DATA_DIR / "features"
+FEATURE_STORE_VERSION = 1
+DEFAULT_STORE_ENABLED = True
+# ~Four trading years per row group: feature rows are ~12x wider than OHLCV
+# rows, and smaller groups cost more in per-chunk overhead than they save.
+ROW_GROUP_ROWS = 1000
+# Parquet footer key holding an entry's key components.
+METADATA_KEY = "trader_feature_store"
+
+_SUFFIX = ".parquet"
+_lock = threading.Lock()
+# (panel, fingerprint) of the last macro panel seen; one panel serves a run.
+_macro_memo: tuple | None = None
+# Price file -> (ticker_fingerprint, SHA-256) of the last version hashed.
+_ohlcv_memo: dict[Path, tuple] = {}
+
+
+def store_enabled() -> bool:
+    return get_env_bool("TRADER_FEATURE_STORE_ENABLED", DEFAULT_STORE_ENABLED)
+
+
+def ohlcv_fingerprint(price_path) -> str | None:
+    """SHA-256 of a ticker's stored OHLCV files, or None when there are none.
+
+    The bytes are hashed once per file version: while the (mtime, size) of
+    the base and delta files (price_store.ticker_fingerprint) is unchanged,
+    later calls return the memoized digest after a stat of each file.
+    """
+    price_path = Path(price_path)
+    version = price_store.ticker_fingerprint(price_path)
+    if version is None:
+        return None
+    memo = _ohlcv_memo.get(price_path)
+    if memo is not None and memo[0] == version:
+        return memo[1]
+    digest = hashlib.sha256()
+    try:
+        for part in [price_path, *price_store.delta_paths(price_path)]:
+            digest.update(part.name.encode("utf-8"))
+            digest.update(part.read_bytes())
+    except FileNotFoundError:
+        return None
+    fingerprint = digest.hexdigest()
+    # A write between the stat and the read leaves an unknown version.
+    if price_store.ticker_fingerprint(price_path) == version:
+        _ohlcv_memo[price_path] = (version, fingerprint)
+    return fingerprint
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """Stable SHA-256 of a frame's column names and values (index ignored).
+
+    Unlike run_cache.content_fingerprint() it does not depend on Python's
+    per-process hash seed, so it can key files shared between processes.
+    """
+    digest = hashlib.sha256()
+    digest.update("\x1f".join(str(c) for c in df.columns).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def macro_fingerprint(macro_panel: pd.DataFrame | None) -> str:
+    """frame_fingerprint() of the macro panel, memoized by panel identity."""
+    global _macro_memo
+    if macro_panel is None or macro_panel.empty:
+        return "none"
+    memo = _macro_memo
+    if memo is not None and memo[0] is macro_panel:
+        return memo[1]
+    fingerprint = frame_fingerprint(macro_panel)
+    _macro_memo = (macro_panel, fingerprint)
+    return fingerprint
+
+
+def store_key(ohlcv_fp: str, schema_hash: str, macro_fp: str, start=None) -> dict:
+    """Key components of one entry (also stored in its parquet footer).
+
+    start is the first stored date the features are computed from (None:
+    the whole history).
+    """
+    return {
+        "version": FEATURE_STORE_VERSION,
+        "ohlcv_fingerprint": ohlcv_fp,
+        "feature_schema_hash": schema_hash,
+        "macro_fingerprint": macro_fp,
+        "start": None if start is None else pd.Timestamp(start).isoformat(),
+    }
+
+
+def _prefix(ticker_code: str, key: dict) -> str:
+    return f"{ticker_code}.{key['feature_schema_hash'][:8]}"
+
+
+def _data_prefix(ticker_code: str, key: dict) -> str:
+    """_prefix() + the key without its start: one per data version."""
+    data = {k: v for k, v in key.items() if k != "start"}
+    return f"{_prefix(ticker_code, key)}.{payload_sha256(data)[:8]}"
+
+
+def entry_path(ticker_code: str, key: dict) -> Path:
+    """``data/features/<code>.<schema>.<data>.<key>.parquet`` for one key."""
+    name = f"{_data_prefix(ticker_code, key)}.{payload_sha256(key)[:16]}{_SUFFIX}"
+    return FEATURE_STORE_DIR / name
+
+
+def discard(ticker_code: str, root=None) -> None:
+    """Delete every stored entry of a ticker (e.g. when it is archived)."""
+    root = FEATURE_STORE_DIR if root is None else Path(root)
+    for path in root.glob(f"{ticker_code}.*{_SUFFIX}"):
+        path.unlink(missing_ok=True)
+
+
+def _schema_hash(macro_enabled: bool) -> str:
+    from .model import phase1_feature_cols
+
+    return phase1_feature_schema_hash(phase1_feature_cols(macro_enabled))
+
+
+def _history(ticker_code: str, since=None) -> pd.DataFrame | None:
+    from .data_loader import load_data
+
+    history = load_data(ticker_code, since=since)
+    return None if history is None or history.empty else history
+
+
+def _key(ticker_code, macro_panel, macro_enabled, start=None) -> dict | None:
+    ohlcv_fp = ohlcv_fingerprint(DATA_DIR / f"{ticker_code}{_SUFFIX}")
+    if ohlcv_fp is None:
+        return None
+    return store_key(
+        ohlcv_fp,
+        _schema_hash(macro_enabled),
+        macro_fingerprint(macro_panel if macro_enabled else None),
+        start,
+    )
+
+
+def _materialize(ticker_code, key, history, macro_panel, macro_enabled) -> Path:
+    """Write build_feature_frame(history, dropna_features=False)."""
+    from .model import add_features
+
+    featured = add_features(history, dropna=False)
+    if macro_enabled:
+        featured = add_macro_features(featured, macro_panel, {"code": ticker_code})
+    path = entry_path(ticker_code, key)
+    with _lock:
+        if not path.exists():
+            # Entries of older data of this ticker + schema can never match.
+            current = f"{_data_prefix(ticker_code, key)}."
+            for stale in path.parent.glob(f"{_prefix(ticker_code, key)}.*{_SUFFIX}"):
+                if not stale.name.startswith(current):
+                    stale.unlink(missing_ok=True)
+            price_store.write_ticker_file(
+                path,
+                featured,
+                metadata={
+                    METADATA_KEY: {
+                        **key,
+                        "ticker": ticker_code,
+                        "rows": int(len(featured)),
+                        "created_at": now_jst_iso(),
+                    }
+                },
+                row_group_size=ROW_GROUP_ROWS,
+            )
+    return path
+
+
+def entry(ticker_code, macro_panel=None, macro_enabled=True) -> Path | None:
+    """Full-history entry for the ticker's current data, materialized on a miss.
+
+    None when the ticker has no local price history.
+    """
+    key = _key(ticker_code, macro_panel, macro_enabled)
+    if key is None:
+        return None
+    path = entry_path(ticker_code, key)
+    if path.exists():
+        return path
+    history = _history(ticker_code)
+    if history is None:
+        return None
+    return _materialize(ticker_code, key, history, macro_panel, macro_enabled)
+
+
+def _dropna(featured: pd.DataFrame, macro_enabled: bool) -> pd.DataFrame:
+    """add_features' dropna: macro columns may stay NaN."""
+    checked = featured.columns
+    if macro_enabled:
+        checked = [c for c in checked if c not in MACRO_FEATURE_COLS]
+    return featured[featured[checked].notna().all(axis=1)].reset_index(drop=True)
+
+
+def load_features(
+    ticker_code,
+    macro_panel=None,
+    *,
+    since=None,
+    until=None,
+    tail_rows=None,
+    macro_enabled=True,
+    dropna=True,
+):
+    """Stored features of ticker_code's full, date or tail window, or None.
+
+    since/until are inclusive dates and tail_rows the last N stored rows (the
+    later start wins when both are given), as in data_loader.load_data().
+    """
+    path = entry(ticker_code, macro_panel, macro_enabled)
+    if path is None:
+        return None
+    start, end = price_store.window_bounds(path, since, until, tail_rows=tail_rows)
+    featured = price_store.read_ticker_file(path, start=start, end=end)
+    featured.attrs = {}
+    return _dropna(featured, macro_enabled) if dropna else featured
+
+
+def _same_rows(stored: pd.DataFrame, df: pd.DataFrame) -> bool:
+    """True when df holds exactly stored's leading columns and rows."""
+    columns = list(df.columns)
+    if len(stored) != len(df) or list(stored.columns[: len(columns)]) != columns:
+        return False
+    frame = df.sort_values("date")
+    values = [c for c in columns if c != "date"]
+    try:
+        dates = frame["date"].to_numpy(dtype="datetime64[ns]")
+        if not np.array_equal(stored["date"].to_numpy(), dates):
+            return False
+        ours = frame[values].to_numpy(dtype=np.float64)
+        theirs = stored[values].to_numpy(dtype=np.float64)
+    except (TypeError, ValueError):
+        return False
+    return np.array_equal(ours, theirs, equal_nan=True)
+
+
+def features_for(df, ticker_code, macro_panel=None, macro_enabled=True, dropna=True):
+    """build_feature_frame(df, ...) served from the store, or None.
+
+    The entry is computed from the stored rows from df's first date on, so
+    the result is exactly what a direct computation on df returns. None means
+    the store cannot vouch for df (disabled, no local history, or df's rows
+    differ from the stored ones) and the caller must compute.
+    """
+    if not ticker_code or df is None or df.empty or not store_enabled():
+        return None
+    if "date" not in df.columns:
+        return None
+    first, last = df["date"].min(), df["date"].max()
+    key = _key(ticker_code, macro_panel, macro_enabled, start=first)
+    if key is None:
+        return None
+    path = entry_path(ticker_code, key)
+    if not path.exists():
+        # Only materialize for frames the stored history can serve; only the
+        # rows from df's first date on are read.
+        history = _history(ticker_code, since=first)
+        if history is None or history["date"].iloc[0] != first:
+            return None
+        if not _same_rows(history[history["date"] <= last], df):
+            return None
+        _materialize(ticker_code, key, history, macro_panel, macro_enabled)
+    stored = price_store.read_ticker_file(path, end=last)
+    if not _same_rows(stored, df):
+        return None
+    stored.attrs = dict(df.attrs)
+    return _dropna(stored, macro_enabled) if dropna else stored
@@ -28,9 +28,13 @@ import warnings
 import numpy as np
 import pandas as pd
 
-from .execution import add_execution_columns, first_barrier_touch
+from .execution import add_execution_columns, barrier_sessions
 
 LABEL_MODES = ("triple_barrier", "binary_1d")
+BARRIER_COLUMNS = {"open", "high", "low"}
+# Columns of the triple_barrier_label_sweep() table after the config columns.
+SWEEP_COLUMNS = ["date", "fwd_return", "target_class", "tb_exit_reason", "tb_exit_date"]
+SWEEP_TABLE_COLUMNS = ["tb_tp_atr", "tb_sl_atr", "tb_max_days"] + SWEEP_COLUMNS
 
 
 def _normalize_label_mode(label_mode: str) -> str:
@@ -67,6 +71,16 @@ def add_forward_return_labels(df: pd.DataFrame, horizon_days: int = 5) -> pd.Dat
     return out
 
 
+def _day_strings(dates: pd.Series) -> np.ndarray:
+    """``str(pd.Timestamp(d).date())`` of every date, as an object array."""
+    if pd.api.types.is_datetime64_any_dtype(dates):
+        if getattr(dates.dt, "tz", None) is not None:
+            dates = dates.dt.tz_localize(None)  # keep the local calendar day
+        days = dates.to_numpy(dtype="datetime64[ns]").astype("datetime64[D]")
+        return np.datetime_as_string(days).astype(object)
+    return np.array([str(pd.Timestamp(d).date()) for d in dates], dtype=object)
+
+
 def add_triple_barrier_labels(
     df: pd.DataFrame,
     horizon_days: int = 5,
@@ -88,14 +102,45 @@ def add_triple_barrier_labels(
       TP first -> 1, SL first -> 0; if neither is touched, time exit uses the
       sign of close[i+H] vs open[i+1]. When TP and SL are touched in the SAME
       bar, we conservatively assume SL first (worst case for a long).
+    All rows are resolved at once by BarrierSessions.first_touches() on
+    (rows x H) windows of open/high/low.
 
     `fwd_return` is always the fixed executable H-session return (for the
     backtest), independent of where the barrier exit actually happened.
     """
-    out = add_execution_columns(df, horizon_days)
-    n = len(out)
     h = max(1, int(horizon_days))
+    out = add_execution_columns(df, h)
+    columns = _triple_barrier_columns(
+        out, _barrier_sessions(out, h), None, h, tp_atr, sl_atr, atr_col
+    )
+    for name, values in columns.items():
+        out[name] = values
+    return out
+
+
+def _barrier_sessions(frame: pd.DataFrame, horizon_days: int):
+    """barrier_sessions() of frame's open/high/low, None if any is missing."""
+    if BARRIER_COLUMNS.difference(frame.columns):
+        return None
+    return barrier_sessions(
+        *(
+            pd.to_numeric(frame[col], errors="coerce").to_numpy(dtype="float64")
+            for col in ("open", "high", "low")
+        ),
+        horizon_days,
+    )
+
 
+def _triple_barrier_columns(
+    out, sessions, day_strings, h, tp_atr, sl_atr, atr_col
+) -> dict[str, np.ndarray]:
+    """target_class / target / tb_exit_reason / tb_exit_date for one config.
+
+    ``out`` is add_execution_columns(..., h) output, ``sessions`` its
+    _barrier_sessions() for h or more sessions and ``day_strings`` its
+    _day_strings() (computed on demand when None).
+    """
+    n = len(out)
     close = pd.to_numeric(out["close"], errors="coerce").to_numpy(dtype="float64")
     entry_price = pd.to_numeric(out["entry_price"], errors="coerce").to_numpy(
         dtype="float64"
@@ -106,41 +151,44 @@ def add_triple_barrier_labels(
         atr = np.full(n, np.nan)
 
     labels = np.full(n, np.nan)
-    reasons: list[str | None] = [None] * n
-    exit_dates: list[str | None] = [None] * n
-
-    for i in range(n):
-        entry = entry_price[i]
-        a = atr[i]
-        if not (np.isfinite(entry) and entry > 0 and np.isfinite(a) and a > 0):
-            continue
-
-        if i + h > n - 1:
-            continue
-
-        tp_level = entry + tp_atr * a
-        sl_level = entry - sl_atr * a
-        exit_index, reason = first_barrier_touch(
-            out,
-            entry_index=i + 1,
-            exit_index=i + h,
-            take_profit=tp_level,
-            stop_loss=sl_level,
+    reasons = np.full(n, None, dtype=object)
+    exit_dates = np.full(n, None, dtype=object)
+
+    with np.errstate(invalid="ignore"):
+        barriers = np.isfinite(entry_price) & (entry_price > 0)
+        barriers &= np.isfinite(atr) & (atr > 0)
+    barriers[max(0, n - h) :] = False  # fewer than H sessions ahead
+    if barriers.any():
+        if sessions is None:
+            missing = sorted(BARRIER_COLUMNS.difference(out.columns))
+            raise ValueError(f"market_frame missing barrier columns: {missing}")
+        if day_strings is None:
+            day_strings = _day_strings(out["date"])
+        exit_rows, touch_reasons = sessions.first_touches(
+            np.where(barriers, entry_price + tp_atr * atr, np.nan),
+            np.where(barriers, entry_price - sl_atr * atr, np.nan),
+            horizon_days=h,
         )
-        if reason is not None:
-            labels[i] = 1.0 if reason.startswith("tp") else 0.0
-            reasons[i] = reason
-            exit_dates[i] = str(pd.Timestamp(out["date"].iloc[exit_index]).date())
-        elif np.isfinite(close[i + h]):
-            labels[i] = 1.0 if close[i + h] > entry else 0.0
-            reasons[i] = "time"
-            exit_dates[i] = str(pd.Timestamp(out["date"].iloc[i + h]).date())
-
-    out["target_class"] = labels
-    out["target"] = labels
-    out["tb_exit_reason"] = reasons
-    out["tb_exit_date"] = exit_dates
-    return out
+        touched = np.flatnonzero(barriers & (exit_rows >= 0))
+        touched_reasons = touch_reasons[touched]
+        labels[touched] = (touched_reasons == "tp") | (touched_reasons == "tp_gap")
+        reasons[touched] = touched_reasons
+        exit_dates[touched] = day_strings[exit_rows[touched]]
+
+        # Neither barrier: the time exit uses the sign of close[i+H] vs entry.
+        exit_close = np.full(n, np.nan)
+        exit_close[: n - h] = close[h:]
+        timed = np.flatnonzero(barriers & (exit_rows < 0) & np.isfinite(exit_close))
+        labels[timed] = exit_close[timed] > entry_price[timed]
+        reasons[timed] = "time"
+        exit_dates[timed] = day_strings[timed + h]
+
+    return {
+        "target_class": labels,
+        "target": labels,
+        "tb_exit_reason": reasons,
+        "tb_exit_date": exit_dates,
+    }
 
 
 def effective_horizon(config: dict | None) -> int:
@@ -166,9 +214,88 @@ def build_labelled_frame(df: pd.DataFrame, config: dict | None = None) -> pd.Dat
     Rows missing a usable `target`, `target_class`, or `fwd_return` are dropped,
     so the last H rows (unknown forward return) always fall out.
     """
-    cfg = config or {}
-    mode = _normalize_label_mode(cfg.get("label_mode", "triple_barrier"))
-    horizon = max(1, int(cfg.get("horizon_days", 5)))
+    return build_labelled_frames(df, [config])[0]
+
+
+def build_labelled_frames(df: pd.DataFrame, configs) -> list[pd.DataFrame]:
+    """
+    build_labelled_frame(df, config) for every config, computed in one pass.
+
+    Triple-barrier configs share one open/high/low session tensor sized for
+    the longest tb_max_days and one add_execution_columns() per distinct
+    horizon, so each further (tb_tp_atr, tb_sl_atr, tb_max_days) point costs
+    only its barrier comparisons.
+    """
+    frames = []
+    for executed, rows, columns in _label_variants(df, configs):
+        labelled = executed.take(rows).reset_index(drop=True)
+        for name, values in columns.items():
+            labelled[name] = values[rows]
+        if not labelled.empty:
+            labelled["target_class"] = labelled["target_class"].astype(int)
+        frames.append(labelled)
+    return frames
+
+
+def triple_barrier_label_sweep(df: pd.DataFrame, grid) -> pd.DataFrame:
+    """
+    Tidy long table of triple-barrier labels over a (tp, sl, H) grid.
+
+    ``grid`` yields (tb_tp_atr, tb_sl_atr, tb_max_days) triples. Each adds the
+    rows build_labelled_frame() keeps for that config: the three config
+    columns followed by SWEEP_COLUMNS, with the same values.
+    """
+    grid = [(float(tp), float(sl), max(1, int(h))) for tp, sl, h in grid]
+    configs = [
+        {
+            "label_mode": "triple_barrier",
+            "tb_tp_atr": tp,
+            "tb_sl_atr": sl,
+            "tb_max_days": h,
+        }
+        for tp, sl, h in grid
+    ]
+    parts: dict[str, list] = {name: [] for name in SWEEP_TABLE_COLUMNS}
+    for (tp, sl, h), (executed, rows, columns) in zip(
+        grid, _label_variants(df, configs)
+    ):
+        for name, value in zip(SWEEP_TABLE_COLUMNS[:3], (tp, sl, h)):
+            parts[name].append(np.full(len(rows), value))
+        for name in ("date", "fwd_return"):
+            parts[name].append(executed[name].to_numpy()[rows])
+        for name in SWEEP_COLUMNS[2:]:
+            parts[name].append(columns[name][rows])
+    if not grid:
+        return pd.DataFrame(columns=SWEEP_TABLE_COLUMNS)
+    table = pd.DataFrame({name: np.concatenate(v) for name, v in parts.items()})
+    if not table.empty:
+        table["target_class"] = table["target_class"].astype(int)
+    return table
+
+
+def _label_variants(df, configs):
+    """Yield (execution frame, kept rows, label columns) for every config.
+
+    The execution frame is add_execution_columns() of the date-sorted input
+    for the config's horizon (shared between configs, not to be mutated);
+    the kept rows are those with a known target and fwd_return.
+    """
+    variants = []  # (mode, horizon, tp_atr, sl_atr)
+    for config in configs:
+        cfg = config or {}
+        mode = _normalize_label_mode(cfg.get("label_mode", "triple_barrier"))
+        if mode == "binary_1d":
+            variants.append((mode, 1, None, None))
+            continue
+        horizon = max(1, int(cfg.get("horizon_days", 5)))
+        variants.append(
+            (
+                mode,
+                max(1, int(cfg.get("tb_max_days", horizon))),
+                float(cfg.get("tb_tp_atr", 1.5)),
+                float(cfg.get("tb_sl_atr", 1.0)),
+            )
+        )
 
     out = df.copy()
     if "date" in out.columns:
@@ -176,19 +303,25 @@ def build_labelled_frame(df: pd.DataFrame, config: dict | None = None) -> pd.Dat
     else:
         out = out.reset_index(drop=True)
 
-    if mode == "binary_1d":
-        out = add_forward_return_labels(out, horizon_days=1)
-    else:
-        out = add_triple_barrier_labels(
-            out,
-            horizon_days=int(cfg.get("tb_max_days", horizon)),
-            tp_atr=float(cfg.get("tb_tp_atr", 1.5)),
-            sl_atr=float(cfg.get("tb_sl_atr", 1.0)),
-        )
-
-    out = out.dropna(subset=["target", "target_class", "fwd_return"]).reset_index(
-        drop=True
+    barrier_horizons = [h for mode, h, _, _ in variants if mode == "triple_barrier"]
+    sessions = (
+        _barrier_sessions(out, max(barrier_horizons)) if barrier_horizons else None
     )
-    if not out.empty:
-        out["target_class"] = out["target_class"].astype(int)
-    return out
+    day_strings = None
+    executed: dict[int, pd.DataFrame] = {}
+    for mode, h, tp_atr, sl_atr in variants:
+        if h not in executed:
+            executed[h] = add_execution_columns(out, h)
+        frame = executed[h]
+        fwd_return = frame["fwd_return"].to_numpy(dtype="float64", na_value=np.nan)
+        if mode == "binary_1d":
+            target = _binary_from_forward(frame["fwd_return"]).to_numpy()
+            columns = {"target_class": target, "target": target}
+        else:
+            if day_strings is None:
+                day_strings = _day_strings(frame["date"])
+            columns = _triple_barrier_columns(
+                frame, sessions, day_strings, h, tp_atr, sl_atr, "atr"
+            )
+        rows = np.flatnonzero(~np.isnan(columns["target"]) & ~np.isnan(fwd_return))
+        yield frame, rows, columns
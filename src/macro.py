@@ -16,12 +16,14 @@ schema, filling unavailable features with NaN (LightGBM tolerates NaN).
 
 from __future__ import annotations
 
+import time
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
 
 from .config import DATA_DIR
+from .env import get_env_bool
 
 MACRO_DIR = DATA_DIR / "macro"
 MACRO_PANEL_FILE = MACRO_DIR / "macro_panel.parquet"
@@ -220,92 +222,160 @@ def _validated_market_frame(
     return out
 
 
-def fetch_market_series(spec: dict) -> pd.DataFrame | None:
+def _fetch_stooq_series(symbol, *, want_open: bool) -> pd.DataFrame | None:
+    from .data_loader import download_stooq_data
+
+    df = download_stooq_data(symbol)
+    if df is None or df.empty or "close" not in df.columns:
+        return None
+    return _validated_market_frame(
+        df, source="Stooq", symbol=str(symbol), want_open=want_open
+    )
+
+
+def _yfinance_market_columns(raw, *, want_open: bool) -> pd.DataFrame | None:
+    """[date, close(, open)] of one yfinance download, or None when unusable."""
+    if raw is None or raw.empty:
+        return None
+    raw = raw.copy()
+    if isinstance(raw.columns, pd.MultiIndex):
+        raw.columns = [c[0] if isinstance(c, tuple) else c for c in raw.columns]
+    raw = raw.reset_index()
+    raw.columns = [str(c).lower() for c in raw.columns]
+    # Some older yfinance versions and test doubles still return an
+    # explicit Adj Close even with auto_adjust=True. Prefer it when
+    # present so compatibility never regresses to a raw close.
+    # That path can pair an adjusted close with a raw open; the
+    # intraday basis check in _open_rejection_reason catches it.
+    close_col = "adj close" if "adj close" in raw.columns else "close"
+    if close_col not in raw.columns or "date" not in raw.columns:
+        return None
+    take = ["date", close_col]
+    if want_open and "open" in raw.columns:
+        take.append("open")
+    return raw[take].rename(columns={close_col: "close"})
+
+
+def _fetch_yfinance_series(
+    symbol, *, want_open: bool, batch=None
+) -> pd.DataFrame | None:
+    # A usable frame from fetch_all_series' multi-ticker request is
+    # validated like a single-symbol answer.
+    served, raw = batch.frame_for(symbol) if batch is not None else (False, None)
+    out = _yfinance_market_columns(raw, want_open=want_open) if served else None
+    if out is not None:
+        return _validated_market_frame(
+            out, source="yfinance", symbol=str(symbol), want_open=want_open
+        )
+    # period="max" breaks yfinance's range resolution for some symbols,
+    # so retry once with a
+    # bounded period — 10y of daily closes covers every macro feature.
+    for period in ("max", "10y"):
+        try:
+            import yfinance as yf
+
+            raw = yf.download(
+                symbol,
+                period=period,
+                interval="1d",
+                # Macro levels/returns must be continuous across ETF splits.
+                # With current yfinance this makes Close the adjusted close.
+                auto_adjust=True,
+                progress=False,
+                threads=False,
+            )
+            out = _yfinance_market_columns(raw, want_open=want_open)
+            if out is not None:
+                # An extreme/invalid frame is a provider-integrity failure,
+                # not the empty-response range bug handled by the 10y retry.
+                return _validated_market_frame(
+                    out,
+                    source="yfinance",
+                    symbol=str(symbol),
+                    want_open=want_open,
+                )
+        except Exception as exc:  # noqa: BLE001
+            print(
+                f"macro: yfinance fetch failed for {symbol} "
+                f"(period={period}): {type(exc).__name__}: {exc}"
+            )
+    return None
+
+
+_SERIES_FETCHERS = {
+    "stooq": _fetch_stooq_series,
+    "yfinance": _fetch_yfinance_series,
+}
+
+
+def fetch_market_series(spec: dict, *, yf_batch=None) -> pd.DataFrame | None:
     """
     Fetch one series as a [date, close] frame, trying Stooq then yfinance.
     A spec with ``open: True`` also carries an ``open`` column when the provider
     supplies a trustworthy one (the same-basis benchmark needs it).
     Returns None on failure (caller treats the series as unavailable).
-    """
-    from .data_loader import download_stooq_data
 
-    want_open = bool(spec.get("open"))
+    Providers are tried in the shared health tracker's order, so a provider
+    whose circuit is open (e.g. Stooq while its CSV endpoint 404s) is skipped
+    instead of costing a request per series.
 
-    stooq_symbol = spec.get("stooq")
-    if stooq_symbol:
-        df = download_stooq_data(stooq_symbol)
-        if df is not None and not df.empty and "close" in df.columns:
-            out = _validated_market_frame(
-                df,
-                source="Stooq",
-                symbol=str(stooq_symbol),
-                want_open=want_open,
-            )
-            if out is not None:
-                return out
+    yf_batch (data_loader.YFinanceBatch): while it collects, the yfinance
+    fallback is recorded instead of requested (None is returned unless
+    another provider answered); once it serves, the recorded series are
+    answered from its multi-ticker request and Stooq is not asked again.
+    """
+    from .provider_health import OUTCOME_FAIL, OUTCOME_OK, get_tracker
 
+    want_open = bool(spec.get("open"))
+    configured = [name for name in ("stooq", "yfinance") if spec.get(name)]
     yf_symbol = spec.get("yfinance")
-    if yf_symbol:
-        # period="max" breaks yfinance's range resolution for some symbols,
-        # so retry once with a
-        # bounded period — 10y of daily closes covers every macro feature.
-        for period in ("max", "10y"):
-            try:
-                import yfinance as yf
-
-                raw = yf.download(
-                    yf_symbol,
-                    period=period,
-                    interval="1d",
-                    # Macro levels/returns must be continuous across ETF splits.
-                    # With current yfinance this makes Close the adjusted close.
-                    auto_adjust=True,
-                    progress=False,
-                    threads=False,
-                )
-                if raw is None or raw.empty:
-                    continue
-                if isinstance(raw.columns, pd.MultiIndex):
-                    raw.columns = [
-                        c[0] if isinstance(c, tuple) else c for c in raw.columns
-                    ]
-                raw = raw.reset_index()
-                raw.columns = [str(c).lower() for c in raw.columns]
-                # Some older yfinance versions and test doubles still return an
-                # explicit Adj Close even with auto_adjust=True. Prefer it when
-                # present so compatibility never regresses to a raw close.
-                # That path can pair an adjusted close with a raw open; the
-                # intraday basis check in _open_rejection_reason catches it.
-                close_col = "adj close" if "adj close" in raw.columns else "close"
-                if close_col in raw.columns and "date" in raw.columns:
-                    take = ["date", close_col]
-                    if want_open and "open" in raw.columns:
-                        take.append("open")
-                    out = raw[take].rename(columns={close_col: "close"})
-                    out = _validated_market_frame(
-                        out,
-                        source="yfinance",
-                        symbol=str(yf_symbol),
-                        want_open=want_open,
-                    )
-                    if out is not None:
-                        return out
-                    # An extreme/invalid frame is a provider-integrity failure,
-                    # not the empty-response range bug handled by the 10y retry.
-                    return None
-            except Exception as exc:  # noqa: BLE001
-                print(
-                    f"macro: yfinance fetch failed for {yf_symbol} "
-                    f"(period={period}): {type(exc).__name__}: {exc}"
-                )
+    tracker = get_tracker()
+    for provider in tracker.order(configured):
+        if yf_batch is not None and yf_batch.defers(provider, yf_symbol):
+            continue
+        started = time.monotonic()
+        if provider == "yfinance":
+            out = _fetch_yfinance_series(
+                spec[provider], want_open=want_open, batch=yf_batch
+            )
+        else:
+            out = _SERIES_FETCHERS[provider](spec[provider], want_open=want_open)
+        tracker.record(
+            provider,
+            OUTCOME_OK if out is not None else OUTCOME_FAIL,
+            time.monotonic() - started,
+        )
+        if out is not None:
+            if yf_batch is not None:
+                yf_batch.resolve(yf_symbol)
+            return out
     return None
 
 
 def fetch_all_series(series_config: dict | None = None) -> dict[str, pd.DataFrame]:
+    """
+    Fetch every configured series. Series that need the yfinance fallback are
+    fetched together in one multi-ticker request after the Stooq pass
+    (TRADER_DATA_YF_BATCH_ENABLED) instead of one yfinance session each.
+    """
+    from .data_loader import DEFAULT_YF_BATCH_ENABLED, YFinanceBatch
+
     cfg = series_config or DEFAULT_MARKET_SERIES
+    batch = None
+    if get_env_bool("TRADER_DATA_YF_BATCH_ENABLED", DEFAULT_YF_BATCH_ENABLED):
+        batch = YFinanceBatch(auto_adjust=True)
+    fetched = {
+        key: fetch_market_series(spec, yf_batch=batch) for key, spec in cfg.items()
+    }
+    if batch is not None and batch.requests:
+        batch.fetch()
+        for key, spec in cfg.items():
+            if spec.get("yfinance") in batch.requests:
+                fetched[key] = fetch_market_series(spec, yf_batch=batch)
+
     out: dict[str, pd.DataFrame] = {}
     for key, spec in cfg.items():
-        df = fetch_market_series(spec)
+        df = fetched[key]
         if df is not None and not df.empty:
             df = df.copy()
             df["date"] = pd.to_datetime(df["date"]).dt.tz_localize(None)
@@ -315,6 +385,11 @@ def fetch_all_series(series_config: dict | None = None) -> dict[str, pd.DataFram
             print(f"macro: fetched {key} ({len(out[key])} rows)")
         else:
             print(f"macro: series unavailable, skipping: {key}")
+    from .provider_health import get_tracker
+
+    tracker = get_tracker()
+    print(f"macro: provider health: {tracker.format_run_summary()}")
+    tracker.save()
     return out
 
 
@@ -407,9 +482,125 @@ def build_macro_panel(
     return panel[[c for c in cols if c in panel.columns]].reset_index(drop=True)
 
 
+# --- as-of join (pure) -------------------------------------------------------
+
+
+def _naive_dates(dates: pd.Series) -> pd.Series:
+    """``pd.to_datetime(dates).dt.tz_localize(None)``, skipping the parse
+    (and its per-element cache probe) for columns that are datetimes already."""
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = pd.to_datetime(dates)
+    if dates.dt.tz is None:
+        return dates
+    return dates.dt.tz_localize(None)
+
+
+class MacroIndex:
+    """The macro panel's feature columns, sorted once for as-of lookups.
+
+    add_macro_features() used to copy and re-sort the panel and re-parse its
+    dates for every ticker before pd.merge_asof. An index holds the panel's
+    date-sorted feature columns and its dates as int64 keys. A stock frame
+    joins through one searchsorted of its dates, giving each row the int32
+    position of the last panel date on or before it (-1: none). This is the
+    backward as-of match, including the last of several equal panel dates.
+    macro_index() memoizes the index by panel identity, so one loaded panel
+    serves Phase 1, Phase 2 and the drift check.
+    """
+
+    def __init__(self, macro_panel: pd.DataFrame):
+        self.panel = macro_panel
+        self.feature_cols = [c for c in MACRO_FEATURE_COLS if c in macro_panel]
+        right = macro_panel[["date"] + self.feature_cols].copy()
+        right["date"] = _naive_dates(right["date"])
+        if right["date"].isna().any():
+            raise ValueError("Merge keys contain null values on right side")
+        right = right.sort_values("date").reset_index(drop=True)
+        self._keys = right["date"].to_numpy(dtype="datetime64[ns]").view(np.int64)
+        self._columns = {col: right[col] for col in self.feature_cols}
+
+    def positions(self, dates) -> np.ndarray:
+        """int32 row of the last panel date on or before each date (-1: none)."""
+        keys = np.asarray(dates, dtype="datetime64[ns]").view(np.int64)
+        return (np.searchsorted(self._keys, keys, side="right") - 1).astype(np.int32)
+
+    def lookup(self, dates) -> dict[str, np.ndarray]:
+        """Every MACRO_FEATURE_COLS column as of each date (NaN when unknown)."""
+        positions = self.positions(dates)
+        matched = positions >= 0
+        out = {}
+        for col in MACRO_FEATURE_COLS:
+            if col not in self._columns:
+                out[col] = np.full(len(positions), np.nan)
+                continue
+            series = self._columns[col]
+            if matched.all():
+                out[col] = series.to_numpy().take(positions)
+            elif series.dtype == np.float64:
+                values = series.to_numpy().take(np.maximum(positions, 0))
+                out[col] = np.where(matched, values, np.nan)
+            else:  # merge_asof's upcast for unmatched rows (int -> float, ...)
+                taken = series.take(np.maximum(positions, 0)).reset_index(drop=True)
+                out[col] = taken.where(matched).to_numpy()
+        return out
+
+    def join(self, stock_df: pd.DataFrame) -> pd.DataFrame:
+        """add_macro_features(stock_df, panel): the frame plus the macro columns.
+
+        Rows come back sorted by date. Frames whose dates already ascend
+        strictly are not re-sorted.
+        """
+        dates = _naive_dates(stock_df["date"])
+        if dates.isna().any():
+            raise ValueError("Merge keys contain null values on left side")
+        if set(self.feature_cols).intersection(stock_df.columns):
+            # merge_asof's suffixing of clashing columns is kept as it was.
+            out = stock_df.copy()
+            out["date"] = dates
+            out = out.sort_values("date").reset_index(drop=True)
+            right = pd.DataFrame({"date": self._keys.view("datetime64[ns]")})
+            right = right.assign(**self._columns)
+            merged = pd.merge_asof(out, right, on="date", direction="backward")
+            for col in MACRO_FEATURE_COLS:
+                if col not in merged.columns:
+                    merged[col] = np.nan
+            return merged
+
+        out = stock_df.assign(date=dates)
+        keys = dates.to_numpy(dtype="datetime64[ns]")
+        if (np.diff(keys.view(np.int64)) > 0).all():
+            out.index = pd.RangeIndex(len(out))
+        else:
+            out = out.sort_values("date", ignore_index=True)
+            keys = out["date"].to_numpy(dtype="datetime64[ns]")
+        features = self.lookup(keys)
+        # Present panel columns first, then the missing ones, as the merge and
+        # its NaN schema fill ordered them.
+        order = self.feature_cols + [
+            c for c in MACRO_FEATURE_COLS if c not in self._columns
+        ]
+        macro = pd.DataFrame({col: features[col] for col in order}, index=out.index)
+        return pd.concat([out, macro], axis=1)
+
+
+# (panel, MacroIndex) of the last panel joined; one panel serves a run.
+_index_memo: tuple | None = None
+
+
+def macro_index(macro_panel: pd.DataFrame) -> MacroIndex:
+    """MacroIndex of the panel, memoized by panel identity."""
+    global _index_memo
+    memo = _index_memo
+    if memo is not None and memo[0] is macro_panel:
+        return memo[1]
+    index = MacroIndex(macro_panel)
+    _index_memo = (macro_panel, index)
+    return index
+
+
 def add_macro_features(
     stock_df: pd.DataFrame,
-    macro_panel: pd.DataFrame | None,
+    macro_panel: pd.DataFrame | MacroIndex | None,
     ticker_info: dict | None = None,
 ) -> pd.DataFrame:
     """
@@ -417,30 +608,20 @@ def add_macro_features(
     stock date only sees macro data from on/before that date (no future leak).
 
     Always emits the full MACRO_FEATURE_COLS schema; unavailable features are
-    NaN. ticker_info is accepted for forward-compatibility (sector-relative
-    momentum is Phase 2) and currently unused.
+    NaN. ``macro_panel`` may be a MacroIndex; a panel joins through its
+    memoized macro_index(). ticker_info is accepted for forward-compatibility
+    (sector-relative momentum is Phase 2) and currently unused.
     """
-    out = stock_df.copy()
-    out["date"] = pd.to_datetime(out["date"]).dt.tz_localize(None)
-    out = out.sort_values("date").reset_index(drop=True)
-
+    if isinstance(macro_panel, MacroIndex):
+        return macro_panel.join(stock_df)
     if macro_panel is None or macro_panel.empty or "date" not in macro_panel.columns:
+        out = stock_df.copy()
+        out["date"] = _naive_dates(out["date"])
+        out = out.sort_values("date").reset_index(drop=True)
         for col in MACRO_FEATURE_COLS:
             out[col] = np.nan
         return out
-
-    feature_cols = [c for c in MACRO_FEATURE_COLS if c in macro_panel.columns]
-    right = macro_panel[["date"] + feature_cols].copy()
-    right["date"] = pd.to_datetime(right["date"]).dt.tz_localize(None)
-    right = right.sort_values("date").reset_index(drop=True)
-
-    merged = pd.merge_asof(out, right, on="date", direction="backward")
-
-    # Ensure every macro feature column exists (NaN if the series was missing).
-    for col in MACRO_FEATURE_COLS:
-        if col not in merged.columns:
-            merged[col] = np.nan
-    return merged
+    return macro_index(macro_panel).join(stock_df)
 
 
 def latest_snapshot_row(
@@ -3,7 +3,9 @@ import numpy as np
 import lightgbm as lgb
 from datetime import timedelta
 
+from . import feature_store, price_store, run_cache
 from .config import get_label_config
+from .feature_engine import technical_feature_arrays
 from .labels import build_labelled_frame, effective_horizon
 from .macro import MACRO_FEATURE_COLS, add_macro_features
 
@@ -59,92 +61,20 @@ def calculate_atr(high, low, close, period=14):
 def add_features(df, dropna=True):
     """
     Add a comprehensive set of technical indicators as features.
+
+    The indicators are computed on NumPy arrays by
+    feature_engine.technical_feature_arrays() and attached in one step.
     """
     df = df.copy()
     df = df.sort_values("date").reset_index(drop=True)
 
-    close = df["close"]
-    high = df["high"]
-    low = df["low"]
-    volume = df["volume"]
-
-    # --- Price Returns (multi-horizon) ---
-    for d in [1, 2, 3, 5, 10, 20]:
-        df[f"return_{d}d"] = close.pct_change(d)
-
-    # --- Moving Averages ---
-    for w in [5, 10, 20, 60]:
-        col = f"ma_{w}"
-        df[col] = close.rolling(window=w).mean()
-        df[f"div_{col}"] = (close - df[col]) / df[col]
-
-    # --- MA cross signals ---
-    df["ma_5_20_cross"] = df["ma_5"] / df["ma_20"] - 1  # golden/dead cross proximity
-    df["ma_20_60_cross"] = df["ma_20"] / df["ma_60"] - 1
-
-    # --- RSI ---
-    df["rsi"] = calculate_rsi(close, 14)
-    df["rsi_change"] = df["rsi"].diff()
-
-    # --- MACD ---
-    macd_line, macd_signal, macd_hist = calculate_macd(close)
-    df["macd"] = macd_line
-    df["macd_signal"] = macd_signal
-    df["macd_hist"] = macd_hist
-    df["macd_hist_change"] = macd_hist.diff()  # momentum of momentum
-
-    # --- Bollinger Bands ---
-    df["bb_pct_b"], df["bb_bandwidth"] = calculate_bollinger_bands(close)
-
-    # --- ATR (volatility) ---
-    df["atr"] = calculate_atr(high, low, close, 14)
-    df["atr_pct"] = df["atr"] / close  # ATR as % of price
-
-    # --- Volatility (rolling std of returns) ---
-    df["volatility"] = df["return_1d"].rolling(window=20).std()
-
-    # --- Volume features ---
-    df["vol_change"] = volume.pct_change()
-    df["vol_ma_5"] = volume.rolling(window=5).mean()
-    df["vol_ma_20"] = volume.rolling(window=20).mean()
-    df["vol_ratio"] = df["vol_ma_5"] / df["vol_ma_20"]  # short-term volume surge
-
-    # --- Candlestick features ---
-    body = close - df["open"]
-    candle_range = high - low
-    df["candle_body_pct"] = body / candle_range.replace(0, np.nan)  # body vs range
-    df["upper_shadow_pct"] = (
-        high - pd.concat([close, df["open"]], axis=1).max(axis=1)
-    ) / candle_range.replace(0, np.nan)
-    df["lower_shadow_pct"] = (
-        pd.concat([close, df["open"]], axis=1).min(axis=1) - low
-    ) / candle_range.replace(0, np.nan)
-
-    # --- Calendar features ---
-    df["day_of_week"] = df["date"].dt.dayofweek  # Mon=0 ... Fri=4
-    df["month"] = df["date"].dt.month
-    df["is_month_end"] = df["date"].dt.is_month_end.astype(int)
-    df["is_month_start"] = (df["date"].dt.day <= 3).astype(int)
-
-    # --- Streak: consecutive up/down days ---
-    up = (df["return_1d"] > 0).astype(int)
-    streak = up.copy()
-    for i in range(1, len(streak)):
-        if up.iloc[i] == up.iloc[i - 1]:
-            streak.iloc[i] = streak.iloc[i - 1] + 1
-        else:
-            streak.iloc[i] = 1
-    df["streak"] = streak * up.replace(0, -1)  # positive = consecutive ups
-
-    # --- Gap (overnight gap) ---
-    df["gap"] = df["open"] / close.shift(1) - 1
-
-    # --- High / Low position ---
-    df["high_20d"] = high.rolling(window=20).max()
-    df["low_20d"] = low.rolling(window=20).min()
-    df["price_position_20d"] = (close - df["low_20d"]) / (
-        df["high_20d"] - df["low_20d"]
-    ).replace(0, np.nan)
+    arrays = technical_feature_arrays(
+        df["date"], df["open"], df["high"], df["low"], df["close"], df["volume"]
+    )
+    # Recomputing on an already featured frame overwrites its columns in place.
+    for col in [c for c in arrays if c in df.columns]:
+        df[col] = arrays.pop(col)
+    df = pd.concat([df, pd.DataFrame(arrays, index=df.index)], axis=1)
 
     if dropna:
         df = df.dropna().reset_index(drop=True)
@@ -229,6 +159,10 @@ _LGB_PARAMS = {
 
 # Minimum boosting rounds before early stopping takes effect
 _MIN_BOOST_ROUND = 50
+# Early-stopping schedule of _train_single_fold()
+_MAX_BOOST_ROUND = 500
+_EARLY_STOPPING_ROUNDS = 30
+_EARLY_STOPPING_MIN_DELTA = 1e-5
 
 
 def _config_int(config, key, default, minimum=0):
@@ -246,14 +180,17 @@ def _train_single_fold(X_train, y_train, X_val, y_val, seed=42):
     val_data = lgb.Dataset(X_val, label=y_val, reference=train_data)
 
     callbacks = [
-        lgb.early_stopping(stopping_rounds=30, min_delta=1e-5),
+        lgb.early_stopping(
+            stopping_rounds=_EARLY_STOPPING_ROUNDS,
+            min_delta=_EARLY_STOPPING_MIN_DELTA,
+        ),
         lgb.log_evaluation(period=0),
     ]
 
     model = lgb.train(
         params,
         train_data,
-        num_boost_round=500,
+        num_boost_round=_MAX_BOOST_ROUND,
         valid_sets=[val_data],
         valid_names=["val"],
         callbacks=callbacks,
@@ -671,6 +608,54 @@ def phase1_feature_cols(macro_enabled=True):
     return list(FEATURE_COLS)
 
 
+# Stored rows to load ahead of a feature window (load_data(warmup_rows=...)):
+# covers the longest rolling window (MA60) plus label horizons, and gives the
+# EWM-based MACD ~200 rows to converge to its full-history value (<1e-7).
+FEATURE_WARMUP_ROWS = 250
+
+
+def training_history_window(validation_years, ticker_code, horizon=1, data_dir=None):
+    """
+    load_data() window for training ticker_code on the last ``validation_years``.
+
+    Every trainer (train_model, phase1.train_ticker_bundle,
+    backtest._prepare_labelled_data) drops labelled rows older than
+    validation_years before the last labelled date. The last ``horizon``
+    stored rows have no forward return, so that date is the stored row
+    ``horizon`` sessions before the end; only the span from there plus
+    FEATURE_WARMUP_ROWS of indicator warm-up needs to be read. Without a
+    stored file the window is the full history.
+    """
+    path = price_store.ticker_paths([ticker_code], data_dir).get(ticker_code)
+    if path is None:
+        return {}
+    last_labelled, _ = price_store.window_bounds(path, tail_rows=int(horizon) + 1)
+    if last_labelled is None:
+        return {}
+    return {
+        "since": last_labelled - timedelta(days=365 * int(validation_years)),
+        "warmup_rows": FEATURE_WARMUP_ROWS,
+    }
+
+
+def technical_features(df, dropna=True, ticker_code=None):
+    """
+    add_features() shared through the active run cache.
+
+    Every stage of a daily run (Phase 1, Phase 2, dashboard) gets the same
+    technical frame built once per ticker; dropna=True derives from it with
+    the same trailing dropna add_features applies. Outside a run scope this
+    is exactly add_features(df, dropna=dropna).
+    """
+    cache = run_cache.active()
+    if cache is None:
+        return add_features(df, dropna=dropna)
+    featured = cache.technical(df, ticker_code, add_features)
+    if dropna:
+        featured = featured.dropna().reset_index(drop=True)
+    return featured
+
+
 def build_feature_frame(
     df, macro_panel=None, ticker_info=None, dropna_features=True, macro_enabled=True
 ):
@@ -680,10 +665,34 @@ def build_feature_frame(
     Technical features are NaN-dropped as usual; macro columns are joined with a
     backward as-of merge and may be NaN (missing series), which LightGBM tolerates.
     When macro_enabled is false, only legacy technical columns are emitted.
+    Inside a run scope the result is memoized per ticker/OHLCV content.
+    Frames that are a slice of the ticker's stored history are served from
+    the persistent feature store (src/feature_store.py) when it is enabled.
     """
-    featured = add_features(df, dropna=dropna_features)
-    if featured.empty:
-        return featured
-    if not macro_enabled:
-        return featured
-    return add_macro_features(featured, macro_panel, ticker_info)
+    ticker_code = (ticker_info or {}).get("code")
+
+    def _build():
+        stored = feature_store.features_for(
+            df, ticker_code, macro_panel, macro_enabled, dropna=dropna_features
+        )
+        if stored is not None:
+            return stored
+        featured = technical_features(
+            df, dropna=dropna_features, ticker_code=ticker_code
+        )
+        if featured.empty:
+            return featured
+        if not macro_enabled:
+            return featured
+        return add_macro_features(featured, macro_panel, ticker_info)
+
+    cache = run_cache.active()
+    if cache is None:
+        return _build()
+    return cache.featured(
+        df,
+        ticker_code,
+        (bool(dropna_features), bool(macro_enabled)),
+        macro_panel if macro_enabled else None,
+        _build,
+    )
@@ -0,0 +1,147 @@
+"""
+On-disk cache of evaluate_kpi_gate()'s walk-forward OOS predictions under
+``data/oos_cache/``.
+
+scripts/monthly_audit.py, scripts/stress_test.py and ad-hoc gate runs each
+retrained the LightGBM folds of _collect_oos_predictions() for every ticker,
+although the OOS frame does not depend on the cost, slippage, shorting, KPI or
+threshold settings applied to it afterwards. The cache keeps one OOS frame per
+training input:
+
+  - an entry is keyed by frame_fingerprint() of the featured frame the gate
+    received, payload_sha256() of the label config, the gate config fields
+    that shape the labelled frame and the folds (TRAINING_CONFIG_FIELDS),
+    phase1_feature_schema_hash() of the training features, and the LightGBM
+    parameters, boosting schedule (round limits, early stopping) and version,
+    so new data or a changed training setting misses,
+  - an entry is one parquet file: the OOS frame with its execution paths as
+    fixed-size lists, and its attrs (training splits, purge gap) next to the
+    key in the footer. A hit is checked against that stored key and returns
+    the frame exactly as _collect_oos_predictions() built it,
+  - entries written for a ticker code keep only the newest data per ticker
+    and training settings.
+
+The key cannot see code: a change to the labelling, the walk-forward folds or
+the training loop that alters the OOS predictions must bump OOS_CACHE_VERSION,
+or workflows keep restoring the old entries.
+
+The directory is derived data and is not committed (.gitignore); workflows
+carry it between jobs with actions/cache.
+"""
+
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+
+import lightgbm as lgb
+import pandas as pd
+import pyarrow as pa
+
+from . import model, price_store
+from .config import DATA_DIR
+from .env import get_env_bool
+from .execution import EXECUTION_CONTRACT_VERSION, read_parquet
+from .feature_store import frame_fingerprint
+from .model import FEATURE_COLS
+from .model_store import payload_sha256, phase1_feature_schema_hash
+from .timeutil import now_jst_iso
+
+OOS_CACHE_DIR = DATA_DIR / "oos_cache"
+# Bump when labels.py / backtest.py / model.py training code changes the OOS frame.
+OOS_CACHE_VERSION = 1
+DEFAULT_CACHE_ENABLED = True
+# Gate config fields read by _prepare_labelled_data() / _collect_oos_predictions().
+TRAINING_CONFIG_FIELDS = (
+    "validation_years",
+    "val_size",
+    "purge_gap",
+    "n_folds",
+    "train_min_rows",
+)
+# Parquet footer key holding an entry's key and the OOS frame's attrs.
+METADATA_KEY = "trader_oos_cache"
+# File-name prefix of entries written without a ticker code.
+ANONYMOUS = "_frame"
+
+_SUFFIX = ".parquet"
+_lock = threading.Lock()
+
+
+def cache_enabled() -> bool:
+    return get_env_bool("TRADER_OOS_CACHE_ENABLED", DEFAULT_CACHE_ENABLED)
+
+
+def cache_key(df: pd.DataFrame, config: dict, label_config: dict) -> dict:
+    """Key components of the OOS predictions for ``df`` (stored in the footer)."""
+    return {
+        "version": OOS_CACHE_VERSION,
+        "data_fingerprint": frame_fingerprint(df),
+        "label_config_hash": payload_sha256(label_config),
+        "training_config": {
+            field: config.get(field) for field in TRAINING_CONFIG_FIELDS
+        },
+        "feature_schema_hash": phase1_feature_schema_hash(FEATURE_COLS),
+        "model_hash": payload_sha256(
+            {
+                "params": model._LGB_PARAMS,
+                "min_boost_round": model._MIN_BOOST_ROUND,
+                "max_boost_round": model._MAX_BOOST_ROUND,
+                "early_stopping_rounds": model._EARLY_STOPPING_ROUNDS,
+                "early_stopping_min_delta": model._EARLY_STOPPING_MIN_DELTA,
+                "lightgbm": lgb.__version__,
+            }
+        ),
+        "execution_contract_version": EXECUTION_CONTRACT_VERSION,
+    }
+
+
+def _prefix(ticker_code: str | None, key: dict) -> str:
+    settings = {k: v for k, v in key.items() if k != "data_fingerprint"}
+    return f"{ticker_code or ANONYMOUS}.{payload_sha256(settings)[:8]}"
+
+
+def entry_path(key: dict, ticker_code: str | None = None) -> Path:
+    """``data/oos_cache/<code>.<settings>.<key>.parquet`` for one key."""
+    name = f"{_prefix(ticker_code, key)}.{payload_sha256(key)[:16]}{_SUFFIX}"
+    return OOS_CACHE_DIR / name
+
+
+def load(key: dict, ticker_code: str | None = None) -> pd.DataFrame | None:
+    """The cached OOS frame for ``key``, or None on a miss."""
+    path = entry_path(key, ticker_code)
+    if not path.exists():
+        return None
+    try:
+        stored = price_store.read_metadata(path, METADATA_KEY)[0]
+        if not stored or stored.get("key") != key:
+            return None
+        oos = read_parquet(path)
+    except (OSError, ValueError, pa.ArrowException):
+        return None
+    oos.attrs = dict(stored.get("attrs") or {})
+    return oos
+
+
+def store(key: dict, oos: pd.DataFrame, ticker_code: str | None = None) -> Path:
+    """Write ``oos`` for ``key``; older data of the same ticker is dropped."""
+    path = entry_path(key, ticker_code)
+    with _lock:
+        if ticker_code:
+            # Older entries of this ticker + settings can never match again.
+            for stale in path.parent.glob(f"{_prefix(ticker_code, key)}.*{_SUFFIX}"):
+                stale.unlink(missing_ok=True)
+        price_store.write_ticker_file(
+            path,
+            oos,
+            metadata={
+                METADATA_KEY: {
+                    "key": key,
+                    "attrs": dict(oos.attrs),
+                    "ticker": ticker_code,
+                    "rows": int(len(oos)),
+                    "created_at": now_jst_iso(),
+                }
+            },
+        )
+    return path
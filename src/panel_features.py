@@ -0,0 +1,176 @@
+"""
+Panel-wide technical + macro features behind cross_section.build_panel().
+
+build_panel() used to run build_ticker_feature_frame() (add_features ->
+add_macro_features -> liquidity columns) once per ticker, then concatenate the
+stacked frames and sort them by (date, ticker). panel_feature_frame() builds
+the same long panel for all tickers at once:
+
+  - each ticker's sessions fill one column of a 2-D (session x ticker) array,
+    top-aligned, and technical_feature_arrays() computes every indicator for
+    PANEL_BLOCK_TICKERS tickers in one pass of column-wise rolling windows,
+    EWMAs and streaks. Because the windows run over each ticker's own
+    sessions, a ticker that missed a session the others traded gets exactly
+    the values a per-ticker computation gives it,
+  - every kept row is addressed on the shared (date x ticker) grid and the
+    long panel is emitted in [date, ticker] order by one lexsort of those grid
+    keys,
+  - date-only columns (calendar and macro features) are computed once per
+    grid date and gathered,
+  - dropna, turnover and adv20 follow build_ticker_feature_frame(): adv20
+    rolls over each ticker's kept rows, packed the same way.
+
+Inputs the grid path cannot reproduce exactly (extra or missing columns,
+duplicate dates or tickers) make panel_inputs() return None, and
+build_panel() keeps its per-ticker loop for them.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from .feature_engine import (
+    CALENDAR_COLS,
+    TECHNICAL_OUTPUT_COLS,
+    calendar_arrays,
+    technical_feature_arrays,
+)
+from .macro import add_macro_features
+
+PRICE_COLS = ["open", "high", "low", "close", "volume"]
+INPUT_COLS = ["date"] + PRICE_COLS
+LIQUIDITY_COLS = ["turnover", "adv20"]
+# Tickers per 2-D block: bounds the (session x ticker) working set to ~40
+# feature arrays of 64 columns each.
+PANEL_BLOCK_TICKERS = 64
+ADV_WINDOW = 20
+ADV_MIN_PERIODS = 5
+
+
+def panel_inputs(tickers_data) -> list[tuple[dict, pd.DataFrame]] | None:
+    """(ticker_info, date-sorted OHLCV) in ticker order, or None.
+
+    None when an input falls outside what the grid path reproduces: a frame
+    with other columns than date + OHLCV, non-numeric prices, missing or
+    duplicate dates, or a ticker code that is missing or repeated.
+    """
+    inputs = {}
+    for ticker_info, df in tickers_data:
+        code = (ticker_info or {}).get("code")
+        if not isinstance(code, str) or code in inputs or df is None:
+            return None
+        if list(df.columns) != INPUT_COLS:
+            return None
+        if not pd.api.types.is_datetime64_dtype(df["date"]):
+            return None
+        if not all(pd.api.types.is_numeric_dtype(df[c]) for c in PRICE_COLS):
+            return None
+        if df["date"].isna().any() or df["date"].duplicated().any():
+            return None
+        inputs[code] = (ticker_info, df.sort_values("date"))
+    return [inputs[code] for code in sorted(inputs)]
+
+
+def _pack(columns: list[np.ndarray], lengths: np.ndarray) -> np.ndarray:
+    """Top-aligned (max length x len(columns)) float array, NaN-padded."""
+    out = np.full((int(lengths.max(initial=0)), len(columns)), np.nan)
+    for j, values in enumerate(columns):
+        out[: len(values), j] = values
+    return out
+
+
+def _block_rows(block, ticker_offset, grid_dates):
+    """Long arrays (grid keys, OHLCV, features, liquidity) of one block."""
+    frames = [df for _, df in block]
+    lengths = np.array([len(df) for df in frames])
+    packed = {
+        col: _pack([df[col].to_numpy(dtype=np.float64) for df in frames], lengths)
+        for col in PRICE_COLS
+    }
+    features = technical_feature_arrays(
+        None, *(packed[col] for col in PRICE_COLS)
+    )
+
+    # add_features(dropna=True): every OHLCV and technical value present.
+    keep = np.arange(len(packed["close"]))[:, None] < lengths[None, :]
+    for values in (*packed.values(), *features.values()):
+        keep &= ~np.isnan(values)
+    # Column-major order keeps each ticker's rows contiguous and in date order.
+    cols, rows = np.nonzero(keep.T)
+
+    flat = rows * len(frames) + cols
+    out = {name: values.ravel().take(flat) for name, values in features.items()}
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    source = starts[cols] + rows  # row of the concatenated input frames
+    for col in INPUT_COLS:
+        out[col] = np.concatenate([df[col].to_numpy() for df in frames])[source]
+
+    # adv20 rolls over each ticker's kept rows only.
+    turnover = out["close"] * out["volume"]
+    kept_rank = (np.cumsum(keep, axis=0) - 1)[rows, cols]
+    kept = np.full((int(keep.sum(axis=0).max(initial=0)), len(frames)), np.nan)
+    kept[kept_rank, cols] = turnover
+    adv = (
+        pd.DataFrame(kept)
+        .rolling(ADV_WINDOW, min_periods=ADV_MIN_PERIODS)
+        .mean()
+        .to_numpy()
+    )
+    out["turnover"] = turnover
+    out["adv20"] = adv[kept_rank, cols]
+
+    out["_date_idx"] = np.searchsorted(grid_dates, out["date"])
+    out["_ticker_idx"] = cols + ticker_offset
+    return out
+
+
+def panel_feature_frame(
+    inputs: list[tuple[dict, pd.DataFrame]],
+    macro_panel: pd.DataFrame | None = None,
+    macro_enabled: bool = True,
+) -> pd.DataFrame:
+    """build_panel() output for panel_inputs() in one grid pass.
+
+    Columns and dtypes match the per-ticker path: date + OHLCV, the technical
+    columns, the macro columns (when macro_enabled), then ticker, sector,
+    turnover and adv20; rows are sorted by [date, ticker].
+    """
+    if not inputs:
+        return pd.DataFrame()
+    grid_dates = np.unique(
+        np.concatenate([df["date"].to_numpy() for _, df in inputs])
+    )
+    blocks = [
+        _block_rows(inputs[i : i + PANEL_BLOCK_TICKERS], i, grid_dates)
+        for i in range(0, len(inputs), PANEL_BLOCK_TICKERS)
+    ]
+    long = {name: np.concatenate([b[name] for b in blocks]) for name in blocks[0]}
+    if len(long["date"]) == 0:
+        return pd.DataFrame()
+
+    order = np.lexsort((long["_ticker_idx"], long["_date_idx"]))
+    date_idx = long["_date_idx"][order]
+    ticker_idx = long["_ticker_idx"][order]
+
+    columns = {col: long[col].take(order) for col in INPUT_COLS}
+    calendar = calendar_arrays(grid_dates)
+    for col in TECHNICAL_OUTPUT_COLS:
+        if col in CALENDAR_COLS:
+            columns[col] = calendar[col][date_idx]
+        else:
+            columns[col] = long[col].take(order)
+    if macro_enabled:
+        macro = add_macro_features(
+            pd.DataFrame({"date": grid_dates}), macro_panel
+        ).drop(columns="date")
+        for col in macro.columns:
+            columns[col] = macro[col].to_numpy().take(date_idx)
+
+    codes = np.array([info["code"] for info, _ in inputs], dtype=object)
+    sectors = np.array([info.get("sector") for info, _ in inputs], dtype=object)
+    columns["ticker"] = codes[ticker_idx]
+    columns["sector"] = sectors[ticker_idx]
+    for col in LIQUIDITY_COLS:
+        columns[col] = long[col].take(order)
+    return pd.DataFrame(columns)
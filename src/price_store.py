@@ -0,0 +1,290 @@
+"""
+Columnar view over the per-ticker OHLCV parquet files.
+
+``data/<code>.parquet`` stays the unit of writing (update_data, archiving,
+watchlist promotion all move whole ticker files), but reads no longer have to
+open them one by one: the files are the ticker partitions of a single Arrow
+dataset. Each file carries a ``ticker == <code>`` partition expression, so a
+scan prunes whole files by ticker, pushes date predicates down to parquet
+row-group statistics, projects only the requested columns, and reads the
+surviving fragments on Arrow's thread pool in one call.
+
+Appends land next to the base file as small delta files
+(``data/<code>.delta/000001.parquet`` ...), so a daily update writes only its
+new rows; compact() folds them back into the base file. Every reader here
+(read_ticker_file, scan) sees base + deltas as one history.
+
+This module is pure storage: it returns raw rows. Normalization/validation
+stays in data_loader (load_panel / load_frames / load_data).
+"""
+
+from __future__ import annotations
+
+import json
+import shutil
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from .config import DATA_DIR
+
+PRICE_COLUMNS = ["date", "open", "high", "low", "close", "volume"]
+
+# Panel-wide schema. Fragments are cast to it on read; volume is float64 so a
+# provider that reports fractional volume cannot fail the whole scan.
+PRICE_SCHEMA = pa.schema(
+    [
+        ("date", pa.timestamp("ns")),
+        ("open", pa.float64()),
+        ("high", pa.float64()),
+        ("low", pa.float64()),
+        ("close", pa.float64()),
+        ("volume", pa.float64()),
+        ("ticker", pa.string()),
+    ]
+)
+
+_SUFFIX = ".parquet"
+
+# Rows per parquet row group (~one trading year). Row-group date statistics
+# let windowed reads (load_data(since=...)) skip whole years of history.
+ROW_GROUP_ROWS = 250
+
+
+def ticker_paths(codes=None, data_dir=None) -> dict[str, Path]:
+    """Map each ticker code to its parquet file (missing files are omitted).
+
+    codes=None lists every ``<code>.parquet`` directly under data_dir
+    (subdirectories such as archive/ and watchlist/ are not part of the store).
+    """
+    root = Path(data_dir) if data_dir is not None else DATA_DIR
+    if codes is None:
+        return {
+            path.name[: -len(_SUFFIX)]: path
+            for path in sorted(root.glob(f"*{_SUFFIX}"))
+            if path.is_file()
+        }
+    out = {}
+    for code in dict.fromkeys(codes):
+        path = root / f"{code}{_SUFFIX}"
+        if path.is_file():
+            out[code] = path
+    return out
+
+
+def delta_dir(path) -> Path:
+    """Directory holding the appended delta files of one ticker file."""
+    path = Path(path)
+    return path.with_name(path.name[: -len(_SUFFIX)] + ".delta")
+
+
+def delta_paths(path) -> list[Path]:
+    """Delta files of one ticker file, oldest first."""
+    root = delta_dir(path)
+    if not root.is_dir():
+        return []
+    return sorted(root.glob(f"*{_SUFFIX}"))
+
+
+def ticker_fingerprint(path) -> tuple | None:
+    """(mtime, size) of the base file and every delta; None when absent."""
+    path = Path(path)
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    deltas = tuple(
+        (p.name, p.stat().st_mtime_ns, p.stat().st_size) for p in delta_paths(path)
+    )
+    return (stat.st_mtime_ns, stat.st_size, deltas)
+
+
+def price_dataset(codes=None, data_dir=None) -> ds.Dataset | None:
+    """The ticker-partitioned dataset over the selected files, or None."""
+    paths = ticker_paths(codes, data_dir)
+    if not paths:
+        return None
+    files = []
+    partitions = []
+    for code, path in paths.items():
+        for fragment in [path, *delta_paths(path)]:
+            files.append(str(fragment))
+            partitions.append(pc.field("ticker") == code)
+    return ds.FileSystemDataset.from_paths(
+        files,
+        schema=PRICE_SCHEMA,
+        format=ds.ParquetFileFormat(),
+        filesystem=pa.fs.LocalFileSystem(),
+        partitions=partitions,
+    )
+
+
+def _date_scalar(value) -> pa.Scalar:
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = ts.tz_localize(None)
+    return pa.scalar(ts.as_unit("ns").value, type=pa.timestamp("ns"))
+
+
+def date_filter(start=None, end=None) -> ds.Expression | None:
+    """Inclusive [start, end] predicate on ``date`` (either bound optional)."""
+    expr = None
+    if start is not None:
+        expr = pc.field("date") >= _date_scalar(start)
+    if end is not None:
+        upper = pc.field("date") <= _date_scalar(end)
+        expr = upper if expr is None else expr & upper
+    return expr
+
+
+def scan(
+    codes=None, start=None, end=None, columns=None, data_dir=None
+) -> pa.Table:
+    """Rows of the selected tickers/dates/columns, sorted by (ticker, date).
+
+    The result always carries ``ticker`` and ``date``; ``columns`` selects
+    which of the OHLCV value columns to read (default: all).
+    """
+    value_cols = [c for c in (columns or PRICE_COLUMNS) if c not in ("ticker", "date")]
+    unknown = [c for c in value_cols if c not in PRICE_COLUMNS]
+    if unknown:
+        raise ValueError(f"unknown price columns: {unknown}")
+    projection = ["ticker", "date"] + value_cols
+
+    dataset = price_dataset(codes, data_dir)
+    if dataset is None:
+        return PRICE_SCHEMA.empty_table().select(projection)
+    table = dataset.to_table(columns=projection, filter=date_filter(start, end))
+    return table.sort_by([("ticker", "ascending"), ("date", "ascending")])
+
+
+def read_ticker_file(path, start=None, end=None, columns=None) -> pd.DataFrame:
+    """One ticker's base file + deltas with native column types.
+
+    This is load_data's thin path; the base file's attrs are kept. The
+    [start, end] date bounds are pushed down to parquet, which skips row
+    groups whose date statistics fall outside them.
+    """
+    filters = []
+    if start is not None:
+        filters.append(("date", ">=", pd.Timestamp(start)))
+    if end is not None:
+        filters.append(("date", "<=", pd.Timestamp(end)))
+    base = pd.read_parquet(path, columns=columns, filters=filters or None)
+    deltas = delta_paths(path)
+    if not deltas:
+        return base
+    parts = [base] + [
+        pd.read_parquet(p, columns=columns, filters=filters or None) for p in deltas
+    ]
+    parts = [part for part in parts if not part.empty]
+    if not parts:
+        return base
+    merged = pd.concat(parts, ignore_index=True)
+    if "date" in merged.columns:
+        merged = (
+            merged.drop_duplicates(subset=["date"], keep="last")
+            .sort_values("date")
+            .reset_index(drop=True)
+        )
+    merged.attrs = dict(base.attrs)
+    return merged
+
+
+def window_bounds(
+    path, since=None, until=None, warmup_rows=0, tail_rows=None
+) -> tuple:
+    """(start, end) date bounds for a windowed read of one ticker file.
+
+    The window starts at ``since`` and/or ``tail_rows`` rows before the last
+    stored row (the later of the two when both are given), then reaches back
+    ``warmup_rows`` stored rows so rolling indicators are complete at its first
+    row. Only the date column is read to resolve it. Without since/tail_rows
+    the start is unbounded (full history).
+    """
+    if since is None and tail_rows is None:
+        return None, until
+    dates = read_ticker_file(path, end=until, columns=["date"])["date"]
+    dates = pd.Series(pd.to_datetime(dates).unique()).sort_values(ignore_index=True)
+    if dates.empty:
+        return since, until
+    first = 0
+    if tail_rows is not None:
+        first = max(first, len(dates) - max(0, int(tail_rows)))
+    if since is not None:
+        first = max(first, int(dates.searchsorted(pd.Timestamp(since))))
+    first -= max(0, int(warmup_rows))
+    if first >= len(dates):
+        return dates.iloc[-1] + pd.Timedelta(days=1), until
+    return dates.iloc[max(0, first)], until
+
+
+def read_metadata(path, key: str) -> list:
+    """Decoded JSON value of parquet metadata ``key`` per fragment.
+
+    One entry per file (base first, then deltas); None where the file does
+    not carry the key. Only the parquet footers are read.
+    """
+    out = []
+    for fragment in [Path(path), *delta_paths(path)]:
+        raw = (pq.read_schema(fragment).metadata or {}).get(key.encode())
+        try:
+            out.append(json.loads(raw) if raw is not None else None)
+        except ValueError:
+            out.append(None)
+    return out
+
+
+def _atomic_to_parquet(
+    df: pd.DataFrame, path: Path, metadata=None, row_group_size=ROW_GROUP_ROWS
+) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f".{path.name}.tmp")
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if metadata:
+        table = table.replace_schema_metadata(
+            {
+                **(table.schema.metadata or {}),
+                **{k.encode(): json.dumps(v).encode() for k, v in metadata.items()},
+            }
+        )
+    pq.write_table(table, temp_path, row_group_size=row_group_size)
+    temp_path.replace(path)
+
+
+def write_ticker_file(
+    path, df: pd.DataFrame, metadata=None, row_group_size=ROW_GROUP_ROWS
+) -> None:
+    """Rewrite a ticker's full history and drop its (now folded-in) deltas.
+
+    metadata ({key: JSON-serializable}) is stored in the parquet footer.
+    """
+    path = Path(path)
+    _atomic_to_parquet(df.reset_index(drop=True), path, metadata, row_group_size)
+    shutil.rmtree(delta_dir(path), ignore_errors=True)
+
+
+def append_rows(path, df: pd.DataFrame, metadata=None) -> Path:
+    """Write new rows as the next delta file of ``path``; returns its path."""
+    existing = delta_paths(path)
+    seq = int(existing[-1].stem) + 1 if existing else 1
+    target = delta_dir(path) / f"{seq:06d}{_SUFFIX}"
+    _atomic_to_parquet(df.reset_index(drop=True), target, metadata)
+    return target
+
+
+def compact(path, metadata=None) -> bool:
+    """Fold a ticker's deltas into its base file. Returns True when it did.
+
+    The per-fragment metadata does not carry over; pass the merged file's
+    metadata explicitly.
+    """
+    path = Path(path)
+    if not delta_paths(path):
+        return False
+    write_ticker_file(path, read_ticker_file(path), metadata)
+    return True
@@ -0,0 +1,301 @@
+"""
+Per-provider health tracking for the OHLCV / macro data sources.
+
+Stooq and yfinance are tried in a fixed order for every ticker and every macro
+series. When one endpoint is down (Stooq's CSV endpoint returned 404 for every
+symbol through 2026-07), each daily run still paid one request/timeout per
+symbol before falling back. This module keeps a small, persisted health record
+per provider so callers can:
+
+  - skip a provider whose circuit is open (too many consecutive hard failures)
+    until its cool-down elapses, then let a single probe through (half-open),
+  - order the remaining providers by recent success rate,
+  - report per-provider calls, failures, staleness and time spent this run.
+
+State lives in ``data/provider_health.json`` (committed with the daily data)
+so a tripped provider stays tripped across runs. All methods are thread-safe;
+update_many() records outcomes from worker threads.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from collections import deque
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+from .config import DATA_DIR
+from .env import get_env_bool, get_env_float, get_env_int
+
+PROVIDER_HEALTH_FILE = DATA_DIR / "provider_health.json"
+
+OUTCOME_OK = "ok"
+OUTCOME_STALE = "stale"
+OUTCOME_FAIL = "fail"
+
+DEFAULT_BREAKER_ENABLED = True
+DEFAULT_TRIP_FAILURES = 5
+DEFAULT_COOLDOWN_HOURS = 24.0
+# Outcomes kept per provider for the success-rate ordering.
+HISTORY_SIZE = 50
+
+
+def _now() -> datetime:
+    return datetime.now(UTC)
+
+
+def _parse_ts(value) -> datetime | None:
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=UTC)
+
+
+class ProviderHealth:
+    """Circuit breaker + success-rate ordering over named data providers."""
+
+    def __init__(
+        self,
+        path: Path | None = PROVIDER_HEALTH_FILE,
+        *,
+        enabled: bool | None = None,
+        trip_failures: int | None = None,
+        cooldown_hours: float | None = None,
+    ):
+        self.path = Path(path) if path is not None else None
+        self.enabled = (
+            get_env_bool("TRADER_DATA_PROVIDER_BREAKER_ENABLED", DEFAULT_BREAKER_ENABLED)
+            if enabled is None
+            else bool(enabled)
+        )
+        self.trip_failures = max(
+            1,
+            trip_failures
+            if trip_failures is not None
+            else get_env_int("TRADER_DATA_PROVIDER_TRIP_FAILURES", DEFAULT_TRIP_FAILURES),
+        )
+        self.cooldown = timedelta(
+            hours=max(
+                0.0,
+                cooldown_hours
+                if cooldown_hours is not None
+                else get_env_float(
+                    "TRADER_DATA_PROVIDER_COOLDOWN_HOURS", DEFAULT_COOLDOWN_HOURS
+                ),
+            )
+        )
+        self._lock = threading.Lock()
+        self._state: dict[str, dict] = {}
+        self._run: dict[str, dict] = {}
+        self._dirty = False
+        self._load()
+
+    # --- persistence -------------------------------------------------------
+
+    def _load(self) -> None:
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            payload = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as exc:
+            print(f"provider health: ignoring unreadable {self.path}: {exc}")
+            return
+        for name, raw in (payload.get("providers") or {}).items():
+            if not isinstance(raw, dict):
+                continue
+            entry = self._entry(name)
+            entry["consecutive_failures"] = int(raw.get("consecutive_failures") or 0)
+            entry["open_until"] = _parse_ts(raw.get("open_until"))
+            entry["last_success_at"] = raw.get("last_success_at")
+            entry["avg_latency_sec"] = raw.get("avg_latency_sec")
+            entry["history"].extend(
+                o
+                for o in (raw.get("history") or [])
+                if o in (OUTCOME_OK, OUTCOME_STALE, OUTCOME_FAIL)
+            )
+
+    def save(self) -> None:
+        """Persist the health record when it changed (best-effort; never raises)."""
+        if self.path is None:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            payload = {
+                "updated_at": _now().isoformat(),
+                "providers": {
+                    name: {
+                        "consecutive_failures": entry["consecutive_failures"],
+                        "open_until": (
+                            entry["open_until"].isoformat()
+                            if entry["open_until"]
+                            else None
+                        ),
+                        "last_success_at": entry["last_success_at"],
+                        "avg_latency_sec": entry["avg_latency_sec"],
+                        "success_rate": self._success_rate(entry),
+                        "history": list(entry["history"]),
+                    }
+                    for name, entry in sorted(self._state.items())
+                },
+            }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path.with_name(f".{self.path.name}.tmp")
+            temp_path.write_text(
+                json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8"
+            )
+            temp_path.replace(self.path)
+        except OSError as exc:
+            print(f"provider health: failed to save {self.path}: {exc}")
+
+    # --- state -------------------------------------------------------------
+
+    def _entry(self, name: str) -> dict:
+        entry = self._state.get(name)
+        if entry is None:
+            entry = {
+                "consecutive_failures": 0,
+                "open_until": None,
+                "last_success_at": None,
+                "avg_latency_sec": None,
+                "history": deque(maxlen=HISTORY_SIZE),
+                # Half-open probe currently in flight (not persisted).
+                "probing": False,
+            }
+            self._state[name] = entry
+        return entry
+
+    def _run_entry(self, name: str) -> dict:
+        return self._run.setdefault(
+            name, {"calls": 0, "ok": 0, "stale": 0, "fail": 0, "skipped": 0, "seconds": 0.0}
+        )
+
+    @staticmethod
+    def _success_rate(entry: dict) -> float | None:
+        history = entry["history"]
+        if not history:
+            return None
+        return sum(1 for o in history if o == OUTCOME_OK) / len(history)
+
+    def _is_open(self, entry: dict, now: datetime) -> bool:
+        return entry["open_until"] is not None and now < entry["open_until"]
+
+    def record(self, provider: str, outcome: str, elapsed_sec: float) -> None:
+        """Record one request outcome: ok / stale (answered, old data) / fail."""
+        now = _now()
+        with self._lock:
+            entry = self._entry(provider)
+            run = self._run_entry(provider)
+            run["calls"] += 1
+            run[outcome] += 1
+            run["seconds"] += float(elapsed_sec)
+            entry["history"].append(outcome)
+            prev = entry["avg_latency_sec"]
+            entry["avg_latency_sec"] = round(
+                float(elapsed_sec) if prev is None else 0.8 * prev + 0.2 * elapsed_sec,
+                4,
+            )
+            entry["probing"] = False
+            self._dirty = True
+            # Only hard failures trip the breaker: a stale answer is still a
+            # working endpoint (and every provider is stale before publication).
+            if outcome == OUTCOME_FAIL:
+                entry["consecutive_failures"] += 1
+                if entry["consecutive_failures"] >= self.trip_failures:
+                    if not self._is_open(entry, now):
+                        print(
+                            f"provider health: circuit opened for {provider} after "
+                            f"{entry['consecutive_failures']} consecutive failures "
+                            f"(cool-down {self.cooldown.total_seconds() / 3600:g}h)."
+                        )
+                    entry["open_until"] = now + self.cooldown
+            else:
+                entry["consecutive_failures"] = 0
+                entry["open_until"] = None
+                entry["last_success_at"] = now.isoformat()
+
+    def order(self, providers: list[str]) -> list[str]:
+        """Providers to try, most reliable first, skipping open circuits.
+
+        A provider whose cool-down has elapsed is allowed one half-open probe;
+        concurrent callers skip it until that probe is recorded. If every
+        provider is open, all are returned in their configured order: the
+        caller must always have something to try.
+        """
+        if not self.enabled:
+            return list(providers)
+        now = _now()
+        with self._lock:
+            available = []
+            for name in providers:
+                entry = self._entry(name)
+                if self._is_open(entry, now) or entry["probing"]:
+                    self._run_entry(name)["skipped"] += 1
+                    continue
+                if entry["open_until"] is not None:
+                    # Cool-down elapsed: this caller carries the probe.
+                    entry["probing"] = True
+                available.append(name)
+            if not available:
+                return list(providers)
+            rank = {name: idx for idx, name in enumerate(providers)}
+
+            def key(name):
+                rate = self._success_rate(self._state[name])
+                # Unknown providers keep their configured priority.
+                return (-(rate if rate is not None else 1.0), rank[name])
+
+            return sorted(available, key=key)
+
+    def run_summary(self) -> dict[str, dict]:
+        """Per-provider calls/outcomes/skips/seconds recorded in this process."""
+        with self._lock:
+            out = {}
+            for name, run in sorted(self._run.items()):
+                entry = self._state.get(name) or {}
+                open_until = entry.get("open_until")
+                out[name] = {
+                    **run,
+                    "seconds": round(run["seconds"], 3),
+                    "circuit_open_until": open_until.isoformat() if open_until else None,
+                }
+            return out
+
+    def format_run_summary(self) -> str:
+        parts = []
+        for name, run in self.run_summary().items():
+            text = (
+                f"{name}: {run['calls']} calls "
+                f"({run['ok']} ok, {run['stale']} stale, {run['fail']} failed), "
+                f"{run['skipped']} skipped, {run['seconds']:.1f}s"
+            )
+            if run["circuit_open_until"]:
+                text += f", circuit open until {run['circuit_open_until']}"
+            parts.append(text)
+        return "; ".join(parts) if parts else "no provider calls"
+
+
+_TRACKER: ProviderHealth | None = None
+_TRACKER_LOCK = threading.Lock()
+
+
+def get_tracker() -> ProviderHealth:
+    """Process-wide tracker shared by data_loader and macro."""
+    global _TRACKER
+    with _TRACKER_LOCK:
+        if _TRACKER is None:
+            _TRACKER = ProviderHealth()
+        return _TRACKER
+
+
+def set_tracker(tracker: ProviderHealth | None) -> None:
+    """Replace (or reset with None) the process-wide tracker; used by tests."""
+    global _TRACKER
+    with _TRACKER_LOCK:
+        _TRACKER = tracker
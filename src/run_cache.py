@@ -0,0 +1,137 @@
+"""
+Run-scoped in-memory cache for validated OHLCV and feature frames.
+
+One daily run used to read, normalize and validate each ticker's parquet in
+several stages (per-ticker processing, failure fallbacks, Phase 2 inference,
+dashboard export) and to rebuild its technical features for Phase 1, Phase 2
+and the dashboard separately. While a RunCache is active:
+
+  - load_data() serves each ticker (and requested history window) from
+    memory, keyed by the (mtime, size) of its parquet and delta files so a
+    write by update_data() is picked up,
+  - model.technical_features() / build_feature_frame() reuse features keyed by
+    ticker + a content fingerprint of the OHLCV frame they were given, so a
+    caller passing a modified frame never receives stale features.
+
+Callers always receive copies; cached frames are never handed out.
+Outside an active scope (tests, one-off scripts) every helper falls back to
+the plain uncached call.
+"""
+
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+
+from . import price_store
+
+
+def content_fingerprint(df: pd.DataFrame) -> int:
+    """Order-sensitive hash of a frame's columns and values (index ignored)."""
+    values = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    columns = hash(tuple(str(c) for c in df.columns))
+    # Weight by position so reordered rows hash differently.
+    weights = (pd.RangeIndex(len(values)).to_numpy(dtype="uint64") * 2 + 1)
+    return hash((columns, int((values * weights).sum())))
+
+
+def _copy(df):
+    return df.copy() if df is not None else None
+
+
+class RunCache:
+    """Validated OHLCV and feature frames shared by every stage of one run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ohlcv: dict[str, tuple] = {}
+        self._technical: dict[tuple, pd.DataFrame] = {}
+        self._featured: dict[tuple, tuple] = {}
+        self.stats = {
+            "ohlcv_hits": 0,
+            "ohlcv_loads": 0,
+            "feature_hits": 0,
+            "feature_builds": 0,
+        }
+
+    def load_ohlcv(self, ticker_code: str, path: Path, loader, window: tuple = ()):
+        """Validated OHLCV for ticker_code, reading ``path`` via loader() once.
+
+        ``window`` identifies the requested history slice (load_data's
+        since/until/columns/warmup arguments); each slice is cached separately.
+        """
+        fingerprint = price_store.ticker_fingerprint(path)
+        key = (ticker_code, window)
+        with self._lock:
+            cached = self._ohlcv.get(key)
+            if cached is not None and cached[0] == fingerprint:
+                self.stats["ohlcv_hits"] += 1
+                return _copy(cached[1])
+        df = loader(ticker_code)
+        with self._lock:
+            self.stats["ohlcv_loads"] += 1
+            self._ohlcv[key] = (fingerprint, df)
+        return _copy(df)
+
+    def technical(self, df: pd.DataFrame, ticker_code, compute):
+        """compute(df, dropna=False) memoized by ticker + OHLCV content."""
+        key = (ticker_code, content_fingerprint(df))
+        with self._lock:
+            cached = self._technical.get(key)
+            if cached is not None:
+                self.stats["feature_hits"] += 1
+                return cached.copy()
+        featured = compute(df, dropna=False)
+        with self._lock:
+            self.stats["feature_builds"] += 1
+            self._technical[key] = featured
+        return featured.copy()
+
+    def featured(self, df: pd.DataFrame, ticker_code, variant: tuple, macro_panel, build):
+        """build() memoized by ticker + OHLCV content + variant + macro panel.
+
+        The macro panel is compared by identity (one panel object per run);
+        the entry keeps a reference so the id can never be reused.
+        """
+        key = (ticker_code, content_fingerprint(df), variant, id(macro_panel))
+        with self._lock:
+            cached = self._featured.get(key)
+            if cached is not None and cached[0] is macro_panel:
+                self.stats["feature_hits"] += 1
+                return cached[1].copy()
+        featured = build()
+        with self._lock:
+            self.stats["feature_builds"] += 1
+            self._featured[key] = (macro_panel, featured)
+        return featured.copy()
+
+    def summary(self) -> str:
+        s = self.stats
+        return (
+            f"OHLCV {s['ohlcv_loads']} loads / {s['ohlcv_hits']} hits, "
+            f"features {s['feature_builds']} builds / {s['feature_hits']} hits"
+        )
+
+
+_ACTIVE: RunCache | None = None
+
+
+def active() -> RunCache | None:
+    """The cache of the run in progress, or None outside a run scope."""
+    return _ACTIVE
+
+
+@contextmanager
+def run_scope():
+    """Activate a fresh RunCache for the duration of one pipeline run."""
+    global _ACTIVE
+    previous = _ACTIVE
+    cache = RunCache()
+    _ACTIVE = cache
+    try:
+        yield cache
+    finally:
+        _ACTIVE = previous
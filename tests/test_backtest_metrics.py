@@ -15,17 +15,27 @@ ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT))
 
 from src.backtest import (  # noqa: E402
+    _build_threshold_candidates,
     _collect_oos_predictions,
     _compute_metrics,
     _evaluate_gate_rules,
+    _independent_cohort_count,
     _optimize_thresholds,
+    _round_trip_returns,
     _score_for_objective,
+    _simulate_strategy,
     _split_oos_for_thresholding,
+    _threshold_grid_metrics,
     evaluate_kpi_gate,
 )
 from src.config import get_backtest_gate_config  # noqa: E402
-from src.execution import EXECUTION_CONTRACT_VERSION  # noqa: E402
-from src.predictor import resolve_thresholds  # noqa: E402
+from src.execution import (  # noqa: E402
+    EXECUTION_CONTRACT_VERSION,
+    PATH_COLUMNS,
+    add_execution_columns,
+)
+from src.predictor import action_from_probability, resolve_thresholds  # noqa: E402
+from tests.test_feature_engine import synthetic_ohlcv  # noqa: E402
 
 
 def _sim(net_returns, exposures, ending_exposures, turnovers, entry_cohorts):
@@ -227,9 +237,7 @@ def test_gate_uses_independent_signal_cohort_minimum_when_configured():
         "max_drawdown": 0.25,
         "min_sharpe": 0.2,
     }
-    assert _evaluate_gate_rules(metrics, config) == [
-        "independent_signal_cohorts<5"
-    ]
+    assert _evaluate_gate_rules(metrics, config) == ["independent_signal_cohorts<5"]
     metrics["independent_signal_cohorts"] = 5
     assert _evaluate_gate_rules(metrics, config) == []
 
@@ -404,21 +412,17 @@ def test_sparse_best_threshold_is_diagnostic_only_when_no_candidate_is_feasible(
         # A deliberately lower global gate minimum must not make the sparse
         # optimized threshold actionable.
         "min_independent_signal_cohorts": 1,
+        # The fake metrics below stand in for every candidate; there is no
+        # OOS probability distribution to prune with.
+        "auto_threshold_search": "exhaustive",
         "min_avg_daily_net_return": -1.0,
         "min_cagr": -1.0,
         "max_drawdown": 1.0,
         "min_sharpe": -1.0,
     }
 
-    def fake_simulation(_oos, _config, *, thresholds, horizon):
-        frame = pd.DataFrame({"net_return": [0.0]})
-        frame.attrs["threshold_kind"] = (
-            "sparse" if thresholds["buy"] == sparse["buy"] else "default"
-        )
-        return frame
-
-    def fake_metrics(simulation, horizon=1):
-        sparse_candidate = simulation.attrs["threshold_kind"] == "sparse"
+    def fake_metrics(thresholds):
+        sparse_candidate = thresholds["buy"] == sparse["buy"]
         return {
             "round_trips": 2 if sparse_candidate else 1,
             "independent_signal_cohorts": 2 if sparse_candidate else 1,
@@ -429,12 +433,14 @@ def test_sparse_best_threshold_is_diagnostic_only_when_no_candidate_is_feasible(
             "max_drawdown": -0.1,
         }
 
+    def fake_grid_metrics(_oos, _config, candidates, *, horizon):
+        return [fake_metrics(thresholds) for thresholds in candidates]
+
     with (
         patch(
             "src.backtest._build_threshold_candidates", return_value=[default, sparse]
         ),
-        patch("src.backtest._simulate_strategy", side_effect=fake_simulation),
-        patch("src.backtest._compute_metrics", side_effect=fake_metrics),
+        patch("src.backtest._threshold_grid_metrics", side_effect=fake_grid_metrics),
     ):
         selected, metadata = _optimize_thresholds(tuning_oos, config, horizon=5)
 
@@ -473,6 +479,7 @@ def test_canonical_kpi_env_names_populate_compatibility_aliases():
     assert config["sample_sufficiency_metric"] == "independent_signal_cohorts"
     assert config["min_independent_signal_cohorts"] == 5
     assert config["auto_threshold_min_independent_signal_cohorts"] == 8
+    assert config["auto_threshold_search"] == "pruned"
 
 
 def test_legacy_kpi_env_names_warn_and_map_to_canonical_contract():
@@ -496,6 +503,254 @@ def test_legacy_kpi_env_names_warn_and_map_to_canonical_contract():
     assert len([item for item in caught if item.category is FutureWarning]) == 4
 
 
+_POSITIONS = {"BUY": 1.0, "MILD_BUY": 0.5, "MILD_SELL": -0.5, "SELL": -1.0}
+
+
+def _per_decision_simulation(oos, config, thresholds, horizon):
+    """The dict-of-events sleeve loop _simulate_strategy() replaced."""
+    t = resolve_thresholds(thresholds)
+    h = max(1, int(horizon))
+    positions = []
+    for row in oos.itertuples(index=False):
+        action = action_from_probability(row.prob_up, row.volatility, t)
+        position = _POSITIONS.get(action, 0.0)
+        positions.append(position if config["allow_short"] else max(position, 0.0))
+    paths = oos.execution_path.paths(h)
+    events = {}
+    for i in np.flatnonzero(paths.valid):
+        sleeve = positions[i] / h
+        for offset, (asset_return, session_date, market_row) in enumerate(
+            zip(paths.returns[i], paths.dates[i], paths.market_rows[i])
+        ):
+            event = events.setdefault(
+                int(market_row),
+                {
+                    "date": pd.Timestamp(session_date),
+                    "market_row_number": int(market_row),
+                    "exposure": 0.0,
+                    "gross_exposure": 0.0,
+                    "gross_return": 0.0,
+                    "turnover": 0.0,
+                    "active_sleeves": 0,
+                    "entry_cohorts": 0,
+                    "exit_exposure": 0.0,
+                },
+            )
+            event["exposure"] += sleeve
+            event["gross_exposure"] += abs(sleeve)
+            event["gross_return"] += sleeve * float(asset_return)
+            if sleeve != 0.0:
+                event["active_sleeves"] += 1
+            if offset == 0 and sleeve != 0.0:
+                event["entry_cohorts"] += 1
+                event["turnover"] += abs(sleeve)
+            if offset == h - 1 and sleeve != 0.0:
+                event["turnover"] += abs(sleeve)
+                event["exit_exposure"] += sleeve
+    if not events:
+        return pd.DataFrame()
+    sim = pd.DataFrame([events[key] for key in sorted(events)])
+    fee_rate = (float(config["cost_bps"]) + float(config["slippage_bps"])) / 10000.0
+    sim["cost_return"] = sim["turnover"] * fee_rate
+    sim["net_return"] = sim["gross_return"] - sim["cost_return"]
+    sim["equity"] = (1.0 + sim["net_return"]).cumprod()
+    sim["ending_exposure"] = sim["exposure"] - sim["exit_exposure"]
+    sim["execution_contract_version"] = EXECUTION_CONTRACT_VERSION
+    return sim
+
+
+def _simulation_oos(horizon, rows=300, seed=5):
+    """Executable OOS rows with NaN probabilities / volatilities sprinkled in."""
+    rng = np.random.default_rng(seed)
+    oos = add_execution_columns(synthetic_ohlcv(rows, seed), horizon)
+    oos["market_row_number"] = np.arange(rows)
+    oos["prob_up"] = rng.uniform(0.0, 1.0, rows)
+    oos["volatility"] = rng.uniform(0.01, 0.06, rows)
+    oos.loc[oos.index[::17], "prob_up"] = np.nan
+    oos.loc[oos.index[::11], "volatility"] = np.nan
+    return oos
+
+
+def test_array_simulation_matches_per_decision_loop():
+    thresholds = [
+        None,
+        {"buy": 0.7, "mild_buy": 0.55, "mild_sell": 0.4, "sell": 0.2},
+        {
+            "buy": 0.9,
+            "mild_buy": 0.6,
+            "mild_sell": 0.3,
+            "sell": 0.05,
+            "volatility_limit": 0.03,
+        },
+    ]
+    for horizon in (1, 3, 5):
+        oos = _simulation_oos(horizon)
+        legacy = oos.copy()
+        valid = oos.execution_path.paths(horizon).valid
+        for column in PATH_COLUMNS:  # per-row lists, the pre-array format
+            legacy[column] = [
+                list(value) if ok else None
+                for value, ok in zip(oos[column].tolist(), valid)
+            ]
+        for allow_short in (False, True):
+            config = {"allow_short": allow_short, "cost_bps": 7.5, "slippage_bps": 3}
+            for threshold in thresholds:
+                expected = _per_decision_simulation(oos, config, threshold, horizon)
+                for frame in (oos, legacy):
+                    sim = _simulate_strategy(frame, config, threshold, horizon)
+                    pd.testing.assert_frame_equal(sim, expected, check_exact=True)
+                    assert _compute_metrics(sim, horizon) == _compute_metrics(
+                        expected, horizon
+                    )
+
+    # Nothing executable: no sessions at all.
+    short = _simulation_oos(5).iloc[-5:]
+    config = {"allow_short": True, "cost_bps": 0.0, "slippage_bps": 0.0}
+    assert _simulate_strategy(short, config, None, 5).empty
+
+
+def test_threshold_grid_metrics_match_per_candidate_simulation():
+    # Every 7th set of the default grid: all kinds of position columns, shared
+    # ones included, at a fraction of the per-candidate reference cost.
+    candidates = _build_threshold_candidates({})[::7]
+    for horizon in (1, 5):
+        oos = _simulation_oos(horizon)
+        for allow_short in (False, True):
+            config = {"allow_short": allow_short, "cost_bps": 7.5, "slippage_bps": 3}
+            grid = _threshold_grid_metrics(oos, config, candidates, horizon=horizon)
+            assert len(grid) == len(candidates)
+            for threshold, metrics in zip(candidates, grid):
+                sim = _simulate_strategy(oos, config, threshold, horizon)
+                assert metrics == _compute_metrics(sim, horizon)
+
+    config = {"allow_short": True, "cost_bps": 0.0, "slippage_bps": 0.0}
+    empty = _compute_metrics(pd.DataFrame())
+    for oos in (_simulation_oos(5).iloc[-5:], _simulation_oos(5).iloc[:0]):
+        grid = _threshold_grid_metrics(oos, config, candidates[:3], horizon=5)
+        assert grid == [empty] * 3
+    # Candidates sharing a position column still get their own dicts.
+    grid[0]["round_trips"] = -1
+    assert grid[1]["round_trips"] == 0
+
+
+def test_pruned_threshold_search_selects_the_exhaustive_thresholds():
+    stats = []
+    cases = [
+        # (seed, allow_short, objective, sample metric, auto-threshold minimum)
+        (3, False, "avg_daily_net_return", "independent_signal_cohorts", 40),
+        (4, True, "avg_daily_net_return", "independent_signal_cohorts", 8),
+        (5, True, "avg_daily_net_return", "round_trips", 30),
+        (6, False, "sharpe", "round_trips", 8),
+        (7, True, "net_return", "independent_signal_cohorts", 20),
+        (8, False, "avg_daily_net_return", "independent_signal_cohorts", 10_000),
+    ]
+    for seed, allow_short, objective, sample_metric, minimum in cases:
+        oos = _simulation_oos(5, rows=400, seed=seed)
+        # Concentrated probabilities: the outer thresholds admit few rows.
+        oos["prob_up"] = np.random.default_rng(seed).beta(5.0, 5.0, len(oos))
+        config = {
+            "allow_short": allow_short,
+            "cost_bps": 10.0,
+            "slippage_bps": 5.0,
+            "auto_threshold_objective": objective,
+            "sample_sufficiency_metric": sample_metric,
+            "auto_threshold_min_round_trips": minimum,
+            "auto_threshold_min_independent_signal_cohorts": minimum,
+        }
+        results = {}
+        for mode in ("exhaustive", "pruned"):
+            config["auto_threshold_search"] = mode
+            selected, metadata = _optimize_thresholds(oos, config, horizon=5)
+            results[mode] = (selected, metadata, metadata.pop("threshold_search"))
+        assert results["pruned"][:2] == results["exhaustive"][:2], seed
+        search = results["pruned"][2]
+        assert search["evaluated"] < results["exhaustive"][2]["evaluated"]
+        stats.append(search)
+
+    assert any(search["pruned_equivalent"] > 0 for search in stats)
+    assert any(search["pruned_infeasible"] > 0 for search in stats)
+    assert any(search["pruned_by_score"] > 0 for search in stats)
+
+
+def _loop_round_trip_returns(net_returns, exposures, ending_exposures):
+    """The per-session episode walk _round_trip_returns() replaced."""
+
+    def sign(value, tolerance=1e-12):
+        numeric = float(value)
+        if numeric > tolerance:
+            return 1
+        if numeric < -tolerance:
+            return -1
+        return 0
+
+    completed = []
+    active_sign = 0
+    growth = 1.0
+    for net_return, exposure, ending_exposure in zip(
+        net_returns, exposures, ending_exposures
+    ):
+        session_sign = sign(exposure)
+        ending_sign = sign(ending_exposure)
+        if active_sign != 0 and session_sign != active_sign:
+            completed.append(float(growth - 1.0))
+            active_sign = 0
+            growth = 1.0
+        if active_sign == 0 and session_sign != 0:
+            active_sign = session_sign
+        if active_sign != 0:
+            growth *= 1.0 + float(net_return)
+        if active_sign != 0 and ending_sign != active_sign:
+            completed.append(float(growth - 1.0))
+            active_sign = ending_sign
+            growth = 1.0
+    return completed
+
+
+def _loop_independent_cohort_count(positions, entries, h):
+    """The per-session greedy scan _independent_cohort_count() replaced."""
+    count = 0
+    next_eligible = None
+    for position, entry_count in zip(positions, entries):
+        if entry_count <= 0 or not np.isfinite(position):
+            continue
+        current = int(position)
+        if next_eligible is None or current >= next_eligible:
+            count += 1
+            next_eligible = current + h
+    return count
+
+
+def test_vectorized_episode_metrics_match_session_loops():
+    rng = np.random.default_rng(11)
+    # Sleeve sums, sub-tolerance residues and NaN around zero.
+    levels = np.array([0.0, 0.1, -0.1, 0.2, -0.05, 0.3, 4e-13, -4e-13, np.nan])
+    for trial in range(400):
+        n = int(rng.integers(0, 60))
+        weights = rng.uniform(0.0, 1.0, len(levels))
+        exposures = rng.choice(levels, n, p=weights / weights.sum())
+        if trial % 2:
+            ending = rng.choice(levels, n, p=weights / weights.sum())
+        else:  # mostly the same sign as the session, as in a simulation
+            ending = np.where(rng.uniform(size=n) < 0.7, exposures, 0.0)
+        net_returns = rng.normal(0.0, 0.02, n)
+        net_returns[rng.uniform(size=n) < 0.2] = 0.0
+        got = _round_trip_returns(net_returns, exposures, ending)
+        assert got == _loop_round_trip_returns(net_returns, exposures, ending)
+
+        horizon = int(rng.integers(1, 8))
+        rows = np.cumsum(rng.integers(0, 4, n)).astype(float)
+        if trial % 5 == 0:
+            rows = rng.permutation(rows)  # out of market-row order
+        if trial % 3 == 0:
+            rows = rows + rng.uniform(0.0, 0.99, n)  # truncated like int()
+        rows[rng.uniform(size=n) < 0.1] = np.nan
+        entries = rng.integers(-1, 3, n).astype(float)
+        entries[rng.uniform(size=n) < 0.05] = np.nan
+        assert _independent_cohort_count(
+            rows, entries, horizon
+        ) == _loop_independent_cohort_count(rows, entries, horizon)
+
+
 ALL_TESTS = [
     test_no_trade_metrics_are_zero,
     test_continuous_holding_is_one_round_trip,
@@ -514,6 +769,10 @@ ALL_TESTS = [
     test_sparse_best_threshold_is_diagnostic_only_when_no_candidate_is_feasible,
     test_canonical_kpi_env_names_populate_compatibility_aliases,
     test_legacy_kpi_env_names_warn_and_map_to_canonical_contract,
+    test_array_simulation_matches_per_decision_loop,
+    test_threshold_grid_metrics_match_per_candidate_simulation,
+    test_pruned_threshold_search_selects_the_exhaustive_thresholds,
+    test_vectorized_episode_metrics_match_session_loops,
 ]
 
 
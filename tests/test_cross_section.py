@@ -21,6 +21,7 @@ import pandas as pd
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT))
 
+from src.compact_dtypes import compact_frame, frame_nbytes  # noqa: E402
 from src.cross_section import (  # noqa: E402
     CS_BASE_FEATURES,
     SECTOR_REL_FEATURES,
@@ -34,6 +35,7 @@ from src.execution import (  # noqa: E402
     EXECUTION_CONTRACT_VERSION,
     EXIT_PRICE_BASIS,
 )
+from src.feature_engine import CALENDAR_COLS  # noqa: E402
 from src.macro import MACRO_FEATURE_COLS  # noqa: E402
 
 
@@ -412,6 +414,38 @@ def test_cross_sectional_feature_cols():
         assert col in panel.columns, f"Expected column {col!r} not in panel"
 
 
+@_test
+def test_compact_panel_is_the_full_panel_narrowed():
+    """
+    compact=True narrows each stage's output only after the later stages have
+    read it, so the panel equals compact_frame() of the full-precision panel:
+    float32 features, categorical ticker/sector, int8 calendar columns and
+    float64 prices / labels, in the same row order.
+    """
+    sectors = [None, "Tech", None, "Finance", "Tech", "Energy"]
+    tickers_data = _make_tickers_data(n_tickers=6, n_rows=120, sectors=sectors)
+    for with_labels in (True, False):
+        full = build_cs_panel(tickers_data, with_labels=with_labels, compact=False)
+        compact = build_cs_panel(tickers_data, with_labels=with_labels, compact=True)
+        pd.testing.assert_frame_equal(compact, compact_frame(full), check_exact=True)
+        assert frame_nbytes(compact) < 0.75 * frame_nbytes(full)
+
+    for col in ("ticker", "sector"):
+        assert isinstance(compact[col].dtype, pd.CategoricalDtype), col
+    for col in CALENDAR_COLS:
+        assert compact[col].dtype == np.int8, col
+    for col in cross_sectional_feature_cols(macro_enabled=True):
+        assert compact[col].dtype == np.float32, col
+    for col in ("close", "fwd_return", "target_vol_norm", "entry_price"):
+        if col in full.columns:
+            assert compact[col].dtype == np.float64, col
+    np.testing.assert_allclose(
+        compact["cs_z_return_5d"].to_numpy(dtype=np.float64),
+        full["cs_z_return_5d"].to_numpy(),
+        rtol=1e-6,
+    )
+
+
 # ---------------------------------------------------------------------------
 # Runner
 # ---------------------------------------------------------------------------
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Unit tests for src/cs_features.py: the within-group engine behind
+add_cross_sectional_features / add_sector_features / add_liquidity_features.
+Each test compares against the per-feature groupby implementation the engine
+replaced (_reference_* below).
+
+Runnable two ways:
+  uv run python tests/test_cs_features.py     # standalone
+  uv run pytest tests/test_cs_features.py      # if pytest is available
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src import cs_features  # noqa: E402
+from src.cross_section import (  # noqa: E402
+    CS_BASE_FEATURES,
+    SECTOR_REL_FEATURES,
+    add_cross_sectional_features,
+    add_liquidity_features,
+    add_panel_cs_features,
+    add_sector_features,
+)
+
+# Force one layout or the other regardless of how even the groups are.
+GRID = patch.object(cs_features, "MAX_GRID_FILL", float("inf"))
+FLAT = patch.object(cs_features, "MAX_GRID_FILL", 0)
+
+
+def _reference_z(panel, f):
+    g = panel.groupby("date")[f]
+    with np.errstate(invalid="ignore"):  # inf values
+        std_pop = g.transform(lambda s: s.std(ddof=0))
+    denom = std_pop.where(std_pop > 0)
+    z = (panel[f] - g.transform("mean")) / denom
+    finite_x = panel[f].notna() & np.isfinite(panel[f].values.astype(float))
+    return z.where(~(finite_x & denom.isna()), other=0.0)
+
+
+def _reference_rank(panel, f, by="date"):
+    keys = "date"
+    if by == "sector":
+        keys = [panel["date"], panel["sector"].fillna("__NA__")]
+    return panel.groupby(keys)[f].rank(pct=True, method="average")
+
+
+def _panel(seed=0, n_dates=40, n_tickers=25):
+    """Ties, NaN, inf, all-equal and all-NaN dates, None sectors, shuffled rows."""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2022-01-03", periods=n_dates)
+    panel = pd.DataFrame(
+        {
+            "date": np.repeat(dates, n_tickers),
+            "ticker": np.tile([f"{1000 + i}.JP" for i in range(n_tickers)], n_dates),
+            "sector": np.tile(
+                [None if i % 4 == 0 else f"S{i % 3}" for i in range(n_tickers)],
+                n_dates,
+            ),
+        }
+    )
+    for f in CS_BASE_FEATURES + ["turnover"]:
+        panel[f] = np.round(rng.normal(0, 1, len(panel)), 1)  # plenty of ties
+        panel.loc[rng.random(len(panel)) < 0.1, f] = np.nan
+    first, second, third = (panel["date"] == d for d in dates[:3])
+    panel.loc[first, "rsi"] = 2.5  # zero spread
+    panel.loc[second, "atr_pct"] = np.nan  # nothing to rank
+    panel.loc[third & (panel["ticker"] == "1003.JP"), "vol_ratio"] = np.inf
+    panel.loc[third & (panel["ticker"] == "1004.JP"), "macd_hist"] = -np.inf
+    # Thin dates: a single name, and a missing one.
+    panel = panel[~((panel["date"] == dates[3]) & (panel["ticker"] != "1000.JP"))]
+    panel = panel[panel["date"] != dates[4]]
+    return panel.sample(frac=1.0, random_state=seed).reset_index(drop=True)
+
+
+def _assert_matches_reference(panel):
+    got = add_sector_features(add_cross_sectional_features(panel))
+    for f in CS_BASE_FEATURES:
+        pd.testing.assert_series_equal(
+            got[f"cs_rank_{f}"], _reference_rank(panel, f),
+            check_exact=True, check_names=False,
+        )
+        pd.testing.assert_series_equal(
+            got[f"cs_z_{f}"], _reference_z(panel, f),
+            rtol=1e-12, atol=1e-12, check_names=False,
+        )
+    for f in SECTOR_REL_FEATURES:
+        pd.testing.assert_series_equal(
+            got[f"sect_rank_{f}"], _reference_rank(panel, f, by="sector"),
+            check_exact=True, check_names=False,
+        )
+    return got
+
+
+def test_grid_and_flat_layouts_match_groupby():
+    for layout in (GRID, FLAT):
+        with layout:
+            for seed in range(3):
+                _assert_matches_reference(_panel(seed))
+            _assert_matches_reference(_panel(9, n_dates=6, n_tickers=2))
+
+
+def test_zero_and_undefined_spread():
+    got = _assert_matches_reference(_panel(1))
+    first = got["date"] == got["date"].min()
+    assert (got.loc[first, "cs_z_rsi"] == 0.0).all()
+    assert got.loc[first, "cs_rank_rsi"].nunique() == 1  # one shared tie
+    # A lone name: z is 0.0 and rank 1.0 wherever its value is present.
+    lone = (got.groupby("date")["ticker"].transform("count") == 1).to_numpy()
+    assert lone.sum() == 1
+    present = got.loc[lone, CS_BASE_FEATURES].notna().to_numpy()
+    z = got.loc[lone, [f"cs_z_{f}" for f in CS_BASE_FEATURES]].to_numpy()
+    ranks = got.loc[lone, [f"cs_rank_{f}" for f in CS_BASE_FEATURES]].to_numpy()
+    assert (z[present] == 0.0).all() and (ranks[present] == 1.0).all()
+    assert np.isnan(z[~present]).all() and np.isnan(ranks[~present]).all()
+
+    # Equal values whose float mean is not exact still have no spread.
+    equal = pd.DataFrame(
+        {"date": pd.Timestamp("2024-01-04"), "return_5d": [0.1, 0.1, 0.1]}
+    )
+    assert add_cross_sectional_features(equal)["cs_z_return_5d"].eq(0.0).all()
+
+
+def test_rows_without_a_date_stay_out_of_every_group():
+    panel = _panel(2)
+    panel.loc[:4, "date"] = pd.NaT
+    got = add_cross_sectional_features(panel)
+    dated = got["date"].notna()
+    assert got.loc[~dated, "cs_rank_rsi"].isna().all()
+    finite = np.isfinite(panel.loc[~dated, "rsi"])
+    assert (got.loc[~dated, "cs_z_rsi"][finite] == 0.0).all()
+    pd.testing.assert_series_equal(
+        got.loc[dated, "cs_rank_rsi"],
+        _reference_rank(panel, "rsi")[dated],
+        check_exact=True, check_names=False,
+    )
+
+
+def test_liquidity_columns_and_single_assignment():
+    panel = _panel(3)
+    got = add_liquidity_features(panel)
+    pd.testing.assert_series_equal(
+        got["cs_rank_turnover"], _reference_rank(panel, "turnover"),
+        check_exact=True, check_names=False,
+    )
+    pd.testing.assert_series_equal(
+        got["cs_z_adv20"], _reference_z(panel, "adv20"),
+        rtol=1e-12, atol=1e-12, check_names=False,
+    )
+    # Existing columns are kept (idempotent), the input is never modified.
+    again = add_liquidity_features(got.assign(cs_rank_turnover=0.5))
+    assert (again["cs_rank_turnover"] == 0.5).all()
+    assert "cs_rank_turnover" not in panel.columns
+    bare = add_liquidity_features(panel.drop(columns=["adv20", "turnover"]))
+    assert bare[["cs_z_adv20", "cs_rank_adv20", "cs_rank_turnover"]].isna().all().all()
+
+    # build_cs_panel's single pass equals the three steps.
+    steps = add_liquidity_features(
+        add_sector_features(add_cross_sectional_features(panel))
+    )
+    pd.testing.assert_frame_equal(add_panel_cs_features(panel), steps, check_exact=True)
+
+
+ALL_TESTS = [
+    test_grid_and_flat_layouts_match_groupby,
+    test_zero_and_undefined_spread,
+    test_rows_without_a_date_stay_out_of_every_group,
+    test_liquidity_columns_and_single_assignment,
+]
+
+
+def main() -> int:
+    failures = 0
+    for t in ALL_TESTS:
+        try:
+            t()
+            print(f"PASS {t.__name__}")
+        except AssertionError as exc:
+            failures += 1
+            print(f"FAIL {t.__name__}: {exc}")
+        except Exception as exc:  # noqa: BLE001
+            failures += 1
+            print(f"ERROR {t.__name__}: {type(exc).__name__}: {exc}")
+    print(f"\n{len(ALL_TESTS) - failures}/{len(ALL_TESTS)} passed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
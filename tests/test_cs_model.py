@@ -28,6 +28,7 @@ ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT))
 
 from src import cs_model as cm  # noqa: E402
+from src.compact_dtypes import compact_frame  # noqa: E402
 from src.cross_section import cross_sectional_feature_cols  # noqa: E402
 
 
@@ -270,6 +271,44 @@ def test_determinism():
     )
 
 
+def test_compact_panel_outputs_within_tolerance():
+    """
+    float32 features can move a split threshold when training, so the OOS
+    scores and metrics agree within tolerance; one booster scores a compact
+    and a full-precision panel alike.
+    """
+    panel = _make_planted_panel()
+    compact = compact_frame(panel)
+    latest_date = panel["date"].max()
+    for objective in ("ranker", "regression"):
+        config = _cfg(objective=objective)
+        full_bundle, _ = cm.train_cs_model(panel, config, macro_enabled=False)
+        compact_bundle, _ = cm.train_cs_model(compact, config, macro_enabled=False)
+        full_oos = full_bundle["oos_predictions"]
+        compact_oos = compact_bundle["oos_predictions"]
+        assert compact_oos["ticker"].dtype == object
+        assert full_oos[["date", "ticker"]].equals(compact_oos[["date", "ticker"]])
+        agreement = full_oos["raw_score"].corr(
+            compact_oos["raw_score"], method="spearman"
+        )
+        assert agreement > 0.99, (objective, agreement)
+        for key in ("daily_ic", "precision_at_n"):
+            full_value = full_bundle["metrics"][key]
+            compact_value = compact_bundle["metrics"][key]
+            assert abs(full_value - compact_value) < 0.02, (key, objective)
+
+        full_pred = cm.predict_cs_model(
+            full_bundle, panel[panel["date"] == latest_date]
+        )
+        compact_pred = cm.predict_cs_model(
+            full_bundle, compact[compact["date"] == latest_date]
+        )
+        assert compact_pred["ticker"].tolist() == full_pred["ticker"].tolist()
+        np.testing.assert_allclose(
+            compact_pred["raw_score"], full_pred["raw_score"], atol=1e-6
+        )
+
+
 ALL_TESTS = [
     test_train_ranker_returns_bundle,
     test_train_regression_returns_bundle,
@@ -279,6 +318,7 @@ ALL_TESTS = [
     test_cs_metrics_perfect_ranking,
     test_insufficient_panel_returns_none,
     test_determinism,
+    test_compact_panel_outputs_within_tolerance,
 ]
 
 
@@ -4,13 +4,20 @@
 from __future__ import annotations
 
 import sys
+import tempfile
+import threading
+import time
+from datetime import date
 from pathlib import Path
+from unittest.mock import patch
 
 import pandas as pd
+import pyarrow.parquet as pq
 
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT))
 
+from src import data_loader, model, price_store, provider_health  # noqa: E402
 from src.data_loader import _validate_ohlcv  # noqa: E402
 
 
@@ -33,7 +40,578 @@ def test_nonfinite_ohlcv_rows_are_rejected():
     assert "invalid_non_finite_ohlcv:2" in validated.attrs["validation_warnings"]
 
 
-ALL_TESTS = [test_nonfinite_ohlcv_rows_are_rejected]
+def test_update_many_keeps_per_ticker_results_and_errors():
+    frame = pd.DataFrame({"date": [pd.Timestamp("2026-07-21")], "close": [1.0]})
+    calls = []
+
+    def fake_update(code, dest_dir=None, force=None):
+        calls.append((code, dest_dir))
+        if code == "3333.JP":
+            raise RuntimeError("boom")
+        return frame if code == "1111.JP" else None
+
+    with patch.object(data_loader, "update_data", side_effect=fake_update):
+        results, errors = data_loader.update_many(
+            ["1111.JP", "2222.JP", "3333.JP", "1111.JP"],
+            dest_dir="watch",
+            max_workers=3,
+            per_host_rate=0,
+        )
+
+    assert sorted(calls) == [
+        ("1111.JP", "watch"),
+        ("2222.JP", "watch"),
+        ("3333.JP", "watch"),
+    ]
+    assert list(results) == ["1111.JP", "2222.JP"]
+    assert results["1111.JP"] is frame
+    assert results["2222.JP"] is None
+    assert list(errors) == ["3333.JP"]
+    assert isinstance(errors["3333.JP"], RuntimeError)
+
+
+def test_update_many_batches_the_yfinance_fallback():
+    """Tickers Stooq cannot answer share one multi-ticker yfinance request."""
+    end = pd.Timestamp(data_loader.today_jst())
+    dates = pd.bdate_range(end=end, periods=30, name="Date")
+    close = [100.0 + i for i in range(len(dates))]
+    frame = pd.DataFrame(
+        {
+            "Open": close,
+            "High": [c + 1.0 for c in close],
+            "Low": [c - 1.0 for c in close],
+            "Close": close,
+            "Adj Close": close,
+            "Volume": [1000.0] * len(dates),
+        },
+        index=dates,
+    )
+    stooq_calls = []
+    yf_calls = []
+
+    def fake_stooq(code, start=None):
+        stooq_calls.append(code)
+        return None
+
+    def fake_yf_download(symbols, **kwargs):
+        yf_calls.append((symbols, kwargs))
+        if isinstance(symbols, str):
+            return frame if symbols == "2222.T" else pd.DataFrame()
+        # 2222.T was rate limited (NaN columns) and 3333.T is not listed on
+        # Yahoo (the answer simply lacks it): both get a single request.
+        return pd.concat(
+            {
+                s: frame * float("nan") if s == "2222.T" else frame
+                for s in symbols
+                if s != "3333.T"
+            },
+            axis=1,
+        )
+
+    provider_health.set_tracker(provider_health.ProviderHealth(path=None))
+    try:
+        with tempfile.TemporaryDirectory() as tmp, patch.object(
+            data_loader, "download_stooq_data", side_effect=fake_stooq
+        ), patch.object(data_loader.yf, "download", side_effect=fake_yf_download):
+            results, errors = data_loader.update_many(
+                ["1111.JP", "2222.JP", "3333.JP"],
+                dest_dir=tmp,
+                max_workers=2,
+                per_host_rate=0,
+            )
+            written = sorted(p.name for p in Path(tmp).glob("*.parquet"))
+    finally:
+        provider_health.set_tracker(None)
+
+    symbols, kwargs = yf_calls[0]
+    assert sorted(symbols) == ["1111.T", "2222.T", "3333.T"]
+    assert kwargs["group_by"] == "ticker"
+    assert sorted(s for s, _ in yf_calls[1:]) == ["2222.T", "3333.T"]
+    # The second pass does not ask Stooq again.
+    assert sorted(stooq_calls) == ["1111.JP", "2222.JP", "3333.JP"]
+    assert errors == {}
+    assert written == ["1111.JP.parquet", "2222.JP.parquet"]
+    assert len(results["1111.JP"]) == len(dates)
+    assert results["3333.JP"] is None
+
+
+def test_update_many_delta_failure_waits_for_the_batch():
+    """A failed delta fetch asks Stooq once; the batch answers the delta."""
+    end = pd.Timestamp(data_loader.today_jst())
+    history = _ohlcv(str((end - pd.offsets.BDay(59)).date()), 60)
+    stooq_calls = []
+    yf_starts = []
+
+    def fake_stooq(code, start=None):
+        stooq_calls.append((code, start))
+        return None
+
+    def fake_yf_download(symbols, start=None, **kwargs):
+        yf_starts.append(start)
+        window = history[history["date"] >= pd.Timestamp(start)]
+        frame = window.set_index(window["date"].rename("Date")).drop(columns="date")
+        frame.columns = ["Open", "High", "Low", "Close", "Volume"]
+        return pd.concat({s: frame for s in symbols}, axis=1)
+
+    provider_health.set_tracker(provider_health.ProviderHealth(path=None))
+    try:
+        with tempfile.TemporaryDirectory() as tmp, patch.object(
+            data_loader, "download_stooq_data", side_effect=fake_stooq
+        ), patch.object(data_loader.yf, "download", side_effect=fake_yf_download):
+            for code in ("1111.JP", "2222.JP"):
+                history.head(55).to_parquet(Path(tmp) / f"{code}.parquet")
+            results, errors = data_loader.update_many(
+                ["1111.JP", "2222.JP"], dest_dir=tmp, max_workers=2, per_host_rate=0
+            )
+    finally:
+        provider_health.set_tracker(None)
+
+    assert errors == {}
+    assert sorted(code for code, _ in stooq_calls) == ["1111.JP", "2222.JP"]
+    assert all(start is not None for _, start in stooq_calls)
+    assert len(yf_starts) == 1 and yf_starts[0] is not None
+    for df in results.values():
+        assert df.attrs["fetch_mode"] == "delta"
+        assert len(df) == 60
+
+
+def test_provider_limiter_caps_in_flight_requests():
+    limiter = data_loader._ProviderLimiter(max_concurrency=2, per_host_rate=0)
+    lock = threading.Lock()
+    state = {"in_flight": 0, "peak": 0}
+
+    def request():
+        with limiter:
+            with lock:
+                state["in_flight"] += 1
+                state["peak"] = max(state["peak"], state["in_flight"])
+            time.sleep(0.02)
+            with lock:
+                state["in_flight"] -= 1
+
+    threads = [threading.Thread(target=request) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert state["peak"] == 2
+
+
+def test_provider_limiter_paces_request_starts():
+    limiter = data_loader._ProviderLimiter(max_concurrency=4, per_host_rate=20.0)
+    started = time.monotonic()
+    for _ in range(3):
+        with limiter:
+            pass
+    # Three starts at 20/s need at least two 50ms intervals.
+    assert time.monotonic() - started >= 0.09
+
+
+def _ohlcv(start: str, periods: int, base: float = 100.0) -> pd.DataFrame:
+    dates = pd.bdate_range(start, periods=periods)
+    close = [base + i for i in range(periods)]
+    return pd.DataFrame(
+        {
+            "date": dates,
+            "open": close,
+            "high": [c + 1.0 for c in close],
+            "low": [c - 1.0 for c in close],
+            "close": close,
+            "volume": [1000.0] * periods,
+        }
+    )
+
+
+def _run_update(
+    stored: pd.DataFrame, responses: dict, **kwargs
+) -> tuple[pd.DataFrame, list]:
+    calls = []
+
+    def fake_download(code, start=None):
+        calls.append(start)
+        frame = responses["delta" if start is not None else "full"]
+        return frame, "stooq", {"is_stale": False}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        stored.to_parquet(Path(tmp) / "9999.JP.parquet")
+        with patch.object(
+            data_loader, "_download_with_fallback", side_effect=fake_download
+        ):
+            result = data_loader.update_data("9999.JP", dest_dir=tmp, **kwargs)
+        saved = price_store.read_ticker_file(Path(tmp) / "9999.JP.parquet")
+    assert len(saved) == len(result)
+    return result, calls
+
+
+def test_update_data_delta_fetch_appends_new_sessions():
+    stored = _ohlcv("2026-06-01", 30)
+    delta = _ohlcv("2026-06-01", 33).tail(10).reset_index(drop=True)
+
+    result, calls = _run_update(stored, {"delta": delta})
+
+    assert len(calls) == 1
+    assert calls[0] == stored["date"].max().date() - pd.Timedelta(days=10)
+    assert result.attrs["fetch_mode"] == "delta"
+    assert len(result) == 33
+    assert result["close"].iloc[-1] == 132.0
+
+
+def test_update_data_overlap_mismatch_triggers_full_refetch():
+    stored = _ohlcv("2026-06-01", 30)
+    # Provider back-adjusted history (e.g. a 1:2 split): overlap halves.
+    delta = _ohlcv("2026-06-01", 33, base=50.0).tail(10).reset_index(drop=True)
+    full = _ohlcv("2026-06-01", 33, base=50.0)
+
+    result, calls = _run_update(stored, {"delta": delta, "full": full})
+
+    assert len(calls) == 2 and calls[1] is None
+    assert result.attrs["fetch_mode"] == "full_after_overlap_mismatch"
+    assert result["close"].iloc[0] == 50.0
+
+
+def test_update_data_delta_failure_falls_back_to_full_history():
+    stored = _ohlcv("2026-06-01", 30)
+
+    result, calls = _run_update(stored, {"delta": None, "full": _ohlcv("2026-06-01", 31)})
+
+    assert len(calls) == 2 and calls[1] is None
+    assert result.attrs["fetch_mode"] == "full_after_delta_failure"
+    assert len(result) == 31
+
+
+def test_update_data_skips_download_when_local_data_is_fresh():
+    stored = _ohlcv("2026-06-01", 30)  # last session: Fri 2026-07-10
+
+    with patch.object(data_loader, "_today_jst", return_value=date(2026, 7, 13)):
+        result, calls = _run_update(stored, {})
+
+    assert calls == []
+    assert result.attrs["fetch_mode"] == "skipped_fresh"
+    assert len(result) == 30
+
+
+def test_update_data_force_downloads_even_when_fresh():
+    stored = _ohlcv("2026-06-01", 30)
+    delta = stored.tail(10).reset_index(drop=True)
+
+    with patch.object(data_loader, "_today_jst", return_value=date(2026, 7, 13)):
+        result, calls = _run_update(stored, {"delta": delta}, force=True)
+
+    assert len(calls) == 1
+    assert result.attrs["fetch_mode"] == "delta"
+
+
+def _fake_delta(frame):
+    def fake_download(code, start=None):
+        return frame, "stooq", {"is_stale": False}
+
+    return patch.object(data_loader, "_download_with_fallback", side_effect=fake_download)
+
+
+def test_update_data_appends_delta_file_and_compacts():
+    history = _ohlcv("2026-06-01", 34)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "9999.JP.parquet"
+        history.head(30).to_parquet(path)
+        base_stat = path.stat()
+
+        with _fake_delta(history.iloc[22:32].reset_index(drop=True)):
+            first = data_loader.update_data("9999.JP", dest_dir=tmp, append=True)
+        deltas = price_store.delta_paths(path)
+        assert first.attrs["write_mode"] == "append"
+        assert first.attrs["validation_warnings"] == []
+        assert len(first) == 32
+        assert [p.name for p in deltas] == ["000001.parquet"]
+        assert len(pd.read_parquet(deltas[0])) == 2
+        assert path.stat().st_mtime_ns == base_stat.st_mtime_ns
+        with patch.object(data_loader, "DATA_DIR", Path(tmp)):
+            loaded = data_loader.load_data("9999.JP")
+            framed = data_loader.load_frames(["9999.JP"])["9999.JP"]
+        assert loaded["close"].iloc[-1] == 131.0
+        pd.testing.assert_frame_equal(framed, loaded, check_dtype=False)
+        assert loaded["volume"].dtype == history["volume"].dtype
+        # The bulk read folded the delta into the base file.
+        assert price_store.delta_paths(path) == []
+
+        with (
+            patch.dict("os.environ", {"TRADER_DATA_COMPACT_EVERY": "1"}),
+            _fake_delta(history.iloc[24:34].reset_index(drop=True)),
+        ):
+            second = data_loader.update_data("9999.JP", dest_dir=tmp, append=True)
+        assert second.attrs["write_mode"] == "append+compact"
+        assert price_store.delta_paths(path) == []
+        assert not price_store.delta_dir(path).exists()
+        pd.testing.assert_frame_equal(pd.read_parquet(path), history)
+
+
+def test_update_data_append_validates_tail_against_last_stored_row():
+    stored = _ohlcv("2026-06-01", 30)
+    delta = _ohlcv("2026-06-01", 32).tail(10).reset_index(drop=True)
+    delta.loc[delta.index[-1], ["open", "high", "low", "close"]] = [500.0, 501.0, 499.0, 500.0]
+    with tempfile.TemporaryDirectory() as tmp:
+        stored.to_parquet(Path(tmp) / "9999.JP.parquet")
+        with _fake_delta(delta):
+            result = data_loader.update_data("9999.JP", dest_dir=tmp, append=True)
+
+    assert result.attrs["write_mode"] == "append"
+    assert len(result) == 32
+    assert any(w.startswith("extreme_close_move") for w in result.attrs["validation_warnings"])
+
+
+def test_full_rewrite_and_archive_fold_in_deltas():
+    history = _ohlcv("2026-06-01", 33)
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        path = root / "9999.JP.parquet"
+        history.head(30).to_parquet(path)
+        price_store.append_rows(path, history.iloc[30:31])
+
+        with _fake_delta(history):
+            result = data_loader.update_data(
+                "9999.JP", dest_dir=tmp, full_refresh=True, append=True
+            )
+        assert result.attrs["write_mode"] == "rewrite"
+        assert not price_store.delta_dir(path).exists()
+
+        price_store.append_rows(path, _ohlcv("2026-06-01", 34).tail(1))
+        with patch.object(data_loader, "DATA_DIR", root):
+            archived = data_loader.sync_data_files(["1111.JP"])
+            restored = data_loader.load_archived_data("9999.JP")
+        assert archived == ["9999.JP"]
+        assert not path.exists() and not price_store.delta_dir(path).exists()
+        assert len(restored) == 34
+
+
+def test_load_data_reads_only_the_declared_window():
+    history = _ohlcv("2024-01-01", 600)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "9999.JP.parquet"
+        price_store.write_ticker_file(path, history)
+        with patch.object(data_loader, "DATA_DIR", Path(tmp)):
+            windowed = data_loader.load_data(
+                "9999.JP", since=history["date"].iloc[400], warmup_rows=50
+            )
+            tail = data_loader.load_data(
+                "9999.JP", until=history["date"].iloc[589], tail_rows=10,
+                warmup_rows=5, columns=["close"],
+            )
+            full = data_loader.load_data("9999.JP")
+            empty = data_loader.load_data("9999.JP", since="2030-01-01")
+        row_groups = pq.ParquetFile(path).metadata.num_row_groups
+
+    assert row_groups == -(-600 // price_store.ROW_GROUP_ROWS)
+    assert windowed["date"].iloc[0] == history["date"].iloc[350]
+    assert len(windowed) == 250
+    assert list(tail.columns) == ["date", "close"]
+    assert tail["date"].tolist() == history["date"].iloc[575:590].tolist()
+    assert len(full) == 600
+    assert empty is None
+
+
+def test_training_window_anchors_on_the_last_labelled_date():
+    history = _ohlcv("2022-01-03", 900)
+    with tempfile.TemporaryDirectory() as tmp:
+        price_store.write_ticker_file(Path(tmp) / "9999.JP.parquet", history)
+        window = model.training_history_window(1, "9999.JP", horizon=5, data_dir=tmp)
+        missing = model.training_history_window(1, "0000.JP", data_dir=tmp)
+        with patch.object(data_loader, "DATA_DIR", Path(tmp)):
+            loaded = data_loader.load_data("9999.JP", **window)
+
+    # Trainers keep labelled rows from (last labelled date - 365 days); the
+    # last 5 rows have no forward return.
+    cut = history["date"].iloc[-6] - pd.Timedelta(days=365)
+    first_kept = int(history["date"].searchsorted(cut))
+    assert window["since"] == cut
+    assert missing == {}
+    assert loaded["date"].iloc[0] == history["date"].iloc[
+        first_kept - model.FEATURE_WARMUP_ROWS
+    ]
+    assert loaded["date"].iloc[-1] == history["date"].iloc[-1]
+
+
+def test_load_data_trusts_the_stored_validation_record():
+    history = _ohlcv("2026-01-05", 120)
+    history.loc[60:, ["open", "high", "low", "close"]] *= 2.0  # one extreme move
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "9999.JP.parquet"
+        with _fake_delta(history.head(100)):
+            data_loader.update_data("9999.JP", dest_dir=tmp)
+        with _fake_delta(history.iloc[90:].reset_index(drop=True)):
+            data_loader.update_data("9999.JP", dest_dir=tmp, append=True)
+        assert len(price_store.delta_paths(path)) == 1
+
+        with (
+            patch.object(data_loader, "DATA_DIR", Path(tmp)),
+            patch.object(
+                data_loader, "_validate_ohlcv", wraps=data_loader._validate_ohlcv
+            ) as validate,
+        ):
+            trusted = data_loader.load_data("9999.JP")
+            window = data_loader.load_data("9999.JP", since=history["date"].iloc[70])
+            assert validate.call_count == 0
+            verified = data_loader.load_data("9999.JP", verify=True)
+            assert validate.call_count == 1
+            with patch.dict("os.environ", {"TRADER_DATA_MAX_DAILY_MOVE": "0.9"}):
+                data_loader.load_data("9999.JP")
+            assert validate.call_count == 2
+
+            data_loader._compact(path, "9999.JP")
+            assert validate.call_count == 2
+            compacted = data_loader.load_data("9999.JP")
+            assert validate.call_count == 2
+
+    pd.testing.assert_frame_equal(trusted, verified)
+    assert trusted.attrs == verified.attrs
+    assert trusted.attrs["validation_warnings"] == ["extreme_close_move:1 max=101.3%"]
+    assert window.attrs["validation_warnings"] == []
+    pd.testing.assert_frame_equal(compacted, verified)
+
+
+def test_load_data_validates_files_without_a_record():
+    frame = _ohlcv("2026-06-01", 30)
+    frame.loc[5, "high"] = 1.0  # high below low
+    with tempfile.TemporaryDirectory() as tmp:
+        frame.to_parquet(Path(tmp) / "9999.JP.parquet")
+        with patch.object(data_loader, "DATA_DIR", Path(tmp)):
+            loaded = data_loader.load_data("9999.JP")
+
+    assert len(loaded) == 29
+    assert loaded.attrs["validation_warnings"] == ["invalid_ohlc_relation:1"]
+
+
+def test_load_frames_matches_load_data_per_ticker():
+    with tempfile.TemporaryDirectory() as tmp:
+        _ohlcv("2026-06-01", 30).to_parquet(Path(tmp) / "1111.JP.parquet")
+        _ohlcv("2026-06-15", 20, base=50.0).to_parquet(Path(tmp) / "2222.JP.parquet")
+        with patch.object(data_loader, "DATA_DIR", Path(tmp)):
+            frames = data_loader.load_frames(["2222.JP", "1111.JP", "3333.JP"])
+            singles = {code: data_loader.load_data(code) for code in frames}
+
+    assert list(frames) == ["2222.JP", "1111.JP"]
+    for code, frame in frames.items():
+        pd.testing.assert_frame_equal(frame, singles[code], check_dtype=False)
+        assert frame.attrs == singles[code].attrs
+
+
+def test_load_frames_trusts_the_stored_validation_record():
+    history = _ohlcv("2026-01-05", 120)
+    history.loc[60:, ["open", "high", "low", "close"]] *= 2.0  # one extreme move
+    with tempfile.TemporaryDirectory() as tmp:
+        with _fake_delta(history.head(100)):
+            data_loader.update_data("9999.JP", dest_dir=tmp)
+        with _fake_delta(history.iloc[90:].reset_index(drop=True)):
+            data_loader.update_data("9999.JP", dest_dir=tmp, append=True)
+        history.to_parquet(Path(tmp) / "1111.JP.parquet")  # no record
+
+        with (
+            patch.object(data_loader, "DATA_DIR", Path(tmp)),
+            patch.object(
+                data_loader, "_validate_ohlcv", wraps=data_loader._validate_ohlcv
+            ) as validate,
+        ):
+            frames = data_loader.load_frames(["9999.JP", "1111.JP"])
+            assert validate.call_count == 1  # only the file without a record
+            with patch.dict("os.environ", {"TRADER_DATA_VERIFY_ON_LOAD": "true"}):
+                verified = data_loader.load_frames(["9999.JP"])
+            assert validate.call_count == 2
+            single = data_loader.load_data("9999.JP", verify=True)
+
+    pd.testing.assert_frame_equal(frames["9999.JP"], verified["9999.JP"])
+    pd.testing.assert_frame_equal(frames["9999.JP"], single, check_dtype=False)
+    warnings = frames["9999.JP"].attrs["validation_warnings"]
+    assert warnings == single.attrs["validation_warnings"]
+    assert warnings == ["extreme_close_move:1 max=101.3%"]
+
+
+def test_bulk_reads_fold_pending_deltas_first():
+    history = _ohlcv("2026-01-05", 120)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "9999.JP.parquet"
+        with _fake_delta(history.head(100)):
+            data_loader.update_data("9999.JP", dest_dir=tmp)
+        with _fake_delta(history.iloc[90:].reset_index(drop=True)):
+            data_loader.update_data("9999.JP", dest_dir=tmp, append=True)
+        with patch.object(data_loader, "DATA_DIR", Path(tmp)):
+            expected = data_loader.load_data("9999.JP")
+            assert len(price_store.delta_paths(path)) == 1
+            frames = data_loader.load_frames(["9999.JP"])
+            assert price_store.delta_paths(path) == []
+            raw = data_loader.load_panel(["9999.JP"], validate=False)
+            assert price_store.read_metadata(path, data_loader.VALIDATION_META_KEY)[0]
+
+    pd.testing.assert_frame_equal(frames["9999.JP"], expected, check_dtype=False)
+    assert raw["date"].tolist() == expected["date"].tolist()
+
+
+def test_load_frames_skips_an_unreadable_file():
+    with tempfile.TemporaryDirectory() as tmp:
+        _ohlcv("2026-06-01", 30).to_parquet(Path(tmp) / "1111.JP.parquet")
+        _ohlcv("2026-06-15", 20, base=50.0).to_parquet(Path(tmp) / "2222.JP.parquet")
+        (Path(tmp) / "3333.JP.parquet").write_bytes(b"not a parquet file")
+        with patch.object(data_loader, "DATA_DIR", Path(tmp)):
+            scanned = data_loader.load_frames(["1111.JP", "2222.JP"])
+            frames = data_loader.load_frames(["3333.JP", "2222.JP", "1111.JP"])
+            everything = data_loader.load_frames()
+
+    assert list(frames) == ["2222.JP", "1111.JP"]
+    assert sorted(everything) == ["1111.JP", "2222.JP"]
+    for code, frame in frames.items():
+        pd.testing.assert_frame_equal(frame, scanned[code])
+        assert frame.attrs == scanned[code].attrs
+
+
+def test_load_panel_prunes_dates_and_pivots_wide():
+    with tempfile.TemporaryDirectory() as tmp:
+        _ohlcv("2026-06-01", 30).to_parquet(Path(tmp) / "1111.JP.parquet")
+        _ohlcv("2026-06-01", 30, base=50.0).to_parquet(Path(tmp) / "2222.JP.parquet")
+        long = data_loader.load_panel(
+            start="2026-07-01", end="2026-07-03", columns=["close"], data_dir=tmp
+        )
+        raw = data_loader.load_panel(
+            ["2222.JP"], start="2026-07-01", columns=["close"], validate=False,
+            data_dir=tmp,
+        )
+        wide = data_loader.load_panel(
+            start="2026-07-01", end="2026-07-03", columns=["close"], layout="wide",
+            data_dir=tmp,
+        )
+
+    assert list(long.columns) == ["ticker", "date", "close"]
+    assert long["ticker"].tolist() == ["1111.JP"] * 3 + ["2222.JP"] * 3
+    assert long["date"].min() == pd.Timestamp("2026-07-01")
+    assert long["date"].max() == pd.Timestamp("2026-07-03")
+    assert list(raw.columns) == ["ticker", "date", "close"]
+    assert set(raw["ticker"]) == {"2222.JP"}
+    assert list(wide.columns) == ["1111.JP", "2222.JP"]
+    assert wide.loc[pd.Timestamp("2026-07-01"), "2222.JP"] == 72.0
+
+
+ALL_TESTS = [
+    test_nonfinite_ohlcv_rows_are_rejected,
+    test_update_many_keeps_per_ticker_results_and_errors,
+    test_update_many_batches_the_yfinance_fallback,
+    test_update_many_delta_failure_waits_for_the_batch,
+    test_provider_limiter_caps_in_flight_requests,
+    test_provider_limiter_paces_request_starts,
+    test_update_data_delta_fetch_appends_new_sessions,
+    test_update_data_overlap_mismatch_triggers_full_refetch,
+    test_update_data_delta_failure_falls_back_to_full_history,
+    test_update_data_skips_download_when_local_data_is_fresh,
+    test_update_data_force_downloads_even_when_fresh,
+    test_update_data_appends_delta_file_and_compacts,
+    test_update_data_append_validates_tail_against_last_stored_row,
+    test_full_rewrite_and_archive_fold_in_deltas,
+    test_load_data_reads_only_the_declared_window,
+    test_training_window_anchors_on_the_last_labelled_date,
+    test_load_data_trusts_the_stored_validation_record,
+    test_load_data_validates_files_without_a_record,
+    test_load_frames_matches_load_data_per_ticker,
+    test_load_frames_trusts_the_stored_validation_record,
+    test_bulk_reads_fold_pending_deltas_first,
+    test_load_frames_skips_an_unreadable_file,
+    test_load_panel_prunes_dates_and_pivots_wide,
+]
 
 
 def main() -> int:
@@ -4,8 +4,10 @@
 from __future__ import annotations
 
 import sys
+import tempfile
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
 ROOT = Path(__file__).resolve().parents[1]
@@ -14,7 +16,9 @@ sys.path.insert(0, str(ROOT))
 from src.backtest import _simulate_strategy  # noqa: E402
 from src.execution import (  # noqa: E402
     EXECUTION_CONTRACT_VERSION,
+    PATH_COLUMNS,
     add_execution_columns,
+    read_parquet,
     resolve_execution_window,
 )
 
@@ -58,6 +62,53 @@ def test_vectorized_return_does_not_use_unexecutable_prior_close():
     assert out.loc[0, "execution_contract_version"] == EXECUTION_CONTRACT_VERSION
 
 
+def test_execution_paths_are_fixed_size_arrays_with_list_fallback():
+    frame = _market_frame()
+    out = add_execution_columns(frame, horizon_days=2)
+    paths = out.execution_path.paths()
+    assert paths.horizon == 2
+    assert paths.valid.tolist() == [True, True, False, False]
+    assert paths.market_rows[:2].tolist() == [[1, 2], [2, 3]]
+    assert (paths.market_rows[2:] == -1).all()
+    assert np.isnan(paths.returns[2:]).all()
+    expected = [80.0 / 120.0 - 1.0, 95.0 / 80.0 - 1.0]
+    assert np.allclose(paths.returns[0], expected, rtol=0, atol=1e-12)
+    assert list(paths.dates[1]) == list(frame["date"].iloc[2:4].to_numpy())
+    assert out.execution_path.market_row_bounds() == (1, 3)
+    # Another horizon has no stored path.
+    assert not out.execution_path.paths(3).valid.any()
+
+    # Per-row lists (the pre-array format) read back to the same arrays.
+    legacy = out.copy()
+    for column in PATH_COLUMNS:
+        legacy[column] = [
+            list(v) if ok else None
+            for v, ok in zip(out[column].tolist(), paths.valid)
+        ]
+    from_lists = legacy.execution_path.paths(2)
+    assert from_lists.valid.tolist() == paths.valid.tolist()
+    for got, want in zip(from_lists.arrays(), paths.arrays()):
+        np.testing.assert_array_equal(got, want)
+    assert legacy.execution_path.market_row_bounds() == (1, 3)
+
+
+def test_frames_with_execution_paths_round_trip_through_parquet():
+    out = add_execution_columns(_market_frame(), horizon_days=2)
+    out.attrs["note"] = "kept"
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "paths.parquet"
+        out.to_parquet(path)
+        read = read_parquet(path)
+        projected = read_parquet(path, columns=["date", PATH_COLUMNS[0]])
+
+    pd.testing.assert_frame_equal(read, out, check_exact=True)
+    assert read.attrs == out.attrs
+    assert list(projected.columns) == ["date", PATH_COLUMNS[0]]
+    np.testing.assert_array_equal(
+        read.execution_path.paths().returns, out.execution_path.paths().returns
+    )
+
+
 def test_sleeves_include_overnight_for_existing_positions_and_cap_gross():
     oos = pd.DataFrame(
         {
@@ -133,6 +184,8 @@ ALL_TESTS = [
     test_window_uses_next_observed_session_open_across_holiday,
     test_window_waits_until_full_horizon_exists,
     test_vectorized_return_does_not_use_unexecutable_prior_close,
+    test_execution_paths_are_fixed_size_arrays_with_list_fallback,
+    test_frames_with_execution_paths_round_trip_through_parquet,
     test_sleeves_include_overnight_for_existing_positions_and_cap_gross,
     test_migration_versions_legacy_rows_before_v2_restatement,
     test_frontend_performance_guards_match_current_contract,
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Unit tests for src/feature_engine.py: the array engine behind add_features().
+
+reference_add_features() is the pandas implementation add_features() used
+before the engine (per-row streak loop included); the add_features tests
+demand exact equality with it. scripts/bench_feature_engine.py times the two.
+
+Runnable two ways:
+  uv run python tests/test_feature_engine.py     # standalone
+  uv run pytest tests/test_feature_engine.py      # if pytest is available
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.feature_engine import (  # noqa: E402
+    TECHNICAL_OUTPUT_COLS,
+    technical_feature_arrays,
+    up_down_streak,
+)
+from src.model import (  # noqa: E402
+    FEATURE_COLS,
+    add_features,
+    calculate_atr,
+    calculate_bollinger_bands,
+    calculate_macd,
+    calculate_rsi,
+)
+
+
+def reference_add_features(df, dropna=True):
+    """add_features() as it was before the array engine (do not optimize)."""
+    df = df.copy()
+    df = df.sort_values("date").reset_index(drop=True)
+
+    close = df["close"]
+    high = df["high"]
+    low = df["low"]
+    volume = df["volume"]
+
+    for d in [1, 2, 3, 5, 10, 20]:
+        df[f"return_{d}d"] = close.pct_change(d)
+
+    for w in [5, 10, 20, 60]:
+        col = f"ma_{w}"
+        df[col] = close.rolling(window=w).mean()
+        df[f"div_{col}"] = (close - df[col]) / df[col]
+
+    df["ma_5_20_cross"] = df["ma_5"] / df["ma_20"] - 1
+    df["ma_20_60_cross"] = df["ma_20"] / df["ma_60"] - 1
+
+    df["rsi"] = calculate_rsi(close, 14)
+    df["rsi_change"] = df["rsi"].diff()
+
+    macd_line, macd_signal, macd_hist = calculate_macd(close)
+    df["macd"] = macd_line
+    df["macd_signal"] = macd_signal
+    df["macd_hist"] = macd_hist
+    df["macd_hist_change"] = macd_hist.diff()
+
+    df["bb_pct_b"], df["bb_bandwidth"] = calculate_bollinger_bands(close)
+
+    df["atr"] = calculate_atr(high, low, close, 14)
+    df["atr_pct"] = df["atr"] / close
+
+    df["volatility"] = df["return_1d"].rolling(window=20).std()
+
+    df["vol_change"] = volume.pct_change()
+    df["vol_ma_5"] = volume.rolling(window=5).mean()
+    df["vol_ma_20"] = volume.rolling(window=20).mean()
+    df["vol_ratio"] = df["vol_ma_5"] / df["vol_ma_20"]
+
+    body = close - df["open"]
+    candle_range = high - low
+    df["candle_body_pct"] = body / candle_range.replace(0, np.nan)
+    df["upper_shadow_pct"] = (
+        high - pd.concat([close, df["open"]], axis=1).max(axis=1)
+    ) / candle_range.replace(0, np.nan)
+    df["lower_shadow_pct"] = (
+        pd.concat([close, df["open"]], axis=1).min(axis=1) - low
+    ) / candle_range.replace(0, np.nan)
+
+    df["day_of_week"] = df["date"].dt.dayofweek
+    df["month"] = df["date"].dt.month
+    df["is_month_end"] = df["date"].dt.is_month_end.astype(int)
+    df["is_month_start"] = (df["date"].dt.day <= 3).astype(int)
+
+    up = (df["return_1d"] > 0).astype(int)
+    streak = up.copy()
+    for i in range(1, len(streak)):
+        if up.iloc[i] == up.iloc[i - 1]:
+            streak.iloc[i] = streak.iloc[i - 1] + 1
+        else:
+            streak.iloc[i] = 1
+    df["streak"] = streak * up.replace(0, -1)
+
+    df["gap"] = df["open"] / close.shift(1) - 1
+
+    df["high_20d"] = high.rolling(window=20).max()
+    df["low_20d"] = low.rolling(window=20).min()
+    df["price_position_20d"] = (close - df["low_20d"]) / (
+        df["high_20d"] - df["low_20d"]
+    ).replace(0, np.nan)
+
+    if dropna:
+        df = df.dropna().reset_index(drop=True)
+
+    return df
+
+
+def synthetic_ohlcv(periods: int, seed: int = 0) -> pd.DataFrame:
+    """Random-walk OHLCV with flat sessions, zero ranges and zero volume."""
+    rng = np.random.default_rng(seed)
+    close = 1000.0 * np.exp(np.cumsum(rng.normal(0, 0.015, periods)))
+    close = np.round(close, 1)
+    flat = rng.random(periods) < 0.05
+    close[1:][flat[1:]] = close[:-1][flat[1:]]
+    open_ = np.round(close * (1 + rng.normal(0, 0.005, periods)), 1)
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.005, periods)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.005, periods)))
+    doji = rng.random(periods) < 0.02
+    open_[doji] = high[doji] = low[doji] = close[doji]
+    volume = rng.integers(0, 50_000, periods).astype(float)
+    volume[rng.random(periods) < 0.02] = 0.0
+    return pd.DataFrame(
+        {
+            "date": pd.bdate_range("2001-01-01", periods=periods),
+            "open": open_,
+            "high": high,
+            "low": low,
+            "close": close,
+            "volume": volume,
+        }
+    )
+
+
+def test_add_features_matches_reference_exactly():
+    for seed, periods in [(0, 600), (1, 61), (2, 2500)]:
+        frame = synthetic_ohlcv(periods, seed).sample(frac=1.0, random_state=seed)
+        for dropna in (False, True):
+            pd.testing.assert_frame_equal(
+                add_features(frame, dropna=dropna),
+                reference_add_features(frame, dropna=dropna),
+                check_exact=True,
+            )
+
+
+def test_add_features_matches_reference_on_short_and_empty_histories():
+    for periods in (0, 1, 2, 15):
+        frame = synthetic_ohlcv(periods, seed=3)
+        pd.testing.assert_frame_equal(
+            add_features(frame, dropna=False),
+            reference_add_features(frame, dropna=False),
+            check_exact=True,
+        )
+
+
+def test_add_features_recomputes_featured_frame_in_place():
+    featured = reference_add_features(synthetic_ohlcv(200, seed=4), dropna=False)
+    pd.testing.assert_frame_equal(
+        add_features(featured, dropna=False),
+        reference_add_features(featured, dropna=False),
+        check_exact=True,
+    )
+
+
+def test_output_columns_cover_feature_cols():
+    featured = add_features(synthetic_ohlcv(100), dropna=False)
+    engine_cols = [c for c in featured.columns if c in TECHNICAL_OUTPUT_COLS]
+    assert engine_cols == TECHNICAL_OUTPUT_COLS
+    assert set(FEATURE_COLS) <= set(TECHNICAL_OUTPUT_COLS)
+
+
+def test_up_down_streak_run_lengths():
+    up = np.array([0, 0, 1, 1, 1, 0, 1, 0, 0])
+    assert up_down_streak(up).tolist() == [0, -1, 1, 2, 3, -1, 1, -1, -2]
+    assert up_down_streak(np.array([1, 1, 0])).tolist() == [1, 2, -1]
+    assert up_down_streak(np.array([], dtype=int)).tolist() == []
+
+
+def test_two_dimensional_input_matches_per_column():
+    frames = [synthetic_ohlcv(300, seed) for seed in range(3)]
+    stacked = {
+        col: np.column_stack([f[col].to_numpy() for f in frames])
+        for col in ("open", "high", "low", "close", "volume")
+    }
+    panel = technical_feature_arrays(
+        frames[0]["date"],
+        stacked["open"],
+        stacked["high"],
+        stacked["low"],
+        stacked["close"],
+        stacked["volume"],
+    )
+    for j, frame in enumerate(frames):
+        single = technical_feature_arrays(
+            frame["date"],
+            frame["open"],
+            frame["high"],
+            frame["low"],
+            frame["close"],
+            frame["volume"],
+        )
+        for col in TECHNICAL_OUTPUT_COLS:
+            np.testing.assert_array_equal(panel[col][:, j], single[col], err_msg=col)
+
+
+def test_sliding_windows_match_pandas_kernels_up_to_rounding():
+    frame = synthetic_ohlcv(400, seed=5)
+    args = [frame[c] for c in ("date", "open", "high", "low", "close", "volume")]
+    exact = technical_feature_arrays(*args)
+    fast = technical_feature_arrays(*args, exact=False)
+    for col in TECHNICAL_OUTPUT_COLS:
+        np.testing.assert_allclose(
+            fast[col], exact[col], rtol=1e-9, atol=1e-12, err_msg=col
+        )
+
+
+ALL_TESTS = [
+    test_add_features_matches_reference_exactly,
+    test_add_features_matches_reference_on_short_and_empty_histories,
+    test_add_features_recomputes_featured_frame_in_place,
+    test_output_columns_cover_feature_cols,
+    test_up_down_streak_run_lengths,
+    test_two_dimensional_input_matches_per_column,
+    test_sliding_windows_match_pandas_kernels_up_to_rounding,
+]
+
+
+def main() -> int:
+    failures = 0
+    for t in ALL_TESTS:
+        try:
+            t()
+            print(f"PASS {t.__name__}")
+        except AssertionError as exc:
+            failures += 1
+            print(f"FAIL {t.__name__}: {exc}")
+        except Exception as exc:  # noqa: BLE001
+            failures += 1
+            print(f"ERROR {t.__name__}: {type(exc).__name__}: {exc}")
+    print(f"\n{len(ALL_TESTS) - failures}/{len(ALL_TESTS)} passed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
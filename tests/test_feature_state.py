@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Unit tests for src/feature_state.py (incremental features, no network).
+
+Runnable two ways:
+  uv run python tests/test_feature_state.py     # standalone
+  uv run pytest tests/test_feature_state.py      # if pytest is available
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src import feature_state  # noqa: E402
+from src.feature_engine import TECHNICAL_OUTPUT_COLS  # noqa: E402
+from src.model import add_features  # noqa: E402
+from tests.test_feature_engine import synthetic_ohlcv  # noqa: E402
+
+EXACT_COLS = ["macd", "macd_signal", "macd_hist", "streak", "return_1d", "gap"]
+
+
+def _assert_latest_row(row: pd.DataFrame, reference: pd.DataFrame) -> None:
+    expected = reference.iloc[[-1]].reset_index(drop=True)
+    assert list(row.columns) == list(expected.columns)
+    assert list(row.dtypes) == list(expected.dtypes)
+    pd.testing.assert_frame_equal(
+        row,
+        expected,
+        rtol=feature_state.CHECK_RTOL,
+        atol=feature_state.CHECK_ATOL,
+    )
+    # EWMAs and counters continue from the stored state, so they are exact.
+    pd.testing.assert_frame_equal(row[EXACT_COLS], expected[EXACT_COLS], check_exact=True)
+
+
+def test_ewm_step_reproduces_pandas_recursion_exactly():
+    rng = np.random.default_rng(7)
+    values = rng.normal(100, 5, 300)
+    values[[40, 41, 42, 200]] = np.nan
+    expected = pd.Series(values).ewm(span=26, adjust=False).mean().to_numpy()
+    acc = [values[0], 1.0]
+    got = [acc[0]]
+    for value in values[1:]:
+        acc = feature_state.ewm_step(acc, value, 26)
+        got.append(acc[0])
+    np.testing.assert_array_equal(np.asarray(got), expected)
+
+
+def test_latest_features_appends_new_bars_from_state():
+    frame = synthetic_ohlcv(900, seed=11)
+    reference = add_features(frame, dropna=False)
+    with tempfile.TemporaryDirectory() as tmp:
+        price_path = Path(tmp) / "1111.JP.parquet"
+        state_file = feature_state.state_path(price_path)
+        assert state_file.name == "1111.JP.features.json"
+
+        first = feature_state.latest_features(frame.iloc[:700], price_path, "1111.JP")
+        pd.testing.assert_frame_equal(
+            first,
+            add_features(frame.iloc[:700], dropna=False).iloc[[-1]].reset_index(drop=True),
+            check_exact=True,
+        )
+        assert json.loads(state_file.read_text())["rows"] == 700
+
+        # One bar at a time, then a multi-bar gap, then a rerun with no new bar.
+        for n in list(range(701, 720)) + [900, 900]:
+            row = feature_state.latest_features(
+                frame.iloc[:n], price_path, "1111.JP", check_every=0
+            )
+            _assert_latest_row(row, reference.iloc[:n])
+        state = json.loads(state_file.read_text())
+        assert state["rows"] == 900
+        assert state["appends_since_check"] == 20
+        assert len(state["tail"]["close"]) == feature_state.TAIL_ROWS
+
+
+def test_rewritten_history_rebuilds_state():
+    frame = synthetic_ohlcv(300, seed=12)
+    with tempfile.TemporaryDirectory() as tmp:
+        price_path = Path(tmp) / "1111.JP.parquet"
+        feature_state.latest_features(frame.iloc[:250], price_path, "1111.JP")
+
+        adjusted = frame.copy()
+        adjusted[["open", "high", "low", "close"]] *= 0.5  # split-adjusted refetch
+        out = io.StringIO()
+        with redirect_stdout(out):
+            row = feature_state.latest_features(adjusted, price_path, "1111.JP")
+        assert "price history changed" in out.getvalue()
+        pd.testing.assert_frame_equal(
+            row,
+            add_features(adjusted, dropna=False).iloc[[-1]].reset_index(drop=True),
+            check_exact=True,
+        )
+
+
+def test_periodic_full_check_replaces_drifted_state():
+    frame = synthetic_ohlcv(400, seed=13)
+    with tempfile.TemporaryDirectory() as tmp:
+        price_path = Path(tmp) / "1111.JP.parquet"
+        feature_state.latest_features(frame.iloc[:398], price_path, "1111.JP")
+        state_file = feature_state.state_path(price_path)
+        state = json.loads(state_file.read_text())
+        state["ewm"]["fast"][0] *= 1.01  # corrupted accumulator
+        state_file.write_text(json.dumps(state))
+
+        feature_state.latest_features(
+            frame.iloc[:399], price_path, "1111.JP", check_every=2
+        )
+        out = io.StringIO()
+        with redirect_stdout(out):
+            row = feature_state.latest_features(
+                frame, price_path, "1111.JP", check_every=2
+            )
+        assert "drifted from a full recompute (macd" in out.getvalue()
+        pd.testing.assert_frame_equal(
+            row,
+            add_features(frame, dropna=False).iloc[[-1]].reset_index(drop=True),
+            check_exact=True,
+        )
+        assert json.loads(state_file.read_text())["appends_since_check"] == 0
+
+
+def test_advance_returns_one_row_per_bar():
+    frame = synthetic_ohlcv(200, seed=14)
+    featured = add_features(frame.iloc[:197], dropna=False)
+    state = feature_state.build_state(frame.iloc[:197], featured)
+    rows, new_state = feature_state.advance(state, frame.iloc[197:])
+    assert list(rows) == list(TECHNICAL_OUTPUT_COLS)
+    assert all(len(values) == 3 for values in rows.values())
+    assert new_state["last_date"] == frame["date"].iloc[-1].isoformat()
+    assert state["rows"] == 197  # the input state is not mutated
+
+
+ALL_TESTS = [
+    test_ewm_step_reproduces_pandas_recursion_exactly,
+    test_latest_features_appends_new_bars_from_state,
+    test_rewritten_history_rebuilds_state,
+    test_periodic_full_check_replaces_drifted_state,
+    test_advance_returns_one_row_per_bar,
+]
+
+
+def main() -> int:
+    failures = 0
+    for t in ALL_TESTS:
+        try:
+            t()
+            print(f"PASS {t.__name__}")
+        except AssertionError as exc:
+            failures += 1
+            print(f"FAIL {t.__name__}: {exc}")
+        except Exception as exc:  # noqa: BLE001
+            failures += 1
+            print(f"ERROR {t.__name__}: {type(exc).__name__}: {exc}")
+    print(f"\n{len(ALL_TESTS) - failures}/{len(ALL_TESTS)} passed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
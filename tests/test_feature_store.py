@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Unit tests for src/feature_store.py (persistent feature store, no network).
+
+Runnable two ways:
+  uv run python tests/test_feature_store.py     # standalone
+  uv run pytest tests/test_feature_store.py      # if pytest is available
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import tempfile
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src import data_loader, feature_store, price_store  # noqa: E402
+from src.macro import MACRO_FEATURE_COLS  # noqa: E402
+from src.model import FEATURE_WARMUP_ROWS, build_feature_frame  # noqa: E402
+from tests.test_feature_engine import synthetic_ohlcv  # noqa: E402
+
+CODE = "1111.JP"
+
+
+def _macro_panel(dates) -> pd.DataFrame:
+    rng = np.random.default_rng(3)
+    panel = pd.DataFrame({"date": pd.DatetimeIndex(dates)[::5]})
+    for col in MACRO_FEATURE_COLS:
+        panel[col] = rng.normal(0, 1, len(panel))
+    return panel
+
+
+@contextmanager
+def _store(history: pd.DataFrame):
+    """A temporary data dir holding ``history`` as CODE's price file."""
+    with tempfile.TemporaryDirectory() as tmp, ExitStack() as stack:
+        root = Path(tmp)
+        price_store.write_ticker_file(root / f"{CODE}.parquet", history)
+        stack.enter_context(patch.object(data_loader, "DATA_DIR", root))
+        stack.enter_context(patch.object(feature_store, "DATA_DIR", root))
+        stack.enter_context(
+            patch.object(feature_store, "FEATURE_STORE_DIR", root / "features")
+        )
+        stack.enter_context(
+            patch.dict(os.environ, {"TRADER_FEATURE_STORE_ENABLED": "true"})
+        )
+        yield root / "features"
+
+
+def _direct(df, macro_panel, dropna=True, macro_enabled=True):
+    with patch.dict(os.environ, {"TRADER_FEATURE_STORE_ENABLED": "false"}):
+        return build_feature_frame(
+            df, macro_panel, {"code": CODE}, dropna, macro_enabled=macro_enabled
+        )
+
+
+def test_full_history_is_served_exactly():
+    frame = synthetic_ohlcv(1500, seed=21)
+    panel = _macro_panel(frame["date"])
+    with _store(frame) as store_dir:
+        history = data_loader.load_data(CODE)
+        for dropna in (True, False):
+            expected = _direct(history, panel, dropna)
+            assert feature_store.features_for(
+                history, CODE, panel, dropna=dropna
+            ) is not None
+            served = build_feature_frame(history, panel, {"code": CODE}, dropna)
+            pd.testing.assert_frame_equal(served, expected, check_exact=True)
+        assert len(list(store_dir.iterdir())) == 1
+
+
+def test_window_is_served_exactly_from_its_own_entry():
+    frame = synthetic_ohlcv(1500, seed=22)
+    panel = _macro_panel(frame["date"])
+    with _store(frame) as store_dir:
+        history = data_loader.load_data(CODE)
+        window = data_loader.load_data(
+            CODE, since=history["date"].iloc[1150], warmup_rows=FEATURE_WARMUP_ROWS
+        )
+        for dropna in (True, False):
+            expected = _direct(window, panel, dropna)
+            served = feature_store.features_for(window, CODE, panel, dropna=dropna)
+            # EWMA and streak columns start from the window, not the history.
+            pd.testing.assert_frame_equal(served, expected, check_exact=True)
+        with patch.object(
+            feature_store, "_materialize", side_effect=AssertionError("rebuilt")
+        ):
+            hit = feature_store.features_for(window, CODE, panel)
+        # A window ending before the last stored row reads a prefix of it.
+        head = window.iloc[:-20].reset_index(drop=True)
+        pd.testing.assert_frame_equal(
+            feature_store.features_for(head, CODE, panel),
+            _direct(head, panel),
+            check_exact=True,
+        )
+        full = feature_store.features_for(history, CODE, panel)
+        assert len(list(store_dir.iterdir())) == 2
+
+    pd.testing.assert_frame_equal(hit, _direct(window, panel), check_exact=True)
+    assert full is not None and len(full) > len(hit)
+
+
+def test_frames_the_store_cannot_vouch_for_are_computed_directly():
+    frame = synthetic_ohlcv(400, seed=23)
+    with _store(frame) as store_dir:
+        history = data_loader.load_data(CODE)
+        modified = history.copy()
+        modified.loc[350, "close"] *= 1.5
+        assert feature_store.features_for(modified, CODE) is None
+        assert not store_dir.exists()  # nothing materialized for it
+        pd.testing.assert_frame_equal(
+            build_feature_frame(modified, ticker_info={"code": CODE}),
+            _direct(modified, None),
+            check_exact=True,
+        )
+        assert feature_store.features_for(history, "2222.JP") is None
+        with patch.dict(os.environ, {"TRADER_FEATURE_STORE_ENABLED": "false"}):
+            assert feature_store.features_for(history, CODE) is None
+
+
+def test_new_bar_rebuilds_and_prunes_stale_entries():
+    frame = synthetic_ohlcv(400, seed=24)
+    panel = _macro_panel(frame["date"])
+    with _store(frame.iloc[:399]) as store_dir:
+        first = feature_store.entry(CODE, panel)
+        assert feature_store.entry(CODE, panel) == first  # a hit
+        other_schema = feature_store.entry(CODE, panel, macro_enabled=False)
+        assert other_schema != first
+
+        price_store.append_rows(
+            store_dir.parent / f"{CODE}.parquet", frame.iloc[399:]
+        )
+        second = feature_store.entry(CODE, panel)
+        assert second != first and not first.exists()
+        assert sorted(store_dir.iterdir()) == sorted([second, other_schema])
+        meta = price_store.read_metadata(second, feature_store.METADATA_KEY)[0]
+        assert meta["rows"] == 400 and meta["ticker"] == CODE
+        assert meta["macro_fingerprint"] == feature_store.macro_fingerprint(panel)
+
+        # A refreshed macro panel is another key as well.
+        assert feature_store.entry(CODE, panel.assign(usdjpy=1.0)) != second
+
+        # Windows of the current data share its version; a new bar drops them.
+        assert feature_store.entry(CODE, panel) == second
+        history = data_loader.load_data(CODE)
+        window = history.iloc[300:].reset_index(drop=True)
+        assert feature_store.features_for(window, CODE, panel) is not None
+        assert second.exists() and len(list(store_dir.iterdir())) == 3
+        price_store.append_rows(
+            store_dir.parent / f"{CODE}.parquet",
+            frame.iloc[[-1]].assign(date=frame["date"].iloc[-1] + pd.Timedelta(days=1)),
+        )
+        third = feature_store.entry(CODE, panel)
+        assert sorted(store_dir.iterdir()) == sorted([third, other_schema])
+
+
+def test_load_features_windows():
+    frame = synthetic_ohlcv(2500, seed=25)
+    panel = _macro_panel(frame["date"])
+    with _store(frame):
+        full = feature_store.load_features(CODE, panel, dropna=False)
+        tail = feature_store.load_features(CODE, panel, tail_rows=30)
+        since = feature_store.load_features(
+            CODE, panel, since=frame["date"].iloc[2000], until=frame["date"].iloc[2099]
+        )
+        assert feature_store.load_features("2222.JP", panel) is None
+    assert len(full) == len(frame)
+    pd.testing.assert_frame_equal(
+        tail, full.tail(30).reset_index(drop=True), check_exact=True
+    )
+    pd.testing.assert_frame_equal(
+        since, full.iloc[2000:2100].reset_index(drop=True), check_exact=True
+    )
+
+
+def test_ohlcv_fingerprint_hashes_each_file_version_once():
+    frame = synthetic_ohlcv(300, seed=26)
+    with _store(frame.iloc[:290]) as store_dir:
+        path = store_dir.parent / f"{CODE}.parquet"
+        first = feature_store.ohlcv_fingerprint(path)
+        with patch.object(Path, "read_bytes", side_effect=AssertionError("rehashed")):
+            assert feature_store.ohlcv_fingerprint(path) == first
+        price_store.append_rows(path, frame.iloc[290:])
+        second = feature_store.ohlcv_fingerprint(path)
+        feature_store._ohlcv_memo.clear()
+        assert feature_store.ohlcv_fingerprint(path) == second != first
+
+
+def test_fingerprints_are_stable_across_processes():
+    panel = _macro_panel(pd.bdate_range("2020-01-01", periods=200))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "panel.parquet"
+        panel.to_parquet(path)
+        code = (
+            "import sys, pandas as pd; sys.path.insert(0, sys.argv[1]);"
+            "from src.feature_store import frame_fingerprint;"
+            "print(frame_fingerprint(pd.read_parquet(sys.argv[2])))"
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", code, str(ROOT), str(path)],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        assert out.stdout.strip() == feature_store.frame_fingerprint(
+            pd.read_parquet(path)
+        )
+
+
+ALL_TESTS = [
+    test_full_history_is_served_exactly,
+    test_window_is_served_exactly_from_its_own_entry,
+    test_frames_the_store_cannot_vouch_for_are_computed_directly,
+    test_new_bar_rebuilds_and_prunes_stale_entries,
+    test_load_features_windows,
+    test_ohlcv_fingerprint_hashes_each_file_version_once,
+    test_fingerprints_are_stable_across_processes,
+]
+
+
+def main() -> int:
+    failures = 0
+    for t in ALL_TESTS:
+        try:
+            t()
+            print(f"PASS {t.__name__}")
+        except AssertionError as exc:
+            failures += 1
+            print(f"FAIL {t.__name__}: {exc}")
+        except Exception as exc:  # noqa: BLE001
+            failures += 1
+            print(f"ERROR {t.__name__}: {type(exc).__name__}: {exc}")
+    print(f"\n{len(ALL_TESTS) - failures}/{len(ALL_TESTS)} passed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
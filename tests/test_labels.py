@@ -21,12 +21,17 @@ ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT))
 
 from src.labels import (  # noqa: E402
+    SWEEP_COLUMNS,
+    SWEEP_TABLE_COLUMNS,
     add_forward_return_labels,
     add_triple_barrier_labels,
     build_labelled_frame,
+    build_labelled_frames,
     effective_horizon,
+    triple_barrier_label_sweep,
 )
 from src.config import get_label_config  # noqa: E402
+from src.execution import first_barrier_touch  # noqa: E402
 
 
 def _frame(closes, opens=None, highs=None, lows=None, atr=None, volatility=None):
@@ -177,6 +182,112 @@ def test_triple_barrier_missing_atr_is_nan():
     assert np.isnan(out["target_class"].iloc[0])
 
 
+def _per_row_triple_barrier(df, horizon_days, tp_atr, sl_atr):
+    """The per-row first_barrier_touch() scan add_triple_barrier_labels replaced."""
+    out = add_forward_return_labels(df, horizon_days)
+    h = horizon_days
+    labels, reasons, exit_dates = [], [], []
+    for i in range(len(out)):
+        entry, a = out["entry_price"].iloc[i], out["atr"].iloc[i]
+        label = reason = exit_date = None
+        if (
+            np.isfinite(entry) and entry > 0 and np.isfinite(a) and a > 0
+            and i + h <= len(out) - 1
+        ):
+            exit_index, reason = first_barrier_touch(
+                out,
+                entry_index=i + 1,
+                exit_index=i + h,
+                take_profit=entry + tp_atr * a,
+                stop_loss=entry - sl_atr * a,
+            )
+            if reason is not None:
+                label = 1.0 if reason.startswith("tp") else 0.0
+            elif np.isfinite(out["close"].iloc[i + h]):
+                label = 1.0 if out["close"].iloc[i + h] > entry else 0.0
+                reason, exit_index = "time", i + h
+            if reason is not None:
+                exit_date = str(pd.Timestamp(out["date"].iloc[exit_index]).date())
+        labels.append(np.nan if label is None else label)
+        reasons.append(reason)
+        exit_dates.append(exit_date)
+    return labels, reasons, exit_dates
+
+
+# (H, tp_atr, sl_atr) configs of the differential tests.
+BARRIER_GRID = ((1, 1.5, 1.0), (5, 1.5, 1.0), (12, 0.5, 0.0), (3, 0.0, 2.0))
+
+
+def _barrier_frame():
+    # Integer prices give exact barrier ties; gaps, missing bars and
+    # non-positive ATR exercise every branch of the per-session precedence.
+    rng = np.random.default_rng(17)
+    n = 400
+    closes = np.round(100 + np.cumsum(rng.normal(0, 1.5, n)))
+    opens = np.round(closes + rng.normal(0, 1.5, n))
+    highs = np.maximum(opens, closes) + np.round(rng.exponential(1.0, n))
+    lows = np.minimum(opens, closes) - np.round(rng.exponential(1.0, n))
+    atr = np.round(rng.uniform(-0.5, 3.0, n), 1)
+    for values, share in ((opens, 0.03), (highs, 0.03), (lows, 0.03), (atr, 0.05)):
+        values[rng.random(n) < share] = np.nan
+    highs[rng.random(n) < 0.01] = np.inf
+    return _frame(list(closes), list(opens), list(highs), list(lows), list(atr))
+
+
+def test_vectorized_triple_barrier_matches_per_row_scan():
+    df = _barrier_frame()
+    seen = set()
+    for h, tp_atr, sl_atr in BARRIER_GRID:
+        out = add_triple_barrier_labels(
+            df, horizon_days=h, tp_atr=tp_atr, sl_atr=sl_atr
+        )
+        labels, reasons, exit_dates = _per_row_triple_barrier(df, h, tp_atr, sl_atr)
+        np.testing.assert_array_equal(out["target_class"].to_numpy(), labels)
+        assert out["tb_exit_reason"].tolist() == reasons, (h, tp_atr, sl_atr)
+        assert out["tb_exit_date"].tolist() == exit_dates, (h, tp_atr, sl_atr)
+        seen.update(reasons)
+    assert seen == {"sl_gap", "tp_gap", "sl", "tp", "time", None}
+
+
+def test_label_sweep_matches_single_config_builds():
+    df = _barrier_frame().sample(frac=1, random_state=3)  # builders sort by date
+    configs = [
+        {
+            "label_mode": "triple_barrier",
+            "tb_tp_atr": tp_atr,
+            "tb_sl_atr": sl_atr,
+            "tb_max_days": h,
+        }
+        for h, tp_atr, sl_atr in BARRIER_GRID
+    ] + [{"label_mode": "binary_1d"}, None]
+    frames = build_labelled_frames(df, configs)
+    assert len(frames) == len(configs)
+    for config, frame in zip(configs, frames):
+        pd.testing.assert_frame_equal(frame, build_labelled_frame(df, config))
+
+    sorted_df = df.sort_values("date").reset_index(drop=True)
+    grid = [(tp_atr, sl_atr, h) for h, tp_atr, sl_atr in BARRIER_GRID]
+    table = triple_barrier_label_sweep(df, grid)
+    assert list(table.columns) == SWEEP_TABLE_COLUMNS
+    for (tp_atr, sl_atr, h), frame in zip(grid, frames):
+        part = table[
+            (table["tb_tp_atr"] == tp_atr)
+            & (table["tb_sl_atr"] == sl_atr)
+            & (table["tb_max_days"] == h)
+        ].reset_index(drop=True)
+        pd.testing.assert_frame_equal(part[SWEEP_COLUMNS], frame[SWEEP_COLUMNS])
+        # ...and the per-row scan over the sorted frame agrees on the kept rows.
+        labels, reasons, _ = _per_row_triple_barrier(sorted_df, h, tp_atr, sl_atr)
+        kept = [d in set(frame["date"]) for d in sorted_df["date"]]
+        assert part["target_class"].tolist() == [
+            int(v) for v, k in zip(labels, kept) if k
+        ]
+        assert part["tb_exit_reason"].tolist() == [
+            r for r, k in zip(reasons, kept) if k
+        ]
+    assert triple_barrier_label_sweep(df, []).columns.tolist() == SWEEP_TABLE_COLUMNS
+
+
 def test_removed_vol_norm_config_falls_back_safely():
     with patch.dict("os.environ", {"TRADER_LABEL_MODE": "vol_norm"}):
         with warnings.catch_warnings(record=True) as caught:
@@ -241,6 +352,8 @@ ALL_TESTS = [
     test_triple_barrier_time_exit,
     test_triple_barrier_gap_after_entry_resolves_before_intraday_range,
     test_triple_barrier_missing_atr_is_nan,
+    test_vectorized_triple_barrier_matches_per_row_scan,
+    test_label_sweep_matches_single_config_builds,
     test_removed_vol_norm_config_falls_back_safely,
     test_removed_vol_norm_direct_call_falls_back_to_triple_barrier,
     test_build_unknown_mode_raises,
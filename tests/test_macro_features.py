@@ -11,6 +11,7 @@ from __future__ import annotations
 
 import sys
 from pathlib import Path
+from unittest.mock import patch
 
 import numpy as np
 import pandas as pd
@@ -18,16 +19,20 @@ import pandas as pd
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT))
 
+from src import provider_health  # noqa: E402
 from src.macro import (  # noqa: E402
     DEFAULT_MARKET_SERIES,
     MACRO_AUX_LEVEL_COLS,
     MACRO_FEATURE_COLS,
     MACRO_LEVEL_COLS,
+    MacroIndex,
     add_macro_features,
     build_macro_panel,
     encode_market_bias,
+    fetch_all_series,
     fetch_market_series,
     latest_snapshot_row,
+    macro_index,
 )
 from src.model import FEATURE_COLS, build_feature_frame, phase1_feature_cols  # noqa: E402
 
@@ -90,6 +95,61 @@ def test_add_macro_features_backward_join_no_future_leak():
         assert col in out.columns
 
 
+def _merge_asof_reference(stock, macro_panel):
+    """The per-ticker pd.merge_asof join MacroIndex replaced."""
+    out = stock.copy()
+    out["date"] = pd.to_datetime(out["date"]).dt.tz_localize(None)
+    out = out.sort_values("date").reset_index(drop=True)
+    feature_cols = [c for c in MACRO_FEATURE_COLS if c in macro_panel.columns]
+    right = macro_panel[["date"] + feature_cols].copy()
+    right["date"] = pd.to_datetime(right["date"]).dt.tz_localize(None)
+    right = right.sort_values("date").reset_index(drop=True)
+    merged = pd.merge_asof(out, right, on="date", direction="backward")
+    for col in MACRO_FEATURE_COLS:
+        if col not in merged.columns:
+            merged[col] = np.nan
+    return merged
+
+
+def test_macro_index_join_matches_merge_asof():
+    rng = np.random.default_rng(5)
+    dates = pd.bdate_range("2026-01-01", periods=120)
+    panel = pd.DataFrame({"date": dates})
+    for col in MACRO_FEATURE_COLS[2:]:  # two features missing from the panel
+        panel[col] = rng.normal(0, 1, len(panel))
+    panel["macro_bias_score"] = rng.integers(-1, 2, len(panel))  # int column
+    # Unsorted panel with repeated dates: the last equal date wins.
+    panel = pd.concat([panel, panel.iloc[10:20].assign(macro_jgb10y=9.0)])
+    panel = panel.sample(frac=1, random_state=0)
+
+    stock = pd.DataFrame(
+        {
+            "date": pd.bdate_range("2025-12-01", periods=150),
+            "close": rng.normal(100, 1, 150),
+        },
+        index=np.arange(150) * 2,
+    )
+    shuffled = pd.concat([stock, stock.iloc[40:45]]).sample(frac=1, random_state=1)
+    tokyo = stock.assign(date=stock["date"].dt.tz_localize("Asia/Tokyo"))
+    index = MacroIndex(panel)
+    for frame in (stock, shuffled, tokyo, stock.iloc[:0]):
+        expected = _merge_asof_reference(frame, panel)
+        pd.testing.assert_frame_equal(index.join(frame), expected, check_exact=True)
+        pd.testing.assert_frame_equal(
+            add_macro_features(frame, panel), expected, check_exact=True
+        )
+
+    positions = index.positions(pd.to_datetime(["2025-12-31", "2026-01-01"]))
+    assert positions.dtype == np.int32
+    assert positions.tolist() == [-1, 0]
+    # One panel object, one index: every caller in a run shares it.
+    assert macro_index(panel) is macro_index(panel)
+    assert macro_index(panel.copy()) is not macro_index(panel)
+    pd.testing.assert_frame_equal(
+        add_macro_features(stock, macro_index(panel)), index.join(stock)
+    )
+
+
 def test_build_macro_panel_columns_and_returns():
     usd, _ = _series("2026-01-01", 70, 0.1, "usdjpy")
     top, _ = _series("2026-01-01", 70, 1.0, "topix")
@@ -257,9 +317,11 @@ def _with_fake_yf(by_period, spec):
 
     sys.modules["yfinance"] = fake
     dl.download_stooq_data = _no_stooq
+    provider_health.set_tracker(provider_health.ProviderHealth(path=None))
     try:
         return fetch_market_series(spec), fake
     finally:
+        provider_health.set_tracker(None)
         dl.download_stooq_data = orig_stooq
         if orig_yf is not None:
             sys.modules["yfinance"] = orig_yf
@@ -277,9 +339,11 @@ def _with_fake_sources(stooq_result, by_period, spec):
 
     sys.modules["yfinance"] = fake
     dl.download_stooq_data = lambda _symbol: stooq_result.copy()
+    provider_health.set_tracker(provider_health.ProviderHealth(path=None))
     try:
         return fetch_market_series(spec), fake
     finally:
+        provider_health.set_tracker(None)
         dl.download_stooq_data = orig_stooq
         if orig_yf is not None:
             sys.modules["yfinance"] = orig_yf
@@ -503,6 +567,45 @@ def test_fetch_market_series_extreme_close_move_still_rejects_whole_series():
     assert fake.calls == ["max"]
 
 
+def test_fetch_all_series_batches_the_yfinance_fallback():
+    """Series Stooq cannot serve share one multi-ticker yfinance request."""
+    import src.data_loader as dl
+
+    idx = pd.date_range("2026-01-05", periods=6, freq="B", name="Date")
+    close = [100.0, 100.5, 101.0, 100.8, 101.2, 101.5]
+    frame = pd.DataFrame(
+        {"Open": [c - 0.2 for c in close], "Close": close}, index=idx
+    )
+    calls = []
+
+    def fake_download(symbols, **kwargs):
+        calls.append((list(symbols), kwargs))
+        return pd.concat({s: frame for s in symbols}, axis=1)
+
+    specs = {
+        "usdjpy": {"stooq": "usdjpy", "yfinance": "JPY=X"},
+        "topix": {"stooq": "1305.jp", "yfinance": "1305.T", "open": True},
+    }
+    provider_health.set_tracker(provider_health.ProviderHealth(path=None))
+    try:
+        with patch.object(dl, "download_stooq_data", return_value=None), patch.object(
+            dl.yf, "download", side_effect=fake_download
+        ):
+            out = fetch_all_series(specs)
+    finally:
+        provider_health.set_tracker(None)
+
+    assert len(calls) == 1
+    symbols, kwargs = calls[0]
+    assert symbols == ["JPY=X", "1305.T"]
+    assert kwargs["auto_adjust"] is True
+    assert kwargs["group_by"] == "ticker"
+    assert sorted(out) == ["topix", "usdjpy"]
+    assert list(out["usdjpy"].columns) == ["date", "close"]
+    assert list(out["topix"].columns) == ["date", "close", "open"]
+    assert out["topix"]["close"].tolist() == close
+
+
 def test_build_feature_frame_macro_disabled_omits_macro_columns():
     dates = pd.date_range("2026-01-01", periods=90, freq="D")
     close = pd.Series([100.0 + i * 0.5 for i in range(90)])
@@ -535,6 +638,7 @@ ALL_TESTS = [
     test_encode_market_bias,
     test_add_macro_features_none_panel_emits_nan_schema,
     test_add_macro_features_backward_join_no_future_leak,
+    test_macro_index_join_matches_merge_asof,
     test_build_macro_panel_columns_and_returns,
     test_build_macro_panel_empty_input,
     test_latest_snapshot_row,
@@ -557,6 +661,7 @@ ALL_TESTS = [
     test_fetch_market_series_extreme_open_move_drops_open_keeps_close,
     test_fetch_market_series_open_close_basis_mismatch_drops_open,
     test_fetch_market_series_extreme_close_move_still_rejects_whole_series,
+    test_fetch_all_series_batches_the_yfinance_fallback,
     test_build_feature_frame_macro_disabled_omits_macro_columns,
 ]
 
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Unit tests for src/oos_cache.py (on-disk OOS prediction cache, no network).
+
+Runnable two ways:
+  uv run python tests/test_oos_cache.py     # standalone
+  uv run pytest tests/test_oos_cache.py      # if pytest is available
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+from contextlib import ExitStack, contextmanager
+from functools import lru_cache
+from pathlib import Path
+from unittest.mock import patch
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src import model, oos_cache, price_store  # noqa: E402
+from src.backtest import (  # noqa: E402
+    _collect_oos_predictions,
+    _prepare_labelled_data,
+    evaluate_kpi_gate,
+)
+from src.config import BACKTEST_GATE_CONFIG, get_label_config  # noqa: E402
+from src.labels import effective_horizon  # noqa: E402
+from src.model import build_feature_frame  # noqa: E402
+from tests.test_feature_engine import synthetic_ohlcv  # noqa: E402
+
+CODE = "1111.JP"
+CONFIG = {
+    **BACKTEST_GATE_CONFIG,
+    "enabled": True,
+    "validation_years": 10,
+    "val_size": 40,
+    "n_folds": 3,
+    "train_min_rows": 100,
+}
+LABEL_CONFIG = {**get_label_config(), "label_mode": "triple_barrier", "tb_max_days": 3}
+
+
+@lru_cache(maxsize=None)
+def _featured(rows: int = 700, seed: int = 31) -> pd.DataFrame:
+    with patch.dict(os.environ, {"TRADER_FEATURE_STORE_ENABLED": "false"}):
+        return build_feature_frame(
+            synthetic_ohlcv(rows, seed), ticker_info={"code": CODE}, macro_enabled=False
+        )
+
+
+@contextmanager
+def _cache(enabled: bool = True):
+    """A temporary OOS cache dir; yields it."""
+    with tempfile.TemporaryDirectory() as tmp, ExitStack() as stack:
+        root = Path(tmp) / "oos_cache"
+        stack.enter_context(patch.object(oos_cache, "OOS_CACHE_DIR", root))
+        stack.enter_context(
+            patch.dict(
+                os.environ, {"TRADER_OOS_CACHE_ENABLED": "true" if enabled else "false"}
+            )
+        )
+        yield root
+
+
+def _no_training(*_args, **_kwargs):
+    raise AssertionError("a cache hit must not train")
+
+
+def test_cached_frame_round_trips_exactly():
+    featured = _featured()
+    labelled = _prepare_labelled_data(featured, CONFIG, LABEL_CONFIG)
+    horizon = effective_horizon(LABEL_CONFIG)
+    expected = _collect_oos_predictions(labelled, CONFIG, horizon=horizon)
+    assert not expected.empty
+    with _cache() as root:
+        key = oos_cache.cache_key(featured, CONFIG, LABEL_CONFIG)
+        assert oos_cache.load(key, CODE) is None
+        path = oos_cache.store(key, expected, CODE)
+        assert path.parent == root
+        served = oos_cache.load(key, CODE)
+        meta = price_store.read_metadata(path, oos_cache.METADATA_KEY)[0]
+
+    pd.testing.assert_frame_equal(served, expected, check_exact=True)
+    assert served.attrs == expected.attrs
+    assert meta["key"] == key and meta["ticker"] == CODE
+    assert meta["rows"] == len(expected)
+
+
+def test_gate_hit_skips_training_and_returns_the_same_result():
+    featured = _featured()
+    with _cache() as root:
+        first = evaluate_kpi_gate(featured, CONFIG, LABEL_CONFIG, ticker_code=CODE)
+        assert len(list(root.iterdir())) == 1
+        with patch(
+            "src.backtest.train_with_purged_internal_validation",
+            side_effect=_no_training,
+        ):
+            second = evaluate_kpi_gate(featured, CONFIG, LABEL_CONFIG, ticker_code=CODE)
+            # Costs, shorting and KPI limits act after the OOS frame: still a hit.
+            stressed = {**CONFIG, "cost_bps": 30.0, "allow_short": True}
+            evaluate_kpi_gate(featured, stressed, LABEL_CONFIG, ticker_code=CODE)
+
+    assert first["threshold_optimization"]["oos_training_splits"]
+    assert second == first
+
+
+def test_training_inputs_miss_and_new_data_replaces_the_entry():
+    featured = _featured()
+    with _cache() as root:
+        key = oos_cache.cache_key(featured, CONFIG, LABEL_CONFIG)
+        first = oos_cache.store(key, pd.DataFrame(), CODE)
+        for changed in (
+            oos_cache.cache_key(featured, {**CONFIG, "n_folds": 2}, LABEL_CONFIG),
+            oos_cache.cache_key(featured, CONFIG, {**LABEL_CONFIG, "tb_max_days": 4}),
+        ):
+            assert changed != key and oos_cache.load(changed, CODE) is None
+        assert (
+            oos_cache.cache_key(featured, {**CONFIG, "cost_bps": 30.0}, LABEL_CONFIG)
+            == key
+        )
+        # The boosting schedule shapes the predictions as much as the params.
+        for constant in ("_MAX_BOOST_ROUND", "_EARLY_STOPPING_ROUNDS"):
+            with patch.object(model, constant, getattr(model, constant) + 1):
+                changed = oos_cache.cache_key(featured, CONFIG, LABEL_CONFIG)
+            assert changed["model_hash"] != key["model_hash"]
+
+        # An empty OOS frame (no trainable fold) is a hit as well.
+        assert oos_cache.load(key, CODE).empty
+        newer = oos_cache.cache_key(_featured(701), CONFIG, LABEL_CONFIG)
+        second = oos_cache.store(newer, pd.DataFrame(), CODE)
+        assert sorted(root.iterdir()) == [second] and not first.exists()
+
+
+def test_disabled_cache_trains_every_call():
+    featured = _featured()
+    with _cache(enabled=False) as root:
+        evaluate_kpi_gate(featured, CONFIG, LABEL_CONFIG, ticker_code=CODE)
+        assert not root.exists()
+
+
+def test_failed_cache_write_keeps_the_computed_result():
+    featured = _featured()
+    with _cache(enabled=False):
+        expected = evaluate_kpi_gate(featured, CONFIG, LABEL_CONFIG, ticker_code=CODE)
+    with (
+        _cache(),
+        patch.object(oos_cache, "store", side_effect=OSError("No space left")),
+    ):
+        result = evaluate_kpi_gate(featured, CONFIG, LABEL_CONFIG, ticker_code=CODE)
+
+    assert result == expected
+
+
+ALL_TESTS = [
+    test_cached_frame_round_trips_exactly,
+    test_gate_hit_skips_training_and_returns_the_same_result,
+    test_training_inputs_miss_and_new_data_replaces_the_entry,
+    test_disabled_cache_trains_every_call,
+    test_failed_cache_write_keeps_the_computed_result,
+]
+
+
+def main() -> int:
+    failures = 0
+    for t in ALL_TESTS:
+        try:
+            t()
+            print(f"PASS {t.__name__}")
+        except AssertionError as exc:
+            failures += 1
+            print(f"FAIL {t.__name__}: {exc}")
+        except Exception as exc:  # noqa: BLE001
+            failures += 1
+            print(f"ERROR {t.__name__}: {type(exc).__name__}: {exc}")
+    print(f"\n{len(ALL_TESTS) - failures}/{len(ALL_TESTS)} passed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Unit tests for src/panel_features.py: the (date x ticker) grid path behind
+cross_section.build_panel(). Every test demands exact equality with the
+per-ticker loop (build_panel_per_ticker).
+
+Runnable two ways:
+  uv run python tests/test_panel_features.py     # standalone
+  uv run pytest tests/test_panel_features.py      # if pytest is available
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src import panel_features  # noqa: E402
+from src.cross_section import build_panel, build_panel_per_ticker  # noqa: E402
+from src.macro import MACRO_FEATURE_COLS  # noqa: E402
+from tests.test_feature_engine import synthetic_ohlcv  # noqa: E402
+
+
+def _tickers_data():
+    """Uneven histories: late listings, missed sessions, a too-short one."""
+    base = synthetic_ohlcv(700, seed=30)
+    data = []
+    for i, (start, stop) in enumerate(
+        [(0, 700), (120, 700), (0, 650), (300, 700), (0, 700), (650, 700)]
+    ):
+        frame = synthetic_ohlcv(700, seed=31 + i).iloc[start:stop]
+        frame["date"] = base["date"].iloc[start:stop].to_numpy()
+        if i == 2:  # sessions the other tickers traded
+            frame = frame.drop(frame.index[[100, 101, 400]])
+        if i == 4:
+            frame["volume"] = frame["volume"].astype("int64")
+        sector = None if i % 3 == 0 else f"S{i % 2}"
+        data.append(({"code": f"{9000 + 7 * (5 - i)}.JP", "sector": sector}, frame))
+    return data
+
+
+def _macro_panel(dates, drop=()):
+    rng = np.random.default_rng(4)
+    panel = pd.DataFrame({"date": pd.DatetimeIndex(dates)[::3]})
+    for col in MACRO_FEATURE_COLS:
+        if col not in drop:
+            panel[col] = rng.normal(0, 1, len(panel))
+    return panel
+
+
+def _assert_same_panel(data, macro_panel=None, macro_enabled=True):
+    assert panel_features.panel_inputs(data) is not None
+    with patch.dict(os.environ, {"TRADER_FEATURE_STORE_ENABLED": "false"}):
+        expected = build_panel_per_ticker(data, macro_panel, macro_enabled)
+    got = build_panel(data, macro_panel, macro_enabled)
+    pd.testing.assert_frame_equal(got, expected, check_exact=True)
+    return got
+
+
+def test_grid_panel_matches_per_ticker_loop():
+    data = _tickers_data()
+    dates = data[0][1]["date"]
+    got = _assert_same_panel(data, _macro_panel(dates))
+    assert set(got["ticker"]) == {info["code"] for info, _ in data[:5]}
+    _assert_same_panel(data, _macro_panel(dates, drop=MACRO_FEATURE_COLS[:3]))
+    _assert_same_panel(data, None)
+    _assert_same_panel(data, _macro_panel(dates), macro_enabled=False)
+
+
+def test_grid_panel_blocks_and_order():
+    data = _tickers_data()
+    with patch.object(panel_features, "PANEL_BLOCK_TICKERS", 2):
+        got = _assert_same_panel(data, _macro_panel(data[0][1]["date"]))
+    keys = list(zip(got["date"], got["ticker"]))
+    assert keys == sorted(keys)
+
+
+def test_grid_panel_edge_inputs():
+    data = _tickers_data()
+    empty = data[0][1].iloc[:0]
+    assert build_panel([(data[0][0], empty)]).empty
+    assert build_panel([]).empty
+    _assert_same_panel(data[5:] + [(data[0][0], empty)])
+
+
+def test_inputs_outside_the_grid_contract_use_the_loop():
+    data = _tickers_data()
+    extra = [(info, df.assign(note="x")) for info, df in data[:2]]
+    duplicated = data[:2] + [data[0]]
+    repeated_date = [(data[0][0], pd.concat([data[0][1], data[0][1].iloc[:1]]))]
+    for case in (extra, duplicated, repeated_date):
+        assert panel_features.panel_inputs(case) is None
+    with patch.dict(os.environ, {"TRADER_FEATURE_STORE_ENABLED": "false"}):
+        pd.testing.assert_frame_equal(
+            build_panel(extra), build_panel_per_ticker(extra), check_exact=True
+        )
+
+
+ALL_TESTS = [
+    test_grid_panel_matches_per_ticker_loop,
+    test_grid_panel_blocks_and_order,
+    test_grid_panel_edge_inputs,
+    test_inputs_outside_the_grid_contract_use_the_loop,
+]
+
+
+def main() -> int:
+    failures = 0
+    for t in ALL_TESTS:
+        try:
+            t()
+            print(f"PASS {t.__name__}")
+        except AssertionError as exc:
+            failures += 1
+            print(f"FAIL {t.__name__}: {exc}")
+        except Exception as exc:  # noqa: BLE001
+            failures += 1
+            print(f"ERROR {t.__name__}: {type(exc).__name__}: {exc}")
+    print(f"\n{len(ALL_TESTS) - failures}/{len(ALL_TESTS)} passed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
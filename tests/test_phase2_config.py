@@ -32,6 +32,7 @@ _CS_KEYS = {
     "TRADER_CS_MIN_DAILY_NAMES",
     "TRADER_CS_PANEL_LOOKBACK_YEARS",
     "TRADER_UNIVERSE_TARGET_SIZE",
+    "TRADER_CS_COMPACT_DTYPES",
 }
 
 _PORT_KEYS = {
@@ -91,6 +92,7 @@ def test_cs_config_defaults():
         assert cfg["universe_target_size"] == 40, (
             f"expected 40, got {cfg['universe_target_size']}"
         )
+        assert cfg["compact_dtypes"] is False, "compact dtypes must be opt-in"
         # active_model_file ends with active_cs_model.json
         assert cfg["active_model_file"].endswith("active_cs_model.json"), (
             f"unexpected active_model_file: {cfg['active_model_file']}"
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""Unit tests for the provider circuit breaker and adaptive source ordering."""
+
+from __future__ import annotations
+
+import json
+import sys
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src import data_loader, provider_health  # noqa: E402
+from src.provider_health import ProviderHealth  # noqa: E402
+
+
+def _tracker(path=None, **kwargs) -> ProviderHealth:
+    kwargs.setdefault("enabled", True)
+    kwargs.setdefault("trip_failures", 3)
+    kwargs.setdefault("cooldown_hours", 24.0)
+    return ProviderHealth(path=path, **kwargs)
+
+
+def test_consecutive_failures_open_circuit_and_skip_provider():
+    tracker = _tracker()
+    for _ in range(3):
+        tracker.record("stooq", provider_health.OUTCOME_FAIL, 2.0)
+
+    assert tracker.order(["stooq", "yfinance"]) == ["yfinance"]
+    summary = tracker.run_summary()["stooq"]
+    assert summary["fail"] == 3 and summary["skipped"] == 1
+    assert summary["seconds"] == 6.0
+    assert summary["circuit_open_until"] is not None
+
+
+def test_stale_answers_do_not_trip_the_breaker():
+    tracker = _tracker()
+    for _ in range(5):
+        tracker.record("stooq", provider_health.OUTCOME_STALE, 0.1)
+
+    assert "stooq" in tracker.order(["stooq", "yfinance"])
+
+
+def test_all_open_circuits_still_return_every_provider():
+    tracker = _tracker(trip_failures=1)
+    tracker.record("stooq", provider_health.OUTCOME_FAIL, 1.0)
+    tracker.record("yfinance", provider_health.OUTCOME_FAIL, 1.0)
+
+    assert tracker.order(["stooq", "yfinance"]) == ["stooq", "yfinance"]
+
+
+def test_elapsed_cooldown_allows_single_half_open_probe():
+    tracker = _tracker(trip_failures=1)
+    tracker.record("stooq", provider_health.OUTCOME_FAIL, 1.0)
+    entry = tracker._state["stooq"]
+    entry["open_until"] = provider_health._now() - timedelta(seconds=1)
+
+    # Probe allowed, but ranked behind the provider with a better record.
+    assert tracker.order(["stooq", "yfinance"]) == ["yfinance", "stooq"]
+    # While the probe is in flight, concurrent callers skip the provider.
+    assert tracker.order(["stooq", "yfinance"]) == ["yfinance"]
+
+    tracker.record("stooq", provider_health.OUTCOME_OK, 0.2)
+    assert entry["open_until"] is None
+    assert "stooq" in tracker.order(["stooq", "yfinance"])
+
+
+def test_order_prefers_recent_success_rate_and_keeps_priority_on_ties():
+    tracker = _tracker(trip_failures=100)
+    assert tracker.order(["stooq", "yfinance"]) == ["stooq", "yfinance"]
+
+    tracker.record("stooq", provider_health.OUTCOME_FAIL, 1.0)
+    tracker.record("stooq", provider_health.OUTCOME_OK, 1.0)
+    tracker.record("yfinance", provider_health.OUTCOME_OK, 1.0)
+
+    assert tracker.order(["stooq", "yfinance"]) == ["yfinance", "stooq"]
+
+
+def test_state_persists_between_runs():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "provider_health.json"
+        first = _tracker(path)
+        first.save()
+        assert not path.exists()  # nothing recorded, nothing written
+
+        for _ in range(3):
+            first.record("stooq", provider_health.OUTCOME_FAIL, 20.0)
+        first.save()
+        payload = json.loads(path.read_text(encoding="utf-8"))
+        assert payload["providers"]["stooq"]["consecutive_failures"] == 3
+
+        second = _tracker(path)
+        assert second.order(["stooq", "yfinance"]) == ["yfinance"]
+
+
+def test_download_with_fallback_skips_tripped_provider():
+    tracker = _tracker(trip_failures=1)
+    tracker.record("stooq", provider_health.OUTCOME_FAIL, 20.0)
+    frame = pd.DataFrame({"date": [pd.Timestamp("2026-07-21")], "close": [1.0]})
+    fresh = {"is_stale": False, "latest_date": None}
+
+    def _no_stooq(*_args, **_kwargs):
+        raise AssertionError("tripped Stooq must not be requested")
+
+    provider_health.set_tracker(tracker)
+    try:
+        with (
+            patch.object(data_loader, "download_stooq_data", side_effect=_no_stooq),
+            patch.object(data_loader, "download_yfinance_data", return_value=frame),
+            patch.object(data_loader, "_assess_freshness", return_value=fresh),
+        ):
+            df, source, _ = data_loader._download_with_fallback("9999.JP")
+    finally:
+        provider_health.set_tracker(None)
+
+    assert source == "yfinance" and df is frame
+    assert tracker.run_summary()["yfinance"]["ok"] == 1
+
+
+ALL_TESTS = [
+    test_consecutive_failures_open_circuit_and_skip_provider,
+    test_stale_answers_do_not_trip_the_breaker,
+    test_all_open_circuits_still_return_every_provider,
+    test_elapsed_cooldown_allows_single_half_open_probe,
+    test_order_prefers_recent_success_rate_and_keeps_priority_on_ties,
+    test_state_persists_between_runs,
+    test_download_with_fallback_skips_tripped_provider,
+]
+
+
+def main() -> int:
+    failures = 0
+    for test in ALL_TESTS:
+        try:
+            test()
+            print(f"PASS {test.__name__}")
+        except Exception as exc:  # noqa: BLE001
+            failures += 1
+            print(f"FAIL {test.__name__}: {type(exc).__name__}: {exc}")
+    print(f"\n{len(ALL_TESTS) - failures}/{len(ALL_TESTS)} passed")
+    return failures
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
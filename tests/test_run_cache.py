@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Unit tests for the run-scoped OHLCV / feature cache."""
+
+from __future__ import annotations
+
+import sys
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src import data_loader, run_cache  # noqa: E402
+from src.model import add_features, build_feature_frame, technical_features  # noqa: E402
+
+
+def _ohlcv(periods: int = 120, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 1000.0 * np.exp(np.cumsum(rng.normal(0, 0.01, periods)))
+    return pd.DataFrame(
+        {
+            "date": pd.bdate_range("2026-01-05", periods=periods),
+            "open": close * 0.998,
+            "high": close * 1.01,
+            "low": close * 0.99,
+            "close": close,
+            "volume": rng.integers(1_000, 5_000, periods).astype(float),
+        }
+    )
+
+
+def test_load_data_reads_each_parquet_version_once():
+    frame = _ohlcv()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "9999.JP.parquet"
+        frame.to_parquet(path)
+        with (
+            patch.object(data_loader, "DATA_DIR", Path(tmp)),
+            run_cache.run_scope() as cache,
+        ):
+            first = data_loader.load_data("9999.JP")
+            first.loc[0, "close"] = -1.0  # callers get copies
+            second = data_loader.load_data("9999.JP")
+            assert cache.stats["ohlcv_loads"] == 1
+            assert cache.stats["ohlcv_hits"] == 1
+            assert second.loc[0, "close"] == frame.loc[0, "close"]
+
+            # A rewrite (update_data) invalidates the entry.
+            frame.iloc[:-1].to_parquet(path)
+            third = data_loader.load_data("9999.JP")
+            assert cache.stats["ohlcv_loads"] == 2
+            assert len(third) == len(frame) - 1
+        assert run_cache.active() is None
+
+
+def test_technical_features_match_add_features_and_build_once():
+    frame = _ohlcv()
+    with run_cache.run_scope() as cache:
+        full = technical_features(frame, dropna=False, ticker_code="9999.JP")
+        dropped = technical_features(frame, dropna=True, ticker_code="9999.JP")
+        assert cache.stats["feature_builds"] == 1
+        assert cache.stats["feature_hits"] == 1
+
+    pd.testing.assert_frame_equal(full, add_features(frame, dropna=False))
+    pd.testing.assert_frame_equal(dropped, add_features(frame, dropna=True))
+
+
+def test_build_feature_frame_is_memoized_by_ohlcv_content():
+    frame = _ohlcv()
+    info = {"code": "9999.JP"}
+    expected = build_feature_frame(frame, ticker_info=info, macro_enabled=False)
+    with run_cache.run_scope() as cache:
+        first = build_feature_frame(frame, ticker_info=info, macro_enabled=False)
+        again = build_feature_frame(frame.copy(), ticker_info=info, macro_enabled=False)
+        builds = cache.stats["feature_builds"]
+
+        changed = frame.copy()
+        changed.loc[len(changed) - 1, "close"] *= 1.05
+        rebuilt = build_feature_frame(changed, ticker_info=info, macro_enabled=False)
+        assert cache.stats["feature_builds"] > builds
+
+    pd.testing.assert_frame_equal(first, expected)
+    pd.testing.assert_frame_equal(again, expected)
+    assert rebuilt["close"].iloc[-1] == changed["close"].iloc[-1]
+
+
+ALL_TESTS = [
+    test_load_data_reads_each_parquet_version_once,
+    test_technical_features_match_add_features_and_build_once,
+    test_build_feature_frame_is_memoized_by_ohlcv_content,
+]
+
+
+def main() -> int:
+    failures = 0
+    for test in ALL_TESTS:
+        try:
+            test()
+            print(f"PASS {test.__name__}")
+        except Exception as exc:  # noqa: BLE001
+            failures += 1
+            print(f"FAIL {test.__name__}: {type(exc).__name__}: {exc}")
+    print(f"\n{len(ALL_TESTS) - failures}/{len(ALL_TESTS)} passed")
+    return failures
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -160,7 +160,7 @@ def _run_mocked_retrain(
     with (
         patch.object(weekly, "TICKERS", tickers),
         patch.object(weekly, "load_macro_panel", return_value=None),
-        patch.object(weekly, "update_data", return_value=None),
+        patch.object(weekly, "update_many", return_value=({}, {})),
         patch.object(weekly, "load_data", return_value=frame),
         patch.object(weekly, "build_feature_frame", return_value=frame),
         patch.object(weekly, "train_ticker_bundle", side_effect=train_side_effect),
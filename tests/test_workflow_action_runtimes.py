@@ -12,6 +12,7 @@ WORKFLOW_DIR = ROOT / ".github" / "workflows"
 
 # First releases of these actions whose JavaScript runtime is Node 24.
 MIN_NODE24_MAJOR = {
+    "actions/cache": 5,
     "actions/checkout": 5,
     "actions/setup-node": 5,
     "astral-sh/setup-uv": 7,